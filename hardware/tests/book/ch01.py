@@ -4,19 +4,33 @@
 
 """Chapter 1 Test Bench (cocotb)"""
 
+import numpy as np
+
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
-from tests.helpers import assert_coord, assert_pixel
+from cocotb.triggers import RisingEdge
+from tests.helpers import assert_frame, assert_frame_pixels, capture_frame
 
 # clock frequency
 SYS_TIME = 40  # 40 ns is 25 MHz
 
 # 640x480 (DISPLAY_MODE=0)
+DISP_HRES   = 640  # horizontal resolution
+DISP_VRES   = 480  # vertical resolution
 DISP_LINE   = 800  # horizontal line including blanking
 DISP_HBLANK = 160  # horizontal blanking
 DISP_VBLANK =  45  # vertical blanking
 
+# pixel colours checked against the hardware before golden frames
+PIXELS = {
+    (0, 0):     (2, 6, 14),    # dark blue
+    (219, 140): (2, 6, 14),    # dark blue
+    (220, 140): (31, 31, 31),  # white
+    (419, 339): (31, 31, 31),  # white
+    (420, 339): (2, 6, 14),    # dark blue
+    (639, 479): (2, 6, 14),    # dark blue
+}
+
 
 async def reset_dut(dut):
     """Reset DUT (single cycle)"""
@@ -29,51 +43,20 @@ async def reset_dut(dut):
     await RisingEdge(dut.clk)
 
 
+def golden_frame():
+    """Golden frame: white square in the middle of dark blue display."""
+    frame = np.zeros((DISP_VRES, DISP_HRES, 3), dtype=np.uint8)
+    frame[...] = (2, 6, 14)  # dark blue
+    frame[140:340, 220:420] = (31, 31, 31)  # white
+    return frame
+
+
 @cocotb.test()  # pylint: disable=no-value-for-parameter
 async def pixel_colour(dut):
-    """Test display pixel colour"""
+    """Test display pixel colour for the whole frame"""
     cocotb.start_soon(Clock(dut.clk, SYS_TIME, unit="ns").start())
     await reset_dut(dut)
 
-    # await start of active pixels
-    while not dut.de.value:
-        await RisingEdge(dut.clk)
-    # await middle of clock before sampling colour
-    await Timer(SYS_TIME >> 1, unit='ns')
-
-    # pixel line 0
-    assert_coord(dut, 0, 0)
-    assert_pixel(dut, 2, 6, 14)  # dark blue
-    await Timer(DISP_LINE*SYS_TIME, unit='ns')  # wait the rest of the line
-
-    # skip to line 140
-    await Timer(139*DISP_LINE*SYS_TIME + 219*SYS_TIME, unit='ns')
-
-    # pixel line 140
-    assert_coord(dut, 219, 140)
-    assert_pixel(dut, 2, 6, 14)  # dark blue
-    await Timer(SYS_TIME, unit='ns')
-    assert_coord(dut, 220, 140)
-    assert_pixel(dut, 31, 31, 31)  # white
-    await Timer((DISP_LINE-220)*SYS_TIME, unit='ns')  # wait the rest of the line
-
-    # skip to line 339
-    await Timer(198*DISP_LINE*SYS_TIME + 419*SYS_TIME, unit='ns')
-
-    # pixel line 339
-    assert_coord(dut, 419, 339)
-    assert_pixel(dut, 31, 31, 31)  # white
-    await Timer(SYS_TIME, unit='ns')
-    assert_coord(dut, 420, 339)
-    assert_pixel(dut, 2, 6, 14)  # dark blue
-    await Timer((DISP_LINE-420)*SYS_TIME, unit='ns')  # wait the rest of the line
-
-    # skip to bottom of display
-    await Timer(139*DISP_LINE*SYS_TIME + 639*SYS_TIME, unit='ns')
-
-    # pixel line 479
-    assert_coord(dut, 639, 479)
-    assert_pixel(dut, 2, 6, 14)  # dark blue
-
-    # wait one more line to complete waveform
-    await Timer(DISP_LINE*SYS_TIME, unit='ns')
+    frame = await capture_frame(dut, (DISP_HRES, DISP_VRES))
+    assert_frame_pixels(frame, PIXELS)
+    assert_frame(frame, golden_frame())
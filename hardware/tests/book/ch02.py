@@ -4,19 +4,40 @@
 
 """Chapter 2 Test Bench (cocotb)"""
 
+from pathlib import Path
+
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
-from tests.helpers import assert_coord, assert_pixel
+from cocotb.triggers import RisingEdge
+from tests.helpers import assert_frame, assert_frame_pixels, bitmap_frame, capture_frame
 
 # clock frequency
 SYS_TIME = 50  # 50 ns is 20 MHz
 
 # 672x384 (DISPLAY_MODE=3)
+DISP_HRES   = 672  # horizontal resolution
+DISP_VRES   = 384  # vertical resolution
 DISP_LINE   = 825  # horizontal line including blanking
 DISP_HBLANK = 153  # horizontal blanking
 DISP_VBLANK =  20  # vertical blanking
 
+# bitmap and palette (must match ch02.mk)
+RES = Path(__file__).parent / "../../../res/bitmaps/latency"
+BITMAP = RES / "latency-672x384.mem"
+PALETTE = RES / "latency-672x384_palette.mem"
+CANV_BPP = 2
+
+# pixel colours checked against the hardware before golden frames
+PIXELS = {
+    (0, 0):     (14, 8, 17),   # purple
+    (1, 0):     (12, 19, 31),  # light blue
+    (2, 0):     (31, 30, 6),   # yellow
+    (1, 1):     (0, 0, 0),     # black
+    (671, 382): (14, 8, 17),   # purple
+    (669, 383): (31, 30, 6),   # yellow
+    (671, 383): (12, 19, 31),  # light blue
+}
+
 
 async def reset_dut(dut):
     """Reset DUT (single cycle)"""
@@ -31,77 +52,10 @@ async def reset_dut(dut):
 
 @cocotb.test()  # pylint: disable=no-value-for-parameter
 async def pixel_colour(dut):
-    """Test display pixel colour"""
+    """Test display pixel colour for the whole frame"""
     cocotb.start_soon(Clock(dut.clk, SYS_TIME, unit="ns").start())
     await reset_dut(dut)
 
-    # await start of active pixels
-    while not dut.de.value:
-        await RisingEdge(dut.clk)
-    # await middle of clock before sampling colour
-    await Timer(SYS_TIME >> 1, unit='ns')
-
-    # pixel line 0
-    assert_coord(dut, 0, 0)
-    assert_pixel(dut, 14, 8, 17)  # purple
-    await Timer(SYS_TIME, unit='ns')
-    assert_coord(dut, 1, 0)
-    assert_pixel(dut, 12, 19, 31)  # light blue
-    await Timer(SYS_TIME, unit='ns')
-    assert_coord(dut, 2, 0)
-    assert_pixel(dut, 31, 30, 6)  # yellow
-    await Timer(SYS_TIME, unit='ns')
-    assert_coord(dut, 3, 0)
-    assert_pixel(dut, 31, 30, 6)  # yellow
-    await Timer((DISP_LINE-3)*SYS_TIME, unit='ns')  # wait the rest of the line
-
-    # pixel line 1
-    assert_coord(dut, 0, 1)
-    assert_pixel(dut, 12, 19, 31)  # light blue
-    await Timer(SYS_TIME, unit='ns')
-    assert_coord(dut, 1, 1)
-    assert_pixel(dut, 0, 0, 0)  # black
-    await Timer((DISP_LINE-1)*SYS_TIME, unit='ns')  # wait the rest of the line
-
-    # pixel line 2
-    assert_coord(dut, 0, 2)
-    assert_pixel(dut, 31, 30, 6)  # yellow
-    await Timer(DISP_LINE*SYS_TIME, unit='ns')  # wait the rest of the line
-
-    # pixel line 3
-    assert_coord(dut, 0, 3)
-    assert_pixel(dut, 31, 30, 6)  # yellow
-
-    # skip to bottom of display
-    await Timer(377*DISP_LINE*SYS_TIME + 671*SYS_TIME, unit='ns')  # 380=377+3 lines from above
-
-    # pixel line 380
-    assert_coord(dut, 671, 380)
-    assert_pixel(dut, 31, 30, 6)  # yellow
-    await Timer(DISP_LINE*SYS_TIME, unit='ns')  # move down one line
-
-    # pixel line 381
-    assert_coord(dut, 671, 381)
-    assert_pixel(dut, 31, 30, 6)  # yellow
-    await Timer(DISP_LINE*SYS_TIME, unit='ns')  # move down one line
-
-    # pixel line 382
-    assert_coord(dut, 671, 382)
-    assert_pixel(dut, 14, 8, 17)  # purple
-    await Timer((DISP_LINE-3)*SYS_TIME, unit='ns')  # move down one line and left 3 pixels
-
-    # pixel line 383
-    assert_coord(dut, 668, 383)
-    assert_pixel(dut, 31, 30, 6)  # yellow
-    await Timer(SYS_TIME, unit='ns')
-    assert_coord(dut, 669, 383)
-    assert_pixel(dut, 31, 30, 6)  # yellow
-    await Timer(SYS_TIME, unit='ns')
-    assert_coord(dut, 670, 383)
-    assert_pixel(dut, 14, 8, 17)  # purple
-    await Timer(SYS_TIME, unit='ns')
-    assert_coord(dut, 671, 383)
-    assert_pixel(dut, 12, 19, 31)  # light blue
-
-    # wait one more line to complete waveform
-    await Timer(DISP_LINE*SYS_TIME, unit='ns')
+    frame = await capture_frame(dut, (DISP_HRES, DISP_VRES))
+    assert_frame_pixels(frame, PIXELS)
+    assert_frame(frame, bitmap_frame(BITMAP, PALETTE, (DISP_HRES, DISP_VRES), CANV_BPP))
@@ -4,10 +4,21 @@
 
 """Chapter 3 Test Bench (cocotb)"""
 
+import sys
+from pathlib import Path
+
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
-from tests.helpers import assert_coord, assert_pixel, zero_vram
+from cocotb.triggers import FallingEdge, RisingEdge
+from tests.helpers import (assert_frame, assert_frame_pixels, capture_frame, format_profile,
+    load_memory, profile_pc, read_listing, zero_vram)
+
+# erasm and its cycle estimator (erasm --cycles)
+sys.path.append(str(Path(__file__).parent / "../../../tools/erasm"))
+# pylint: disable=wrong-import-position,wrong-import-order,import-error
+from erasm import asm_instrs, asm_source, pack_words
+from ercost import estimate
+# pylint: enable=wrong-import-position,wrong-import-order,import-error
 
 # clock frequencies
 # NB. system clock needs to be faster, otherwise drawing isn't done in time for tests
@@ -15,10 +26,47 @@ SYS_TIME = 10  # 10 ns is 100 MHz
 PIX_TIME = 20  # 20 ns is 50 MHz
 
 # 672x384 (DISPLAY_MODE=3)
+DISP_HRES   = 672  # horizontal resolution
+DISP_VRES   = 384  # vertical resolution
 DISP_LINE   = 825  # horizontal line including blanking
 DISP_HBLANK = 153  # horizontal blanking
 DISP_VBLANK =  20  # vertical blanking
 
+# drawing source (FILE_ER_LIST in ch03.mk) and erasm listing for profiling
+SOURCE = Path(__file__).parent / "../../../res/drawings/basic-test.eas"
+LISTING = SOURCE.with_suffix(".lst")
+
+# drawings to compare erasm cycle estimates with Earthrise cycle_cnt
+CYCLE_DRAWINGS = {
+    'line':      ["lca 1", "x0 2", "y0 3", "x1 40", "y1 25", "draw line ca", "stop"],
+    'fast line': ["lca 2", "x0 70", "y0 20", "x1 9", "y1 20", "draw line ca", "stop"],
+    'circle':    ["lca 3", "x0 40", "y0 40", "r0 12", "draw circ ca", "stop"],
+    'circle filled': ["fca 1", "x0 90", "y0 40", "r0 17", "draw circf ca", "stop"],
+    'triangle':  ["lca 1", "x0 10", "y0 50", "x1 30", "y1 62", "x2 5", "y2 80",
+                  "draw tri ca", "stop"],
+    'triangle filled': ["fca 2", "x0 60", "y0 50", "x1 95", "y1 70", "x2 52", "y2 90",
+                  "draw trif ca", "stop"],
+}
+
+# golden frame: basic-test drawing through aqua-4 palette
+GOLDEN = Path(__file__).parent / "golden/ch03-basic-test.png"
+
+# pixel colours checked against the hardware before golden frames
+PIXELS = {
+    (2, 1):   (0, 11, 17),   # 0x1 pixel
+    (3, 1):   (0, 5, 11),    # 0x0
+    (2, 5):   (0, 23, 23),   # 0x2 horizontal line
+    (10, 5):  (0, 5, 11),    # 0x0
+    (14, 5):  (0, 23, 23),   # 0x2 rect outline
+    (15, 5):  (19, 30, 28),  # 0x3 rect fill
+    (22, 9):  (0, 11, 17),   # 0x1 triangle outline
+    (25, 9):  (19, 30, 28),  # 0x3 triangle fill
+    (4, 12):  (0, 11, 17),   # 0x1 diagonal line
+    (14, 12): (0, 23, 23),   # 0x2 circle outline
+    (16, 12): (19, 30, 28),  # 0x3 circle fill
+    (19, 12): (0, 5, 11),    # 0x0
+}
+
 
 async def reset_sys_dut(dut):
     """Reset DUT (single cycle)"""
@@ -42,166 +90,9 @@ async def reset_pix_dut(dut):
     await RisingEdge(dut.clk_pix)
 
 
-async def pixel_colour_line_1(dut):
-    """Test display pixel colour (line 1)"""
-    # pixel
-    assert_coord(dut, 0, 1)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 1, 1)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 2, 1)
-    assert_pixel(dut, 0, 11, 17)  # 0x1
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 3, 1)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer((DISP_LINE-3)*PIX_TIME, unit='ns')  # wait the rest of the line
-
-
-async def pixel_colour_line_5(dut):
-    """Test display pixel colour (line 5)"""
-    # horizontal line
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 1, 5)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 2, 5)
-    assert_pixel(dut, 0, 23, 23)  # 0x2
-    await Timer(7*PIX_TIME, unit='ns')
-    assert_coord(dut, 9, 5)
-    assert_pixel(dut, 0, 23, 23)  # 0x2
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 10, 5)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(3*PIX_TIME, unit='ns')
-    # rect
-    assert_coord(dut, 13, 5)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 14, 5)
-    assert_pixel(dut, 0, 23, 23)  # 0x2
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 15, 5)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(2*PIX_TIME, unit='ns')
-    assert_coord(dut, 17, 5)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 18, 5)
-    assert_pixel(dut, 0, 23, 23)  # 0x2
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 19, 5)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(2*PIX_TIME, unit='ns')
-    # triangle
-    assert_coord(dut, 21, 5)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 22, 5)
-    assert_pixel(dut, 0, 11, 17)  # 0x1
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 23, 5)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 24, 5)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 25, 5)
-    assert_pixel(dut, 0, 11, 17)  # 0x1
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 26, 5)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer((DISP_LINE-26)*PIX_TIME, unit='ns')  # wait the rest of the line
-
-
-async def pixel_colour_line_9(dut):
-    """Test display pixel colour (line 9)"""
-    # triangle
-    await Timer(21*PIX_TIME, unit='ns')
-    assert_coord(dut, 21, 9)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 22, 9)
-    assert_pixel(dut, 0, 11, 17)  # 0x1
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 23, 9)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 24, 9)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 25, 9)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 26, 9)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 27, 9)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 28, 9)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 29, 9)
-    assert_pixel(dut, 0, 11, 17)  # 0x1
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 30, 9)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer((DISP_LINE-30)*PIX_TIME, unit='ns')  # wait the rest of the line
-
-
-async def pixel_colour_line_12(dut):
-    """Test display pixel colour (line 12)"""
-    # diagonal line
-    assert_coord(dut, 0, 12)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 1, 12)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 2, 12)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 3, 12)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 4, 12)
-    assert_pixel(dut, 0, 11, 17)  # 0x1
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 5, 12)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(8*PIX_TIME, unit='ns')
-    # circle
-    assert_coord(dut, 13, 12)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 14, 12)
-    assert_pixel(dut, 0, 23, 23)  # 0x2
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 15, 12)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 16, 12)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 17, 12)
-    assert_pixel(dut, 19, 30, 28)  # 0x3
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 18, 12)
-    assert_pixel(dut, 0, 23, 23)  # 0x2
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 19, 12)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 20, 12)
-    assert_pixel(dut, 0, 5, 11)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-
-
 @cocotb.test()  # pylint: disable=no-value-for-parameter
 async def pixel_colour(dut):
-    """Test display pixel colour"""
+    """Test display pixel colour for the whole frame"""
     dut.er_start.value = 0
     cocotb.start_soon(Clock(dut.clk_sys, SYS_TIME, unit="ns").start())
     await reset_sys_dut(dut)
@@ -212,30 +103,48 @@ async def pixel_colour(dut):
     await zero_vram(dut.vram_inst)
     await RisingEdge(dut.clk_sys)
 
-    # start Earthrise
+    # start Earthrise, profiling cycles by source line
+    profile = cocotb.start_soon(profile_pc(dut.clk_sys, dut.er_pc, dut.er_busy, dut.er_enable))
     dut.er_start.value = 1
     await RisingEdge(dut.clk_sys)
     dut.er_start.value = 0
     await RisingEdge(dut.clk_sys)
+    cycles = await profile
+    listing = read_listing(LISTING)
+    assert all(addr in listing for addr in cycles if addr >= 0)
+    cocotb.log.info("Earthrise profile: %s", format_profile(cycles, listing))
+
+    frame = await capture_frame(dut, (DISP_HRES, DISP_VRES))
+    assert_frame_pixels(frame, PIXELS)
+    assert_frame(frame, GOLDEN)
 
-    # await start of active pixels
-    while not dut.de.value:
-        await RisingEdge(dut.clk_pix)
-    # await middle of clock before sampling colour
-    await Timer(PIX_TIME >> 1, unit='ns')
 
-    # line 1
-    await Timer(1*DISP_LINE*PIX_TIME, unit='ns')
-    await pixel_colour_line_1(dut)
+async def run_earthrise(dut):
+    """Start Earthrise and wait for it to finish; returns its cycle_cnt."""
+    dut.er_start.value = 1
+    await RisingEdge(dut.clk_sys)
+    dut.er_start.value = 0
+    await RisingEdge(dut.er_busy)
+    await FallingEdge(dut.er_busy)
+    return dut.earthrise_inst.cycle_cnt.value.to_unsigned()
 
-    # line 5
-    await Timer(3*DISP_LINE*PIX_TIME, unit='ns')
-    await pixel_colour_line_5(dut)
 
-    # line 9
-    await Timer(3*DISP_LINE*PIX_TIME, unit='ns')
-    await pixel_colour_line_9(dut)
+@cocotb.test()  # pylint: disable=no-value-for-parameter
+async def cycle_count(dut):
+    """Test erasm cycle estimates match Earthrise cycle_cnt"""
+    dut.er_start.value = 0
+    cocotb.start_soon(Clock(dut.clk_sys, SYS_TIME, unit="ns").start())
+    await reset_sys_dut(dut)
+    await zero_vram(dut.vram_inst)
 
-    # line 12
-    await Timer(2*DISP_LINE*PIX_TIME, unit='ns')
-    await pixel_colour_line_12(dut)
+    # basic-test is already in the command list (FILE_ER_LIST)
+    cycles = await run_earthrise(dut)
+    expect = estimate(asm_source(str(SOURCE))).cycles
+    assert cycles == expect, f"basic-test: cycle_cnt {cycles} is not estimate {expect}."
+
+    for name, src in CYCLE_DRAWINGS.items():
+        instrs = asm_instrs(src)
+        await load_memory(dut.erlist_inst, pack_words(instrs))
+        cycles = await run_earthrise(dut)
+        expect = estimate(instrs).cycles
+        assert cycles == expect, f"{name}: cycle_cnt {cycles} is not estimate {expect}."
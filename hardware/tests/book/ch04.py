@@ -4,20 +4,38 @@
 
 """Chapter 4 Test Bench (cocotb)"""
 
+from pathlib import Path
+
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
-from tests.helpers import assert_coord, assert_pixel
+from cocotb.triggers import RisingEdge
+from tests.helpers import assert_frame, assert_frame_pixels, capture_frame
 
 # clock frequencies
 SYS_TIME = 50  # 50 ns is 20 MHz
 PIX_TIME = 20  # 20 ns is 50 MHz
 
 # 672x384 (DISPLAY_MODE=3)
+DISP_HRES   = 672  # horizontal resolution
+DISP_VRES   = 384  # vertical resolution
 DISP_LINE   = 825  # horizontal line including blanking
 DISP_HBLANK = 153  # horizontal blanking
 DISP_VBLANK =  20  # vertical blanking
 
+# golden frame: edge textmap in Unifont ROM through go-16 palette
+GOLDEN = Path(__file__).parent / "golden/ch04-edge.png"
+
+# pixel colours checked against the hardware before golden frames
+PIXELS = {
+    (0, 0):     (0, 22, 13),   # 0x5
+    (1, 0):     (3, 2, 3),     # 0x0
+    (15, 0):    (31, 22, 0),   # 0xD
+    (671, 0):   (23, 13, 21),  # 0x7
+    (16, 2):    (3, 2, 3),     # 0x0
+    (8, 383):   (25, 14, 2),   # 0xC
+    (671, 383): (13, 7, 18),   # 0x6
+}
+
 
 async def reset_sys_dut(dut):
     """Reset DUT (single cycle)"""
@@ -41,140 +59,14 @@ async def reset_pix_dut(dut):
     await RisingEdge(dut.clk_pix)
 
 
-async def pixel_colour_line_0(dut):
-    """Test display pixel colour (line 0)"""
-    assert_coord(dut, 0, 0)
-    assert_pixel(dut, 0, 22, 13)  # 0x5
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 1, 0)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(14*PIX_TIME, unit='ns')
-    assert_coord(dut, 15, 0)
-    assert_pixel(dut, 31, 22, 00)  # 0xD
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 16, 0)
-    assert_pixel(dut, 0, 22, 13)  # 0x5
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 17, 0)
-    assert_pixel(dut, 0, 22, 13)  # 0x5
-    await Timer(6*PIX_TIME, unit='ns')
-    assert_coord(dut, 23, 0)
-    assert_pixel(dut, 0, 22, 13)  # 0x5
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 24, 0)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(646*PIX_TIME, unit='ns')
-    assert_coord(dut, 670, 0)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 671, 0)
-    assert_pixel(dut, 23, 13, 21)  # 0x7
-    await Timer((DISP_LINE-671)*PIX_TIME, unit='ns')  # wait the rest of the line
-
-
-async def pixel_colour_line_1(dut):
-    """Test display pixel colour (line 1)"""
-    assert_coord(dut, 0, 1)
-    assert_pixel(dut, 0, 22, 13)  # 0x5
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 1, 1)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(14*PIX_TIME, unit='ns')
-    assert_coord(dut, 15, 1)
-    assert_pixel(dut, 31, 22, 00)  # 0xD
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 16, 1)
-    assert_pixel(dut, 0, 22, 13)  # 0x5
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 17, 1)
-    assert_pixel(dut, 0, 22, 13)  # 0x5
-    await Timer(6*PIX_TIME, unit='ns')
-    assert_coord(dut, 23, 1)
-    assert_pixel(dut, 0, 22, 13)  # 0x5
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 24, 1)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(646*PIX_TIME, unit='ns')
-    assert_coord(dut, 670, 1)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 671, 1)
-    assert_pixel(dut, 23, 13, 21)  # 0x7
-    await Timer((DISP_LINE-671)*PIX_TIME, unit='ns')  # wait the rest of the line
-
-
-async def pixel_colour_line_2(dut):
-    """Test display pixel colour (line 2)"""
-    assert_coord(dut, 0, 2)
-    assert_pixel(dut, 0, 22, 13)  # 0x5
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 1, 2)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(14*PIX_TIME, unit='ns')
-    assert_coord(dut, 15, 2)
-    assert_pixel(dut, 31, 22, 00)  # 0xD
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 16, 2)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 17, 2)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(6*PIX_TIME, unit='ns')
-    assert_coord(dut, 23, 2)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 24, 2)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(646*PIX_TIME, unit='ns')
-    assert_coord(dut, 670, 2)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(PIX_TIME, unit='ns')
-    assert_coord(dut, 671, 2)
-    assert_pixel(dut, 23, 13, 21)  # 0x7
-    await Timer((DISP_LINE-671)*PIX_TIME, unit='ns')  # wait the rest of the line
-
-
-async def pixel_colour_line_383(dut):
-    """Test display pixel colour (line 383)"""
-    assert_coord(dut, 0, 383)
-    assert_pixel(dut, 3, 2, 3)  # 0x0
-    await Timer(8*PIX_TIME, unit='ns')
-    assert_coord(dut, 8, 383)
-    assert_pixel(dut, 25, 14, 2)  # 0xC
-    await Timer(663*PIX_TIME, unit='ns')
-    assert_coord(dut, 671, 383)
-    assert_pixel(dut, 13, 7, 18)  # 0x6
-    await Timer((DISP_LINE-671)*PIX_TIME, unit='ns')  # wait the rest of the line
-
-
 @cocotb.test()  # pylint: disable=no-value-for-parameter
 async def pixel_colour(dut):
-    """Test display pixel colour"""
+    """Test display pixel colour for the whole frame"""
     cocotb.start_soon(Clock(dut.clk_sys, SYS_TIME, unit="ns").start())
     await reset_sys_dut(dut)
     cocotb.start_soon(Clock(dut.clk_pix, PIX_TIME, unit="ns").start())
     await reset_pix_dut(dut)
 
-    # await start of active pixels
-    while not dut.de.value:
-        await RisingEdge(dut.clk_pix)
-    # await middle of clock before sampling colour
-    await Timer(PIX_TIME >> 1, unit='ns')
-
-    # pixel line 0
-    await pixel_colour_line_0(dut)
-
-    # pixel line 1
-    await pixel_colour_line_1(dut)
-
-    # pixel line 2
-    await pixel_colour_line_2(dut)
-
-    # skip to bottom of display
-    await Timer(380*DISP_LINE*PIX_TIME, unit='ns')
-
-    # pixel line 383
-    await pixel_colour_line_383(dut)
-
-    # wait one more line to complete waveform
-    await Timer(DISP_LINE*PIX_TIME, unit='ns')
+    frame = await capture_frame(dut, (DISP_HRES, DISP_VRES))
+    assert_frame_pixels(frame, PIXELS)
+    assert_frame(frame, GOLDEN)
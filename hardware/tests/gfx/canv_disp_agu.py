@@ -4,14 +4,20 @@
 
 """canv_disp_agu Test Bench (cocotb)"""
 
+# NB. Expected vram_addr, pix_idx, and paint for a whole frame are NumPy
+#     arrays computed from CanvasParams. Each test drives the display
+#     coordinates, samples all three outputs every clock, then checks the lot
+#     in one go, so even a full display runs in normal test time.
+
 import dataclasses
 from dataclasses import dataclass
 
+import numpy as np
+
 import cocotb
 
 from cocotb.clock import Clock
-from cocotb.triggers import ReadOnly, RisingEdge
-from cocotb.types import Logic
+from cocotb.triggers import RisingEdge
 
 from tests.helpers import Coords
 
@@ -24,6 +30,8 @@ CLUT_LAT = 1
 VRAM_LAT = 3
 DISP_LAT = CLUT_LAT + VRAM_LAT
 
+TEST_INFO = 1  # display info for first few mismatches
+
 @dataclass(frozen=True)
 class CanvasParams:  # pylint: disable=too-many-instance-attributes
     """Hold canvas parameters."""
@@ -108,7 +116,7 @@ LARGE_CANV = CanvasParams (
     scale = Coords(x=2, y=2),
 )
 
-# this is very slow, so don't run routinely
+# full display tests check one frame
 FULL_DISP = CanvasParams (
     addr_base = 0x201,
     addr_shift = 4,  # 4 colour
@@ -120,21 +128,58 @@ FULL_DISP = CanvasParams (
     scale = Coords(x=2, y=2),
 )
 
+FULL_DISP_1X1Y = CanvasParams (
+    addr_base = 0x201,
+    addr_shift = 4,  # 4 colour
+    canv_dims = Coords(x=640, y=360),  # canvas ends before window
+    disp_start = Coords(x=-153, y=-20),
+    disp_end = Coords(x=671, y=383),
+    win_start = Coords(x=1, y=1),
+    win_end = Coords(x=671, y=383),
+    scale = Coords(x=1, y=1),
+)
+
+FULL_DISP_3X2Y = CanvasParams (
+    addr_base = 0x0,
+    addr_shift = 3,  # 16 colour
+    canv_dims = Coords(x=224, y=192),  # canvas covers window
+    disp_start = Coords(x=-153, y=-20),
+    disp_end = Coords(x=671, y=383),
+    win_start = Coords(x=0, y=0),
+    win_end = Coords(x=672, y=384),
+    scale = Coords(x=3, y=2),
+)
+
+
+def paint_area(p, dx, dy, lat):
+    """Canvas paint area (intersection of window and scaled canvas) lat cycles on."""
+    scale_x, scale_y = p.scale.x or 1, p.scale.y or 1  # matches hardware behaviour
+    x, y = dx + lat, dy
+    in_x = (p.win_start.x <= x) & (x < min(p.win_end.x, p.win_start.x + p.canv_dims.x * scale_x))
+    in_y = (p.win_start.y <= y) & (y < min(p.win_end.y, p.win_start.y + p.canv_dims.y * scale_y))
+    return in_y & in_x
+
 
-def expected_addr(p, dx, dy, scale_x, scale_y):
-    """Expected address for pixel in paint area."""
+def expected_frame(p):
+    """Expected vram_addr, pix_idx, and paint (rows, cols) for one frame of display coords.
+
+    Also returns where vram_addr and pix_idx matter: pixels the canvas
+    paints DISP_LAT cycles later. paint is checked everywhere.
+    """
+    scale_x, scale_y = p.scale.x or 1, p.scale.y or 1
+    dx = np.arange(p.disp_start.x, p.disp_end.x + 1)
+    dy = np.arange(p.disp_start.y, p.disp_end.y + 1)[:, None]
     # correct canvas paint position for latency and scale
     cx = (dx + DISP_LAT - p.win_start.x) // scale_x
     cy = (dy - p.win_start.y) // scale_y
-    # calculate buffer position, accounting for wrapping
-    bx = (p.scroll.x + cx) % p.canv_dims.x
-    by = (p.scroll.y + cy) % p.canv_dims.y
-    # calculate pixel address and separate into address and pixel index
-    addr_pix = by * p.canv_dims.x + bx
-    addr = p.addr_base + (addr_pix >> p.addr_shift)
-    pix_idx_mask = (1 << p.addr_shift) - 1
-    pix_idx = addr_pix & pix_idx_mask
-    return addr, pix_idx
+    # buffer position, accounting for wrapping, gives pixel address
+    bx, by = (p.scroll.x + cx) % p.canv_dims.x, (p.scroll.y + cy) % p.canv_dims.y
+    pix_addr = by * p.canv_dims.x + bx
+    addr = p.addr_base + (pix_addr >> p.addr_shift)
+    pix_idx = pix_addr & ((1 << p.addr_shift) - 1)
+    paint = paint_area(p, dx, dy, CLUT_LAT)
+    return addr, pix_idx, paint.astype(np.int64), paint_area(p, dx, dy, DISP_LAT)
+
 
 async def setup_dut(dut, p):
     """Setup DUT with clock, reset, and initial values."""
@@ -172,56 +217,61 @@ async def setup_dut(dut, p):
     dut.scroll_addr.value = p.scroll.y * p.canv_dims.x
 
 
-async def run_addr_test(dut, p):
-    """Test canvas display AGU address calculation."""
+def sample(signal):
+    """Signal value as integer, or -1 if it isn't resolvable."""
+    value = signal.value
+    return value.to_unsigned() if value.is_resolvable else -1
 
-    await setup_dut(dut, p)
 
-    scale_x = p.scale.x or 1  # matches hardware behaviour
-    scale_y = p.scale.y or 1
-
-    for frame in range(2):  # test two frames
-        for dy in range(p.disp_start.y, p.disp_end.y+1):
-            for dx in range(p.disp_start.x, p.disp_end.x+1):
-                dut.dy.value = dy
+async def run_frames(dut, p, frames):
+    """Drive display coords for frames; returns vram_addr, pix_idx, paint (frames, rows, cols)."""
+    dys = range(p.disp_start.y, p.disp_end.y+1)
+    dxs = range(p.disp_start.x, p.disp_end.x+1)
+    outputs = (dut.vram_addr, dut.pix_idx, dut.paint)
+    samples = []
+    for _ in range(frames):
+        for dy in dys:
+            dut.dy.value = dy
+            for dx in dxs:
                 dut.dx.value = dx
-                dut.frame_start.value = int(
-                    dy == p.disp_start.y and dx == p.disp_start.x)
-                dut.line_start.value = int(dx == p.disp_start.x)
-
-                await ReadOnly()
-                vram_addr = dut.vram_addr.value
-                pix_idx = dut.pix_idx.value
-
-                in_window = (
-                    p.win_start.y <= dy < p.win_end.y
-                    and p.win_start.x <= dx+DISP_LAT < p.win_end.x
-                )
-                in_canv = (
-                    p.win_start.y <= dy < p.win_start.y + (p.canv_dims.y * scale_y)
-                    and p.win_start.x <= dx+DISP_LAT < p.win_start.x + (p.canv_dims.x * scale_x)
-                )
-
-                exp_addr, exp_pix_idx = expected_addr(p, dx, dy, scale_x, scale_y)
-
-                if in_window and in_canv:
-                    assert vram_addr.is_resolvable and int(vram_addr) == exp_addr, (
-                        f"vram_addr: '{vram_addr}' is not expected '{exp_addr}' "
-                        f"at ({dx}, {dy}) in frame={frame}!"
-                    )
-                    assert pix_idx.is_resolvable and int(pix_idx) == exp_pix_idx, (
-                        f"pix_idx: '{pix_idx}' is not expected '{exp_pix_idx}' "
-                        f"at ({dx}, {dy}) in frame={frame}!"
-                    )
-
+                if dx - p.disp_start.x < 2:  # flags high for first pixel only
+                    dut.frame_start.value = int(dy == p.disp_start.y and dx == p.disp_start.x)
+                    dut.line_start.value = int(dx == p.disp_start.x)
                 await RisingEdge(dut.clk_pix)
+                # registered outputs from the previous clock, as ReadOnly before this one
+                samples.append([sample(sig) for sig in outputs])
+    return np.array(samples).T.reshape((3, frames, len(dys), len(dxs)))
+
+
+async def run_agu_test(dut, p, frames=2):
+    """Test canvas display AGU address, pixel index, and paint for whole frames."""
+    await setup_dut(dut, p)
+    addr, pix_idx, paint, check = expected_frame(p)
+    dut_addr, dut_pix_idx, dut_paint = await run_frames(dut, p, frames)
+
+    bad = (check & ((dut_addr != addr) | (dut_pix_idx != pix_idx))) | (dut_paint != paint)
+    where = np.argwhere(bad)
+    if TEST_INFO:
+        for frame, row, col in where[:8]:
+            cocotb.log.info("(%d, %d) in frame=%d - DUT: addr=%d pix_idx=%d paint=%d, "
+                "expected: addr=%s pix_idx=%s paint=%d",
+                p.disp_start.x + col, p.disp_start.y + row, frame,
+                dut_addr[frame, row, col], dut_pix_idx[frame, row, col],
+                dut_paint[frame, row, col],
+                addr[row, col] if check[row, col] else '-',
+                pix_idx[row, col] if check[row, col] else '-', paint[row, col])
+    assert len(where) == 0, (
+        f"{len(where)} of {bad.size} pixels don't match expected (first at "
+        f"({p.disp_start.x + where[0][2]}, {p.disp_start.y + where[0][1]}) "
+        f"in frame={where[0][0]})!"
+    )
 
 
 @cocotb.test()  # pylint: disable=no-value-for-parameter
 @cocotb.parametrize(p=[SCALE_0X0Y, SCALE_1X1Y, SCALE_2X2Y, SCALE_4X4Y, SCALE_3X5Y, LARGE_CANV])
-async def canv_disp_agu_addr(dut, p):
-    """Test canvas display AGU address calculation."""
-    await run_addr_test(dut, p)
+async def canv_disp_agu(dut, p):
+    """Test canvas display AGU address, pixel index, and paint."""
+    await run_agu_test(dut, p)
 
 
 @cocotb.test()  # pylint: disable=no-value-for-parameter
@@ -231,45 +281,17 @@ async def canv_disp_agu_addr(dut, p):
     scrolled(SCALE_1X1Y, Coords(x=17, y=5)),
     scrolled(SCALE_3X5Y, Coords(x=5,  y=1))
 ])
-async def canv_disp_agu_scroll_addr(dut, p):
-    """Test canvas display AGU scrolled address calculation."""
-    await run_addr_test(dut, p)
+async def canv_disp_agu_scroll(dut, p):
+    """Test canvas display AGU with scrolling."""
+    await run_agu_test(dut, p)
 
 
 @cocotb.test()  # pylint: disable=no-value-for-parameter
-@cocotb.parametrize(p=[SCALE_0X0Y, SCALE_1X1Y, SCALE_2X2Y, SCALE_4X4Y, SCALE_3X5Y, LARGE_CANV])
-async def canv_disp_agu_paint(dut, p):
-    """Test canvas display AGU paint signal."""
-    await setup_dut(dut, p)
-
-    scale_x = p.scale.x or 1  # matches hardware behaviour
-    scale_y = p.scale.y or 1
-
-    for frame in range(2):  # test two frames
-        for dy in range(p.disp_start.y, p.disp_end.y+1):
-            for dx in range(p.disp_start.x, p.disp_end.x+1):
-                dut.dy.value = dy
-                dut.dx.value = dx
-                dut.frame_start.value = int(
-                    dy == p.disp_start.y and dx == p.disp_start.x)
-                dut.line_start.value = int(dx == p.disp_start.x)
-
-                await ReadOnly()
-                actual_paint = dut.paint.value
-
-                in_window_paint = (
-                    p.win_start.y <= dy < p.win_end.y
-                    and p.win_start.x <= dx+CLUT_LAT < p.win_end.x
-                )
-                in_canv = (
-                    p.win_start.y <= dy < p.win_start.y + (p.canv_dims.y * scale_y)
-                    and p.win_start.x <= dx+CLUT_LAT < p.win_start.x + (p.canv_dims.x * scale_x)
-                )
-                exp_paint = Logic(1) if (in_window_paint and in_canv) else Logic(0)
-
-                assert actual_paint.is_resolvable and actual_paint == exp_paint, (
-                    f"paint: '{actual_paint}' is not expected '{exp_paint}' "
-                    f"at ({dx}, {dy}) in frame={frame}!"
-                )
-
-                await RisingEdge(dut.clk_pix)
+@cocotb.parametrize(p=[
+    FULL_DISP,
+    FULL_DISP_1X1Y,
+    scrolled(FULL_DISP_3X2Y, Coords(x=101, y=37)),
+])
+async def canv_disp_agu_full(dut, p):
+    """Test canvas display AGU across a full display."""
+    await run_agu_test(dut, p, frames=1)
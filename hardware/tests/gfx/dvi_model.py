@@ -0,0 +1,208 @@
+# Isle.Computer - DVI Link Python Model
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+# NB. Models what dvi_generator puts on the wire: blue on channel 0, green on
+#     channel 1, red on channel 2, with {vsync, hsync} as channel 0 control.
+#     Symbol arrays are (..., 3) in channel order; serial bits go LSB first.
+#
+#     Decoding and statistics use 1024-entry tables indexed by symbol, so whole
+#     frames (or seconds of 1080p) are handled without a Python loop per symbol.
+
+"""DVI Link Python Model"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from cocotb.triggers import RisingEdge
+
+from display_data import DT
+from tmds_model import CTRL_TOKENS, TmdsEncoder, symbol_bits
+
+CLOCK_SYMBOL = 0b0000011111  # clock channel sends this every pixel
+DATA, INVALID = 4, -1  # symbol kinds; control tokens are kind 0-3 (ctrl value)
+SEARCH_SYMBOLS = 8192  # deserialise looks for symbol boundary in this many (over 3 lines at 1080p)
+
+
+def symbol_tables():
+    """Data byte, kind, ones, and transitions for all 1024 symbols."""
+    symbols = np.arange(1024)
+    data = np.zeros(1024, dtype=np.uint8)
+    kind = np.full(1024, INVALID, dtype=np.int8)
+    for ctrl, token in enumerate(CTRL_TOKENS):
+        kind[token] = ctrl
+    for bias_symbols in TmdsEncoder.SYMBOLS[:, :256]:  # every data symbol the encoder can send
+        kind[bias_symbols] = DATA
+        data[bias_symbols] = np.arange(256)
+    ones = symbol_bits(symbols).sum(axis=-1).astype(np.int8)
+    transitions = symbol_bits(symbols ^ (symbols >> 1))[:, :9].sum(axis=-1).astype(np.int8)
+    return data, kind, ones, transitions
+
+
+DATA_OF, KIND_OF, ONES_OF, TRANSITIONS_OF = symbol_tables()
+
+
+class Decoded(NamedTuple):
+    """Decoded DVI link: arrays with the leading shape of the symbols."""
+    rgb: np.ndarray    # (..., 3) uint8; zero in blanking
+    de: np.ndarray     # data enable
+    hsync: np.ndarray  # held through data periods, as a receiver does
+    vsync: np.ndarray
+    errors: np.ndarray  # invalid symbols or channels disagreeing on de
+
+
+class LinkStats(NamedTuple):
+    """Per-channel (3,) link statistics."""
+    disparity_min: np.ndarray  # running disparity (ones - zeros) over whole stream
+    disparity_max: np.ndarray
+    disparity_end: np.ndarray
+    data_disparity_max: np.ndarray  # largest |disparity| within a data period
+    data_transitions_max: np.ndarray  # most transitions in one data symbol
+    ctrl_transitions_min: np.ndarray  # fewest transitions in one control token
+    transitions_mean: np.ndarray  # serial transitions per symbol, including boundaries
+    invalid: np.ndarray  # count of symbols that are neither data nor control
+
+
+def sync_signals(mode):
+    """Data enable, hsync, and vsync (v_total, h_total) for display mode.
+
+    Mode is an index into display_data.DT or a dict of timings in the same
+    form. Lines start with horizontal blanking and frames with vertical
+    blanking, matching display_sync_gen.
+    """
+    dt = DT[mode] if isinstance(mode, int) else mode
+    x = np.arange(-dt['H_BLANK'], dt['HRES'])
+    y = np.arange(-dt['V_BLANK'], dt['VRES'])[:, None]
+    hs_start = -dt['H_BLANK'] + dt['H_FRONT']
+    vs_start = -dt['V_BLANK'] + dt['V_FRONT']
+    hsync = ((x >= hs_start) & (x < hs_start + dt['H_SYNC'])) == bool(dt['H_POL'])
+    vsync = ((y >= vs_start) & (y < vs_start + dt['V_SYNC'])) == bool(dt['V_POL'])
+    shape = (len(y), len(x))
+    return ((y >= 0) & (x >= 0), np.broadcast_to(hsync, shape),
+        np.broadcast_to(vsync, shape))
+
+
+def encode(rgb, de, hsync, vsync, encoder=None):
+    """Encode RGB888 (..., 3) with control signals (...) to symbols (..., 3).
+
+    Pass a TmdsEncoder(3) to carry bias on between calls.
+    """
+    encoder = encoder or TmdsEncoder(3)
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    ctrl = np.zeros(rgb.shape, dtype=np.uint8)
+    ctrl[..., 0] = np.asarray(hsync, dtype=np.uint8) | (np.asarray(vsync, dtype=np.uint8) << 1)
+    return encoder.encode(rgb[..., ::-1], np.asarray(de)[..., None], ctrl)
+
+
+def encode_frame(image, mode, encoder=None):
+    """Encode RGB888 image (VRES, HRES, 3) as one frame of symbols (v_total, h_total, 3).
+
+    Pass a TmdsEncoder(3) to encode several frames in a row.
+    """
+    de, hsync, vsync = sync_signals(mode)
+    rgb = np.zeros(de.shape + (3,), dtype=np.uint8)
+    rgb[de] = np.asarray(image, dtype=np.uint8).reshape(-1, 3)
+    return encode(rgb, de, hsync, vsync, encoder)
+
+
+def decode(symbols):
+    """Decode symbols (..., 3) back to pixels and sync."""
+    symbols = np.asarray(symbols, dtype=np.uint16)
+    kind = KIND_OF[symbols]
+    is_data = kind == DATA
+    de = is_data[..., 0]
+    errors = (kind == INVALID).any(axis=-1) | (is_data.any(axis=-1) != is_data.all(axis=-1))
+    rgb = np.where(de[..., None], DATA_OF[symbols][..., ::-1], 0).astype(np.uint8)
+    # receivers hold sync through data periods: carry the last control value forwards
+    flat = kind[..., 0].reshape(-1)
+    last = np.maximum.accumulate(np.where(flat != DATA, np.arange(flat.size), 0))
+    ctrl = np.where(flat[last] == DATA, 0, flat[last]).reshape(de.shape) & 3
+    return Decoded(rgb, de, (ctrl & 1).astype(bool), (ctrl >> 1).astype(bool), errors)
+
+
+def decode_frames(symbols, size, v_pol=1):
+    """Complete frames (n, height, width, 3) between vsync assertions in symbols (..., 3).
+
+    Partial frames at either end are dropped; a frame with the wrong number
+    of pixels raises ValueError.
+    """
+    width, height = size
+    dec = decode(np.asarray(symbols).reshape(-1, 3))
+    vsync = dec.vsync == bool(v_pol)
+    starts = np.flatnonzero(vsync[1:] & ~vsync[:-1]) + 1
+    pixels = dec.rgb[dec.de]
+    # active pixels sent before each frame start
+    before = np.concatenate(([0], np.cumsum(dec.de)))[starts]
+    counts = np.diff(before)
+    if (bad := np.flatnonzero(counts != width * height)).size:
+        raise ValueError(f"frame {bad[0]} has {counts[bad[0]]} pixels, not {width}x{height}")
+    if len(before) and len(pixels) - before[-1] >= width * height:  # last frame complete
+        before = np.concatenate((before, [before[-1] + width * height]))
+    frames = [pixels[a:b] for a, b in zip(before, before[1:])]
+    return np.array(frames, dtype=np.uint8).reshape((-1, height, width, 3))
+
+
+def link_stats(symbols):
+    """DC balance and transition statistics for symbols (..., 3)."""
+    symbols = np.asarray(symbols, dtype=np.uint16).reshape(-1, 3)
+    kind = KIND_OF[symbols]
+    is_data = kind == DATA
+    disparity = 2 * ONES_OF[symbols].astype(np.int64) - 10
+    running = np.cumsum(disparity, axis=0)
+    # disparity within each data period: running disparity less its value at the last control
+    idx = np.arange(len(symbols))[:, None]
+    last_ctrl = np.maximum.accumulate(np.where(is_data, -1, idx), axis=0)
+    at_ctrl = np.where(last_ctrl >= 0, np.take_along_axis(running, np.maximum(last_ctrl, 0),
+        axis=0), 0)
+    data_disparity = np.abs(np.where(is_data, running - at_ctrl, 0))
+    transitions = TRANSITIONS_OF[symbols]
+    boundary = (symbols[:-1] >> 9) ^ (symbols[1:] & 1)  # last bit of one, first of next
+    ctrl = (kind >= 0) & ~is_data
+    return LinkStats(
+        disparity_min=running.min(axis=0),
+        disparity_max=running.max(axis=0),
+        disparity_end=running[-1],
+        data_disparity_max=data_disparity.max(axis=0),
+        data_transitions_max=np.where(is_data, transitions, 0).max(axis=0),
+        ctrl_transitions_min=np.where(ctrl, transitions, 10).min(axis=0),
+        transitions_mean=(transitions.sum(axis=0) + boundary.sum(axis=0)) / len(symbols),
+        invalid=(kind == INVALID).sum(axis=0),
+    )
+
+
+def serialise(symbols):
+    """Symbols (n, channels) to serial bits (n * 10, channels), LSB of each symbol first."""
+    symbols = np.asarray(symbols, dtype=np.uint16)
+    bits = symbol_bits(symbols)  # (n, channels, 10)
+    return bits.swapaxes(1, 2).reshape(-1, symbols.shape[1]).astype(np.uint8)
+
+
+def deserialise(bits, phase=None):
+    """Serial bits (n, channels) to symbols; finds the symbol boundary if phase is None.
+
+    The boundary is the bit offset where most control tokens line up in the
+    first SEARCH_SYMBOLS, so they need to include some blanking.
+    """
+    bits = np.asarray(bits, dtype=np.uint16)
+    if phase is None:
+        windows = np.lib.stride_tricks.sliding_window_view(bits[:10 * SEARCH_SYMBOLS], 10, axis=0)
+        every = (windows << np.arange(10, dtype=np.uint16)).sum(axis=-1)  # symbol at each offset
+        is_ctrl = (KIND_OF[every] >= 0) & (KIND_OF[every] != DATA)
+        offsets = np.arange(len(every)) % 10
+        phase = int(np.bincount(offsets, weights=is_ctrl.sum(axis=1), minlength=10).argmax())
+    count = (len(bits) - phase) // 10
+    groups = bits[phase:phase + count * 10].reshape(count, 10, -1)
+    return (groups << np.arange(10, dtype=np.uint16)[:, None]).sum(axis=1).astype(np.uint16)
+
+
+async def capture_symbols(clk, channels, count):
+    """Monitor: sample 10-bit symbol signals (e.g. encoder tmds outputs) every clk.
+
+    Returns symbols (count, len(channels)) ready for decode or decode_frames.
+    """
+    symbols = np.empty((count, len(channels)), dtype=np.uint16)
+    for i in range(count):
+        await RisingEdge(clk)
+        symbols[i] = [int(ch.value) for ch in channels]
+    return symbols
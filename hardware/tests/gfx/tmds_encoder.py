@@ -4,18 +4,28 @@
 
 """TMDS Encoder (DVI) Test Bench (cocotb)"""
 
-# NB. tmds_model.bias uses a static value for bias.
-#     You can't have more than one test for TMDS per Python run.
+# NB. Each test drives the whole stimulus while the capture_symbols monitor
+#     samples every DUT symbol into an array, then checks the lot against a
+#     fresh TmdsEncoder in one go.
+#     tmds_link treats the DUT as DVI channel 0 and decodes whole frames.
 
-import random
+import numpy as np
 
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge
 
-import tmds_model
+from dvi_model import capture_symbols, decode_frames, encode, link_stats, sync_signals
+from tmds_model import TmdsEncoder
 
-TEST_INFO = 1  # display TMDS info for passing test cycles
+TEST_INFO = 1  # display TMDS info for first few mismatches
+RANDOM_COUNT = 100_000  # symbols in random test
+
+# small display timings for DVI link test (positive sync polarity)
+LINK_TIMING = {
+    'HRES': 32, 'VRES': 8, 'H_POL': 1, 'H_BLANK': 8, 'H_FRONT': 2, 'H_SYNC': 3,
+    'V_POL': 1, 'V_BLANK': 3, 'V_FRONT': 1, 'V_SYNC': 1,
+}
 
 
 async def reset_dut(dut):
@@ -29,29 +39,74 @@ async def reset_dut(dut):
     await RisingEdge(dut.clk_pix)
 
 
-@cocotb.test()  # pylint: disable=no-value-for-parameter
-async def tmds_random(dut):
-    """Test 1000 random 8-bit pixel values."""
+async def encode_dut(dut, din, de, ctrl):
+    """Drive din, de, and ctrl_in (one value per cycle); returns DUT symbols as array."""
     cocotb.start_soon(Clock(dut.clk_pix, 1, unit="ns").start())
-    dut.ctrl_in.value = 0
+    dut.din.value, dut.de.value, dut.ctrl_in.value = 0, 0, 0
     await reset_dut(dut)
-    dut.de.value = 1
 
-    for i in range(1001):  # 1000 tests (but 1001 values of i to account for DUT latency)
-        pixel_dec = random.randrange(256)  # pixel value is in range 0-255
-        dut.din.value = pixel_dec
+    capture = cocotb.start_soon(capture_symbols(dut.clk_pix, [dut.tmds], len(din) + 1))
+    for d, e, c in zip(din.tolist(), de.tolist(), ctrl.tolist()):
+        dut.din.value, dut.de.value, dut.ctrl_in.value = d, e, c
         await RisingEdge(dut.clk_pix)
+    return (await capture)[1:, 0]  # first sample is from before the stimulus
+
+
+def check(din, de, ctrl, tmds):
+    """Check DUT symbols against model."""
+    model = TmdsEncoder().encode(din, de, ctrl)
+    bad = np.flatnonzero(tmds != model)
+    if TEST_INFO:
+        for i in bad[:8]:
+            cocotb.log.info("%6d: %02X de=%d ctrl=%d - DUT: %010b, Model: %010b",
+                i, din[i], de[i], ctrl[i], tmds[i], model[i])
+    assert len(bad) == 0, \
+        f"{len(bad)} of {len(tmds)} DUT symbols don't match model (first at {bad[0]})!"
+
+
+@cocotb.test()  # pylint: disable=no-value-for-parameter
+async def tmds_random(dut):
+    """Test random 8-bit pixel values."""
+    rng = np.random.default_rng(1)
+    din = rng.integers(256, size=RANDOM_COUNT, dtype=np.uint8)
+    de, ctrl = np.ones(RANDOM_COUNT, dtype=bool), np.zeros(RANDOM_COUNT, dtype=np.uint8)
+    check(din, de, ctrl, await encode_dut(dut, din, de, ctrl))
+
+
+@cocotb.test()  # pylint: disable=no-value-for-parameter
+async def tmds_control(dut):
+    """Test random runs of pixel and control data (control resets bias)."""
+    rng = np.random.default_rng(2)
+    runs = rng.integers(1, 40, size=2000)
+    de = (np.arange(len(runs)) % 2 == 0).repeat(runs)
+    din = rng.integers(256, size=len(de), dtype=np.uint8)
+    ctrl = rng.integers(4, size=len(de), dtype=np.uint8)
+    check(din, de, ctrl, await encode_dut(dut, din, de, ctrl))
+
+
+@cocotb.test()  # pylint: disable=no-value-for-parameter
+async def tmds_scanline(dut):
+    """Test gradient scanlines with blanking and sync (640x480 line timing)."""
+    line = np.zeros(800, dtype=np.uint8)
+    line[:640] = np.arange(640) * 255 // 639
+    de = np.arange(800) < 640
+    ctrl = np.where((np.arange(800) >= 656) & (np.arange(800) < 752), 0b01, 0b00)  # hsync
+    din, de, ctrl = np.tile(line, 4), np.tile(de, 4), np.tile(ctrl, 4).astype(np.uint8)
+    check(din, de, ctrl, await encode_dut(dut, din, de, ctrl))
+
+
+@cocotb.test()  # pylint: disable=no-value-for-parameter
+async def tmds_link(dut):
+    """Test frames with sync survive the link: DUT as channel 0 (blue, hsync, vsync)."""
+    rng = np.random.default_rng(3)
+    de, hsync, vsync = (np.tile(s, (3, 1)) for s in sync_signals(LINK_TIMING))  # 3 frames
+    rgb = np.where(de[..., None], rng.integers(256, size=de.shape + (3,), dtype=np.uint8), 0)
+    symbols = encode(rgb, de, hsync, vsync).reshape(-1, 3)  # model channels 1 and 2
+    din, ctrl = rgb[..., 2].ravel(), (hsync | (vsync << 1)).ravel().astype(np.uint8)
+    symbols[:, 0] = await encode_dut(dut, din, de.ravel(), ctrl)
 
-        if i >= 1:  # check DUT value against model one cycle later
-            model_pixel_dec = pixel_dec_prev
-            model_pixel_bin = tmds_model.bin_array_8(model_pixel_dec)
-            model_tmds = tmds_model.tmds(model_pixel_bin, model_pixel_dec)
-            model_bias = tmds_model.bias(model_tmds)
-            model_val = ''.join(map(str, reversed(model_bias)))
-            if TEST_INFO:
-                cocotb.log.info("%4d: %02X - DUT: %s, Model: %s", \
-                i, pixel_dec_prev, str(dut.tmds.value), model_val)
-            assert str(dut.tmds.value) == model_val, \
-                f"DUT {str(dut.tmds.value)} doesn't match model {model_val}!"
-
-        pixel_dec_prev = pixel_dec  # save previous value for comparison in next iteration
+    check(din, de.ravel(), ctrl, symbols[:, 0])
+    frames = decode_frames(symbols, (LINK_TIMING['HRES'], LINK_TIMING['VRES']))
+    assert np.array_equal(frames, rgb[de].reshape(frames.shape)), "decoded frames don't match"
+    stats = link_stats(symbols)
+    assert stats.invalid[0] == 0 and stats.data_transitions_max[0] <= 5, stats
@@ -2,96 +2,159 @@
 # Copyright Will Green and Isle Contributors
 # SPDX-License-Identifier: MIT
 
-# NB. [0:7] is 7 elements in Python, but 8 in Verilog.
-#     bias function uses a static value.
+# NB. Symbols are 10-bit integers with bit 0 sent first.
+#     The encoder's only state is the DC bias of each channel, so TmdsEncoder
+#     looks up the output symbol and next bias for every (bias, byte) pair in
+#     tables built once from the scalar model. Control periods are table
+#     inputs 256-259, so data and control encode with the same lookup.
+#
+#     Bias is serial: each symbol depends on the one before. To vectorise, a
+#     stream is split into chunks, and every chunk is run from every reachable
+#     bias at once (one NumPy lookup per symbol position). The real bias at the
+#     start of each chunk then follows from the chunk before.
 
 """DVI TMDS Encoder Python Model"""
 
-def static_vars(**kwargs):
-    """Static variable decorator."""
-    def decorate(func):
-        for key, value in kwargs.items():
-            setattr(func, key, value)
-        return func
-    return decorate
+import numpy as np
+
+CTRL_TOKENS = (0b1101010100, 0b0010101011, 0b0101010100, 0b1010101011)  # ctrl 0-3
+BIAS_BITS = 5  # tmds_encoder.v bias register (signed)
+BIAS_MIN, BIAS_MAX = -(1 << (BIAS_BITS - 1)), (1 << (BIAS_BITS - 1)) - 1
+BIAS_STATES = 1 << BIAS_BITS
+
 
 def bin_array_8(integer):
     """Convert integer into fixed-length 8-bit binary array. LSB in [0]."""
-    b_array = [int(i) for i in reversed(bin(integer)[2:])]
-    return b_array + [0 for _ in range(8 - len(b_array))]
+    return [(integer >> i) & 1 for i in range(8)]
 
-def tmds(pixel_bin, pixel_dec, log=False):
-    """
-    Convert pixel_bin (d) to q_m as per DVI spec.
-    Perform base TMDS encoding. Does not balance.
-    """
-    q_m = [None] * 9
-    one_cnt_d = sum(pixel_bin)
-    if one_cnt_d > 4 or (one_cnt_d == 4 and pixel_bin[0] == 0):
-        if log:
-            print(f"{pixel_dec:3}: XNOR(", end='')
-        q_m[0] = pixel_bin[0]
-        q_m[1] = int(q_m[0] == pixel_bin[1])
-        q_m[2] = int(q_m[1] == pixel_bin[2])
-        q_m[3] = int(q_m[2] == pixel_bin[3])
-        q_m[4] = int(q_m[3] == pixel_bin[4])
-        q_m[5] = int(q_m[4] == pixel_bin[5])
-        q_m[6] = int(q_m[5] == pixel_bin[6])
-        q_m[7] = int(q_m[6] == pixel_bin[7])
-        q_m[8] = 0  # using XNOR == 0
-    else:
-        if log:
-            print(f"{pixel_dec:3}: XOR (", end='')
-        q_m[0] = pixel_bin[0]
-        q_m[1] = int(q_m[0] ^ pixel_bin[1])
-        q_m[2] = int(q_m[1] ^ pixel_bin[2])
-        q_m[3] = int(q_m[2] ^ pixel_bin[3])
-        q_m[4] = int(q_m[3] ^ pixel_bin[4])
-        q_m[5] = int(q_m[4] ^ pixel_bin[5])
-        q_m[6] = int(q_m[5] ^ pixel_bin[6])
-        q_m[7] = int(q_m[6] ^ pixel_bin[7])
-        q_m[8] = 1  # using XOR == 1
-    return q_m
-
-@static_vars(bias=0)
-def bias(q_m, log=False):
+
+def encode_qm(d):
+    """Transition-minimise byte d to 9-bit q_m as per DVI spec; q_m[8] is 1 for XOR."""
+    ones = bin(d).count('1')
+    use_xnor = ones > 4 or (ones == 4 and d & 1 == 0)
+    q_m = d & 1
+    for i in range(1, 8):
+        bit = ((q_m >> (i - 1)) ^ (d >> i) ^ use_xnor) & 1
+        q_m |= bit << i
+    return q_m | (0 if use_xnor else 1 << 8)
+
+
+def wrap_bias(bias):
+    """Wrap bias to the encoder's signed bias register."""
+    return (bias - BIAS_MIN) % BIAS_STATES + BIAS_MIN
+
+
+def balance(q_m, bias):
+    """DC balance q_m as per DVI spec; returns (10-bit symbol, next bias, case)."""
+    ones = bin(q_m & 0xFF).count('1')
+    disparity = 2 * ones - 8
+    xor = q_m >> 8
+    if bias == 0 or disparity == 0:
+        if xor:
+            return (0b01 << 8) | (q_m & 0xFF), wrap_bias(bias + disparity), 'A0'
+        return (0b10 << 8) | (~q_m & 0xFF), wrap_bias(bias - disparity), 'A1'
+    if (bias > 0 and disparity > 0) or (bias < 0 and disparity < 0):
+        return (1 << 9) | (xor << 8) | (~q_m & 0xFF), wrap_bias(bias + 2 * xor - disparity), 'B1'
+    return (xor << 8) | (q_m & 0xFF), wrap_bias(bias - 2 * (1 - xor) + disparity), 'B0'
+
+
+def tables():
+    """Symbol and next bias index for every (bias index, input); bias index is bias - BIAS_MIN.
+
+    Inputs 0-255 are data bytes and 256-259 are control periods with ctrl 0-3.
     """
-    Convert q_m to q_out as per DVI spec.
-    Perform TMDS balancing to handle bias. Generate one of 460 10-bit outputs.
+    symbols = np.zeros((BIAS_STATES, 256 + len(CTRL_TOKENS)), dtype=np.uint16)
+    nexts = np.zeros((BIAS_STATES, 256 + len(CTRL_TOKENS)), dtype=np.uint8)
+    for d in range(256):
+        q_m = encode_qm(d)
+        for b in range(BIAS_STATES):
+            sym, nxt, _ = balance(q_m, b + BIAS_MIN)
+            symbols[b, d], nexts[b, d] = sym, nxt - BIAS_MIN
+    symbols[:, 256:] = CTRL_TOKENS
+    nexts[:, 256:] = -BIAS_MIN  # control resets bias
+    return symbols, nexts
+
+
+def reachable(nexts):
+    """Bias indexes reachable from zero bias (sorted)."""
+    states = {-BIAS_MIN}
+    while (more := states | set(nexts[sorted(states)].ravel().tolist())) != states:
+        states = more
+    return sorted(states)
+
+
+class TmdsEncoder:
+    """Table-driven TMDS encoder holding the DC bias of each channel.
+
+    Data is encoded in time order along the leading axes; the last axis is the
+    channel when there's more than one. Control periods (de low) send the
+    ctrl token and reset bias, as tmds_encoder.v does.
     """
-    q_out = [None] * 10
-    one_cnt = sum(q_m[0:8])
-    zero_cnt = 8 - one_cnt
-
-    if bias.bias == 0 or one_cnt == 4:
-        q_out[9] = int(not q_m[8])
-        q_out[8] = q_m[8]
-        if q_m[8] == 0:
-            if log:
-                print(f"{one_cnt},{bias.bias:2}, A1) ", end='')
-            q_out[:8] = [int(not i) for i in q_m[:8]]  # inverted q_m[:8]
-            bias.bias = bias.bias + zero_cnt - one_cnt
-        else:
-            if log:
-                print(f"{one_cnt},{bias.bias:2}, A0) ", end='')
-            q_out[:8] = q_m[:8]
-            bias.bias = bias.bias + one_cnt - zero_cnt
-    else:
-        if (bias.bias > 0 and one_cnt > zero_cnt) or (bias.bias < 0 and one_cnt < zero_cnt):
-            if log:
-                print(f"{one_cnt},{bias.bias:2}, B1) ", end='')
-            q_out[9] = 1
-            q_out[8] = q_m[8]
-            q_out[:8] = [int(not i) for i in q_m[:8]]  # inverted q_m[:8]
-            bias.bias = bias.bias + 2 * q_m[8] + zero_cnt - one_cnt
-        else:
-            if log:
-                print(f"{one_cnt},{bias.bias:2}, B0) ", end='')
-            q_out[9] = 0
-            q_out[8] = q_m[8]
-            q_out[:8] = q_m[:8]
-            bias.bias = bias.bias - 2 * (not q_m[8]) + one_cnt - zero_cnt
-    return q_out
+    SYMBOLS, NEXTS = tables()
+    REACHABLE = np.array(reachable(NEXTS), dtype=np.uint8)  # bias is even and within +/-8
+
+    def __init__(self, channels=1, chunk=1024):
+        self.channels = channels
+        self.chunk = chunk  # stream chunk length for vectorising
+        self.bias = np.zeros(channels, dtype=np.int64)
+
+    def reset(self):
+        """Reset bias, as rst_pix does."""
+        self.bias[:] = 0
+
+    def encode(self, data, de=True, ctrl=0):
+        """Encode data (uint8) to 10-bit symbols (uint16) of the same shape.
+
+        de and ctrl broadcast against data (ctrl is per channel, e.g. hsync and
+        vsync on channel 0); bias carries on from the previous call.
+        """
+        data = np.asarray(data, dtype=np.uint8)
+        shape = data.shape
+        de = np.broadcast_to(np.asarray(de, dtype=bool), shape)
+        ctrl = np.broadcast_to(np.asarray(ctrl, dtype=np.uint8), shape)
+        inputs = np.where(de, data, 256 + (ctrl & 3).astype(np.uint16)).reshape(-1, self.channels)
+        out = np.empty(inputs.shape, dtype=np.uint16)
+        for c in range(self.channels):
+            out[:, c], end = self.encode_stream(inputs[:, c], int(self.bias[c]) - BIAS_MIN)
+            self.bias[c] = end + BIAS_MIN
+        return out.reshape(shape)
+
+    def encode_stream(self, inputs, start):
+        """Encode one channel's table inputs from bias index start; returns (symbols, end index)."""
+        n = len(inputs)
+        if n == 0:
+            return np.empty(0, dtype=np.uint16), start
+        length = min(self.chunk, n)
+        count = -(-n // length)
+        inputs = np.pad(inputs, (0, count * length - n)).reshape(count, length)
+
+        # pass 1: end bias of each chunk from every reachable start bias (count, states)
+        states = np.broadcast_to(self.REACHABLE, (count, len(self.REACHABLE)))
+        for t in range(length):
+            states = self.NEXTS[states, inputs[:, t, None]]
+        # chunk start biases follow from the chunk before
+        column = np.zeros(BIAS_STATES, dtype=np.int64)
+        column[self.REACHABLE] = np.arange(len(self.REACHABLE))
+        state = np.empty(count, dtype=np.uint8)
+        state[0] = start
+        for k in range(1, count):
+            state[k] = states[k - 1, column[state[k - 1]]]
+
+        # pass 2: symbols from the real start bias of each chunk
+        out = np.empty((count, length), dtype=np.uint16)
+        last, end = (n - 1) % length, start  # last real input in final chunk (rest is padding)
+        for t in range(length):
+            out[:, t] = self.SYMBOLS[state, inputs[:, t]]
+            state = self.NEXTS[state, inputs[:, t]]
+            if t == last:
+                end = int(state[-1])
+        return out.reshape(-1)[:n], end
+
+
+def symbol_bits(symbols):
+    """Unpack 10-bit symbols to bits (..., 10), bit 0 (sent first) in [0]."""
+    return (np.asarray(symbols, dtype=np.uint16)[..., None] >> np.arange(10)) & 1
+
 
 def main():
     """Generate formatted table of TMDS encoded values."""
@@ -101,14 +164,14 @@ def main():
     print("         1s  B   O  76543210    876543210    9876543210")
     print("=======================================================")
 
-    for pixel_dec in range(0, 256):  # encode all possible 8-bit values (0-255)
-        pixel_bin = bin_array_8(pixel_dec)
-        q_m = tmds(pixel_bin, pixel_dec, log=True)
-        q_out = bias(q_m, log=True)
-        d_str = ''.join(map(str, reversed(pixel_bin)))
-        q_m_str = ''.join(map(str, reversed(q_m)))
-        q_out_str = ''.join(map(str, reversed(q_out)))
-        print(f"{d_str} -> {q_m_str} -> {q_out_str}")
+    bias = 0
+    for d in range(256):  # encode all possible 8-bit values (0-255)
+        q_m = encode_qm(d)
+        q_out, next_bias, case = balance(q_m, bias)
+        kind = "XOR " if q_m >> 8 else "XNOR"
+        print(f"{d:3}: {kind}({bin(q_m & 0xFF).count('1')},{bias:2}, {case}) "
+            f"{d:08b} -> {q_m:09b} -> {q_out:010b}")
+        bias = next_bias
 
 if __name__ == "__main__":
     main()
@@ -4,10 +4,18 @@
 
 """Test helpers for Isle cocotb hardware tests."""
 
+from collections import Counter
 from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
 
 import cocotb
-from cocotb.triggers import RisingEdge
+from cocotb.handle import Immediate
+from cocotb.triggers import FallingEdge, RisingEdge
+
+# memory arrays in Isle memory modules (vram.v, clut.v, etc.) for backdoor access
+MEM_ARRAYS = ('vram_mem', 'clut_mem', 'tram_mem', 'sysram_mem', 'erlist_mem')
 
 @dataclass(frozen=True)
 class Coords:
@@ -64,27 +72,255 @@ def log_pixel(dut):
     cocotb.log.info("RGB(%2d,%2d,%2d) at (%4d,%4d)", r, g, b, x, y)
 
 
-async def zero_memory(dut):
-    """Zero memory to match hardware behaviour for block ram."""
+async def capture_frame(dut, size, clk=None):
+    """Capture one frame of disp_r/g/b into NumPy array (height, width, 3).
+
+    Starts at the next display pixel (0,0) and samples every clk (clk_pix if
+    the design has one) mid-cycle while disp_de is high, as assert_pixel does.
+    Pixels go in raster order; disp_x/y are checked against it in one go.
+    """
+    width, height = size
+    if clk is None:
+        clk = dut.clk_pix if hasattr(dut, 'clk_pix') else dut.clk
+    sig_rgb = (dut.disp_r, dut.disp_g, dut.disp_b)
+    sig_x, sig_y, sig_de = dut.disp_x, dut.disp_y, dut.disp_de
+
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    coords = np.zeros((height, width, 2), dtype=np.int32)
+    pixels, places = frame.reshape(-1, 3), coords.reshape(-1, 2)
+
+    await FallingEdge(clk)
+    while not (sig_de.value and sig_x.value.to_signed() == 0 and sig_y.value.to_signed() == 0):
+        await FallingEdge(clk)
+    i = 0
+    while i < len(pixels):
+        if sig_de.value:
+            pixels[i] = [sig.value.to_unsigned() for sig in sig_rgb]
+            places[i] = (sig_x.value.to_signed(), sig_y.value.to_signed())
+            i += 1
+        await FallingEdge(clk)
+    assert_raster(coords)
+    return frame
+
+
+def assert_raster(coords):
+    """Assert captured coords (height, width, 2) are (x, y) in raster order."""
+    height, width = coords.shape[:2]
+    expected = np.stack(np.meshgrid(np.arange(width), np.arange(height)), axis=-1)
+    wrong = np.argwhere((coords != expected).any(axis=-1))
+    if len(wrong):
+        y, x = wrong[0]
+        raise AssertionError(f"{len(wrong)} pixels out of raster order: first at ({x},{y}) "
+            f"was disp ({coords[y, x, 0]},{coords[y, x, 1]}).")
+
+
+def frame_rgb888(frame, bpc=5):
+    """Scale frame of BPC-bit channels to 8 bits."""
+    frame = np.asarray(frame, dtype=np.uint16)
+    return ((frame << (8 - bpc)) | (frame >> (2 * bpc - 8))).astype(np.uint8)
+
+
+def save_frame(frame, path, bpc=5):
+    """Save frame as PNG, for example to make a golden frame (needs Pillow)."""
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+    Image.fromarray(frame_rgb888(frame, bpc)).save(path)
+
+
+def read_frame(path, bpc=5):
+    """Read golden frame PNG as BPC-bit channels (needs Pillow)."""
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+    with Image.open(path) as img:
+        return np.asarray(img.convert('RGB')) >> (8 - bpc)
+
+
+def assert_frame_pixels(frame, pixels):
+    """Assert captured frame has known pixel colours: {(x, y): (r, g, b)}.
+
+    Use with assert_frame: these colours come from the hardware, so a golden
+    frame can't quietly replace them.
+    """
+    for (x, y), rgb in pixels.items():
+        assert tuple(frame[y, x].tolist()) == tuple(rgb), (
+            f"RGB{tuple(frame[y, x].tolist())} at ({x},{y}) is not RGB{tuple(rgb)}.")
+
+
+def assert_frame(frame, golden, bpc=5, diff_path=None):
+    """Assert frame matches golden frame (array or PNG path) in every pixel.
+
+    On failure, saves a diff image (captured, golden, and mismatches in white)
+    to diff_path, by default NAME-diff.png in the working directory for golden
+    NAME.png (frame-diff.png for an array). A golden PNG also gets the captured
+    frame alone as NAME-captured.png, for review as a new golden.
+    """
+    name, captured = "frame", None
+    if isinstance(golden, (str, Path)):
+        name = Path(golden).stem
+        captured = Path(f"{name}-captured.png")
+        golden = read_frame(golden, bpc)
+    diff_path = diff_path or Path(f"{name}-diff.png")
+    golden = np.asarray(golden, dtype=np.uint8)
+    assert frame.shape == golden.shape, f"frame {frame.shape} is not golden {golden.shape}."
+    wrong = (frame != golden).any(axis=-1)
+    if not wrong.any():
+        return
+
+    marks = np.where(wrong[..., None], (1 << bpc) - 1, frame >> 2)  # dim matching pixels
+    save_frame(np.concatenate((frame, golden, marks), axis=1), diff_path, bpc)
+    if captured is not None:
+        save_frame(frame, captured, bpc)
+    y, x = np.argwhere(wrong)[0]
+    raise AssertionError(
+        f"{wrong.sum()} of {wrong.size} pixels differ from golden frame: first at ({x},{y}) "
+        f"RGB{tuple(frame[y, x].tolist())} is not RGB{tuple(golden[y, x].tolist())}. "
+        f"Diff image in {diff_path}.")
+
+
+def read_mem(path):
+    """Read words from $readmemh file as NumPy array."""
+    with open(path, 'r', encoding="utf-8") as f:
+        return np.array([int(t, 16) for line in f for t in line.split('//', 1)[0].split()],
+            dtype=np.uint32)
+
 
-    for i in range(dut.DEPTH.value.to_unsigned()):
-        dut.we_sys.value = 1
-        dut.addr_sys.value = i
-        dut.din_sys.value = 0
-        await RisingEdge(dut.clk_sys)
+def bitmap_frame(bitmap, palette, size, bpp, bpc=5):
+    """Golden frame (height, width, 3) of packed bitmap .mem through RGB555 palette .mem.
 
-    dut.we_sys.value = 0
-    await RisingEdge(dut.clk_sys)
+    Pixel 0 of each word is in its least significant bits, as vram holds it.
+    """
+    width, height = size
+    words = read_mem(bitmap)[:width * height * bpp // 32]
+    shifts = np.arange(0, 32, bpp, dtype=np.uint32)
+    indices = ((words[:, None] >> shifts) & ((1 << bpp) - 1)).reshape(height, width)
+    colrs = read_mem(palette)[indices]
+    mask = (1 << bpc) - 1
+    return np.stack(((colrs >> 2 * bpc) & mask, (colrs >> bpc) & mask, colrs & mask),
+        axis=-1).astype(np.uint8)
+
+
+async def zero_memory(dut):
+    """Zero memory to match hardware behaviour for block ram."""
+    await fill_memory(dut, 0)
 
 
 async def zero_vram(dut):
     """Zero vram to match hardware behaviour for block ram."""
+    await fill_memory(dut, 0)
+
+
+def mem_array(dut):
+    """Memory array handle inside Isle memory module, or None if the simulator hides it."""
+    for name in MEM_ARRAYS:
+        if hasattr(dut, name):
+            return getattr(dut, name)
+    return None
+
+
+def backdoor_write(dut, words, start=0):
+    """Write words straight into memory module's array, taking no simulation time.
+
+    Returns False, writing nothing, if the simulator doesn't expose the array.
+    """
+    mem = mem_array(dut)
+    if mem is None:
+        return False
+    words = [int(w) for w in words]
+    if start < 0 or start + len(words) > len(mem):
+        raise ValueError(f"{len(words)} words at {start} don't fit {len(mem)}-word memory")
+    for addr, word in enumerate(words, start=start):
+        mem[addr].value = Immediate(word)
+    return True
+
+
+def sys_port(dut):
+    """Clock, write enable, address, and data in handles for memory module's system port."""
+    def first(*names):
+        return next(getattr(dut, name) for name in names if hasattr(dut, name))
+    return (first('clk_sys', 'clk'), first('wmask_sys', 'we_sys', 'we'),
+        first('addr_sys', 'addr'), first('din_sys', 'din'))
+
+
+async def sys_port_write(dut, words, start=0):
+    """Write words through memory module's system port, one per clock (clock must be running)."""
+    clk, we, addr, din = sys_port(dut)
+    we.value = (1 << len(we)) - 1  # all bytes/bits
+    for i, word in enumerate(words, start=start):
+        addr.value = i
+        din.value = int(word)
+        await RisingEdge(clk)
+    we.value = 0
+    await RisingEdge(clk)
+
+
+async def load_memory(dut, words, start=0, backdoor=True):
+    """Load words into memory module from address start.
+
+    Writes through the simulator handle if it can (backdoor), otherwise
+    through the system port, one word per clock. Either way, write enable
+    ends low after one clock.
+    """
+    if backdoor and backdoor_write(dut, words, start):
+        clk, we, _, _ = sys_port(dut)
+        we.value = 0
+        await RisingEdge(clk)
+    else:
+        await sys_port_write(dut, words, start)
+
+
+async def fill_memory(dut, value=0, backdoor=True):
+    """Fill whole memory module with value."""
+    await load_memory(dut, [value] * dut.DEPTH.value.to_unsigned(), backdoor=backdoor)
+
+
+async def load_mem_file(dut, path, start=0, backdoor=True):
+    """Load $readmemh file, such as a bitmap or Earthrise command list, into memory module."""
+    await load_memory(dut, read_mem(path), start, backdoor)
+
+
+def read_listing(path):
+    """Read erasm listing (erasm -l) as {byte address: 'file:line  source'}."""
+    locs = {}
+    with open(path, 'r', encoding="utf-8") as f:
+        for line in f:
+            fields = line.split(maxsplit=2)
+            if len(fields) == 3:
+                locs[int(fields[0], 16)] = fields[2].strip()
+    return locs
+
+
+async def profile_pc(clk, pc, busy, en=None):
+    """Count Earthrise cycles for each instruction address during one run.
+
+    Samples pc and busy every clock (only when en is high, if given) from busy
+    rising to busy falling. pc moves on as each instruction is decoded, so
+    cycles count against the address pc last moved from: an instruction's
+    fetch and decode cycles go to the instruction before, and -2 is the first
+    fetch. Jumps move pc to their target, so their cycles go to the jump, not
+    to the target - 2. A jump to itself doesn't move pc, so its cycles go to
+    the instruction before.
+    """
+    cycles = Counter()
+    while not busy.value:
+        await RisingEdge(clk)
+    last, addr = pc.value.to_unsigned(), -2  # pc and the address it moved from
+    while busy.value:
+        if (now := pc.value.to_unsigned()) != last:
+            last, addr = now, last
+        if en is None or en.value:
+            cycles[addr] += 1
+        await RisingEdge(clk)
+    return cycles
 
-    for i in range(dut.DEPTH.value.to_unsigned()):
-        dut.wmask_sys.value = 0xFFFFFFFF
-        dut.addr_sys.value = i
-        dut.din_sys.value = 0
-        await RisingEdge(dut.clk_sys)
 
-    dut.wmask_sys.value = 0x00000000
-    await RisingEdge(dut.clk_sys)
+def format_profile(cycles, listing=None, top=10):
+    """Format cycle profile by source line (from read_listing), busiest first."""
+    total = sum(cycles.values())
+    by_loc = Counter()
+    for addr, cnt in cycles.items():
+        if addr < 0:
+            by_loc['start'] += cnt
+        else:
+            by_loc[listing.get(addr, f"0x{addr:04X}") if listing else f"0x{addr:04X}"] += cnt
+    lines = [f"{total} cycles"]
+    for loc, cnt in by_loc.most_common(top):
+        lines.append(f"{cnt:8} {100*cnt/total:5.1f}%  {loc}")
+    return "\n".join(lines)
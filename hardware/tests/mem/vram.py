@@ -7,7 +7,7 @@
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge
-from tests.helpers import zero_vram
+from tests.helpers import fill_memory, load_memory, zero_vram
 
 # clock frequencies
 SYS_TIME = 50  # 20 ns is 20 MHz
@@ -32,6 +32,9 @@ tdat_mask_wmask   = [0x1,  0x4,  0xF0, 0xF0000000,  0x00C000000]
 expt_mask_addr_sys = [0x02,        0x00,        0x01,       0x02,       0x00       ]
 expt_mask_data_sys = [0x008000005, 0x008000005, 0x900000C0, 0x00000000, 0x008000005]
 
+# vram data for backdoor test: loaded from address 0x08
+tdat_load = [0x12345678, 0x9ABCDEF0, 0x0, 0xFFFFFFFF]
+
 # vram expected data for disp port - 2 cycle latency
 expt_addr_disp = [0x02, 0x1F,  0x00, 0x01, 0x01]
 expt_data_disp = ["xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx",
@@ -126,3 +129,27 @@ async def disp_port(dut):
 
         assert disp_data == data_expected, \
             f"DUT i={i} {disp_data} doesn't match expected {data_expected} at address 0x{addr:X}!"
+
+
+@cocotb.test()  # pylint: disable=no-value-for-parameter
+async def backdoor(dut):
+    """Test backdoor and sys port loading give the same vram contents."""
+    cocotb.start_soon(Clock(dut.clk_sys, SYS_TIME, unit="ns").start())
+    for backdoor_load in (True, False):
+        await fill_memory(dut, 0xA5A5A5A5, backdoor=backdoor_load)
+        await load_memory(dut, tdat_load, 0x08, backdoor=backdoor_load)
+        dut.re_sys.value = 1
+
+        # read data back - 1 cycle latency
+        expected = [0xA5A5A5A5] + tdat_load + [0xA5A5A5A5]
+        for i, addr in enumerate(range(0x07, 0x0E)):
+            dut.addr_sys.value = addr
+            await RisingEdge(dut.clk_sys)
+            if i > 0:
+                sys_data = dut.dout_sys.value.to_unsigned()
+                assert sys_data == expected[i - 1], \
+                    f"DUT {sys_data:08X} doesn't match {expected[i - 1]:08X} " \
+                    f"at address 0x{addr - 1:X} (backdoor={backdoor_load})!"
+
+        dut.re_sys.value = 0
+        await RisingEdge(dut.clk_sys)
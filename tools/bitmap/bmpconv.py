@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Bitmap Converter
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Bitmap Converter: images to packed vram words and RGB555 palette"""
+
+# NB. Pixels are packed as canv_disp_agu reads them: 32/bpp pixels per 32-bit
+#     word, with the first (leftmost) pixel in the lowest bits, and rows one
+#     after another. Canvas width must be a whole number of words.
+#
+#     Colours are matched in RGB555, the colour depth Isle displays: every
+#     RGB555 colour's nearest palette entry is found once (a 32K lookup
+#     table), then pixels are matched with one table lookup each.
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+BPP_SHIFT = {1: 5, 2: 4, 4: 3, 8: 2}  # bits per pixel -> canv_disp_agu addr_shift
+BPP = 4  # default bits per pixel
+
+# ordered dither threshold (8x8 Bayer matrix, 0-63)
+BAYER_8 = np.array([
+    [ 0, 32,  8, 40,  2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44,  4, 36, 14, 46,  6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [ 3, 35, 11, 43,  1, 33,  9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47,  7, 39, 13, 45,  5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21]])
+
+DITHERS = ('none', 'ordered', 'diffuse')
+RGB555_WEIGHTS = np.array([1 << 10, 1 << 5, 1], dtype=np.int32)  # RGB555 from 5-bit channels
+
+def read_palette(path):
+    """Read RGB555 palette in $readmemh format (NumPy uint16 array)."""
+    with open(path, 'r', encoding="utf-8") as f:
+        lines = [line.split('//', 1)[0] for line in f]
+    return np.array([int(t, 16) for t in ' '.join(lines).split()], dtype=np.uint16)
+
+
+def rgb555_to_rgb(palette):
+    """Expand RGB555 palette to RGB888 (n, 3) uint8, scaling 5 to 8 bits."""
+    palette = np.asarray(palette, dtype=np.uint16)
+    rgb5 = np.stack(((palette >> 10) & 0x1F, (palette >> 5) & 0x1F, palette & 0x1F), axis=1)
+    return ((rgb5 << 3) | (rgb5 >> 2)).astype(np.uint8)
+
+
+def rgb_to_rgb555(rgb):
+    """Reduce RGB888 (..., 3) to RGB555 by dropping the low 3 bits of each channel."""
+    rgb = np.asarray(rgb, dtype=np.uint16) >> 3
+    return (rgb[..., 0] << 10) | (rgb[..., 1] << 5) | rgb[..., 2]
+
+
+def derive_palette(rgb, colours):
+    """Derive RGB555 palette of up to colours entries from image (octree, needs Pillow)."""
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+    img = Image.fromarray(np.ascontiguousarray(rgb, dtype=np.uint8), 'RGB')
+    quant = img.quantize(colours, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    used = np.unique(np.asarray(quant))
+    pal = np.array(quant.getpalette()[:3 * colours], dtype=np.uint8).reshape(-1, 3)[used]
+    return np.unique(rgb_to_rgb555(pal))
+
+
+def nearest_table(palette):
+    """Index of nearest palette colour for every RGB555 colour (32K lookup table)."""
+    pal = rgb555_to_rgb(palette).astype(np.int32)
+    every = rgb555_to_rgb(np.arange(1 << 15)).astype(np.int32)
+    table = np.empty(1 << 15, dtype=np.uint8)
+    for start in range(0, 1 << 15, 4096):  # chunks keep distance array small
+        diff = every[start:start+4096, None, :] - pal[None, :, :]
+        table[start:start+4096] = np.argmin((diff * diff).sum(axis=2), axis=1)
+    return table
+
+
+def quantise(rgb, palette, dither='none'):
+    """Map RGB888 image (h, w, 3) to palette indices (h, w) with optional dithering."""
+    table = nearest_table(palette)
+    if dither == 'ordered':
+        # threshold offset within one palette step, estimated from palette spread
+        step = 256 / max(len(palette) ** (1 / 3), 1)
+        height, width = rgb.shape[:2]
+        thresh = np.tile(BAYER_8, (height // 8 + 1, width // 8 + 1))[:height, :width]
+        offset = ((thresh + 0.5) / 64 - 0.5) * step
+        rgb = np.clip(rgb + offset[..., None], 0, 255).astype(np.uint8)
+    elif dither == 'diffuse':
+        return diffuse(rgb, palette, table)
+    return table[rgb_to_rgb555(rgb)]
+
+
+def diffuse(rgb, palette, table):
+    """Floyd-Steinberg error diffusion, vectorised along anti-diagonals.
+
+    Pixel (x, y) takes error from (x-1, y), (x-1, y-1), (x, y-1), and (x+1, y-1),
+    all on earlier diagonals x + 2y, so each diagonal is quantised in one step.
+    """
+    height, width = rgb.shape[:2]
+    stride = width + 2  # 1-pixel border left and right (and a row below) absorbs error
+    pal = rgb555_to_rgb(palette).astype(np.float32)
+    work = np.zeros((height + 1, stride, 3), dtype=np.float32)
+    work[:height, 1:width+1] = rgb
+    work = work.reshape(-1, 3)
+    out = np.zeros(height * width, dtype=np.uint8)
+    for t in range(width + 2 * (height - 1)):
+        xs, ys = diagonal(t, width, height)
+        pos = ys * stride + xs + 1
+        old = np.clip(work[pos], 0, 255)
+        idx = table[(old.astype(np.int32) >> 3) @ RGB555_WEIGHTS]
+        out[ys * width + xs] = idx
+        spread_error(work, pos, stride, (old - pal[idx]) * (1 / 16))
+    return out.reshape(height, width)
+
+
+def diagonal(t, width, height):
+    """Pixel coordinates (xs, ys) on anti-diagonal x + 2y = t."""
+    ys = np.arange(max(0, (t - width) // 2 + 1), min(t // 2 + 1, height))
+    return t - 2 * ys, ys
+
+
+def spread_error(work, pos, stride, err):
+    """Add sixteenths of error at work positions to the pixels right and below."""
+    work[pos + 1] += 7 * err
+    work[pos + stride - 1] += 3 * err
+    work[pos + stride] += 5 * err
+    work[pos + stride + 1] += err
+
+
+def pack(indices, bpp=BPP):
+    """Pack palette indices (h, w) into 32-bit vram words; first pixel in lowest bits."""
+    per_word = 32 // bpp
+    height, width = indices.shape
+    if width % per_word:
+        raise ValueError(f"width {width} isn't a whole number of words "
+            f"({per_word} pixels per word at {bpp} bpp)")
+    pixels = indices.reshape(height, -1, per_word).astype(np.uint32) & ((1 << bpp) - 1)
+    shifts = np.arange(per_word, dtype=np.uint32) * bpp
+    return np.bitwise_or.reduce(pixels << shifts, axis=2)
+
+
+def unpack(words, width, bpp=BPP):
+    """Unpack vram words into palette indices (h, w), as canv_disp_agu reads them."""
+    words = np.asarray(words, dtype=np.uint32).reshape(-1)
+    shift = BPP_SHIFT[bpp]
+    addr = np.arange(width * (len(words) * (32 // bpp) // width), dtype=np.uint32)
+    pix_idx = addr & ((1 << shift) - 1)  # low bits: pixel within word
+    return ((words[addr >> shift] >> (pix_idx * bpp)) & ((1 << bpp) - 1)).reshape(-1, width)
+
+
+def words_to_mem(words, header=None):
+    """Format vram words as $readmemh text, one canvas row per line."""
+    lines = [] if header is None else [f"// {header}"]
+    hex_words = np.char.mod('%08X', words)
+    lines += [' '.join(row) for row in hex_words.tolist()]
+    return "\n".join(lines) + "\n"
+
+
+def palette_to_mem(palette, header=None):
+    """Format RGB555 palette as $readmemh text with index and 5-bit channels."""
+    lines = [] if header is None else [f"// {header}", ""]
+    for i, colr in enumerate(np.asarray(palette).tolist()):
+        lines.append(f"{colr:04X}  // 0x{i:X} - ({colr >> 10:02}, "
+            f"{(colr >> 5) & 0x1F:02}, {colr & 0x1F:02})")
+    return "\n".join(lines) + "\n"
+
+
+def convert(rgb, bpp=BPP, palette=None, dither='none'):
+    """Convert RGB888 image (h, w, 3); returns (vram words (h, words per row), palette)."""
+    colours = 1 << bpp
+    if palette is None:
+        palette = derive_palette(rgb, colours)
+    elif len(palette) > colours:
+        palette = palette[:colours]
+    return pack(quantise(rgb, palette, dither), bpp), np.asarray(palette, dtype=np.uint16)
+
+
+def write_preview(path, words, width, palette, bpp=BPP):
+    """Write PNG of packed words through palette, decoded as the display reads them."""
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+    indices = unpack(words, width, bpp)
+    img = Image.fromarray(indices.astype(np.uint8), 'P')
+    pal = rgb555_to_rgb(palette)
+    img.putpalette(pal.reshape(-1).tolist())
+    img.save(path)
+
+
+def read_image(path):
+    """Read image as RGB888 (h, w, 3) NumPy array (needs Pillow)."""
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+    with Image.open(path) as img:
+        return np.asarray(img.convert('RGB'))
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Isle Bitmap Converter")
+    parser.add_argument('file', help="input image (PNG or any format Pillow reads)")
+    parser.add_argument('-o', '--out', metavar='FILE',
+        help="output vram words (default: input name with .mem); also writes "
+        "FILE_palette.mem and FILE_preview.png")
+    parser.add_argument('--bpp', type=int, choices=sorted(BPP_SHIFT), default=BPP,
+        help=f"bits per pixel (default: {BPP})")
+    parser.add_argument('-p', '--palette', metavar='FILE',
+        help="RGB555 palette in $readmemh format (default: derive from image)")
+    parser.add_argument('-d', '--dither', choices=DITHERS, default='none',
+        help="dithering: none, ordered (Bayer 8x8), or diffuse (Floyd-Steinberg)")
+    parser.add_argument('--no-preview', action='store_true', help="don't write preview PNG")
+    args = parser.parse_args(argv)
+
+    out = args.out or os.path.splitext(args.file)[0] + ".mem"
+    stem = os.path.splitext(out)[0]
+    try:
+        rgb = read_image(args.file)
+        palette = read_palette(args.palette) if args.palette else None
+        words, palette = convert(rgb, args.bpp, palette, args.dither)
+        name = os.path.basename(args.file)
+        with open(out, 'w', encoding="utf-8") as f:
+            f.write(words_to_mem(words, f"Generated by bmpconv from {name} "
+                f"({rgb.shape[1]}x{rgb.shape[0]}, {args.bpp} bpp)"))
+        with open(f"{stem}_palette.mem", 'w', encoding="utf-8") as f:
+            f.write(palette_to_mem(palette, f"Generated by bmpconv from {name}"))
+        if not args.no_preview:
+            write_preview(f"{stem}_preview.png", words, rgb.shape[1], palette, args.bpp)
+    except (OSError, ValueError) as e:
+        print(f"Conversion error: {e}", file=sys.stderr)
+        return 1
+    print(f"bmpconv: {rgb.shape[1]}x{rgb.shape[0]} at {args.bpp} bpp "
+        f"(addr_shift={BPP_SHIFT[args.bpp]}): {words.size} words, {len(palette)} colours",
+        file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
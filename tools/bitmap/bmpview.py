@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Bitmap Viewer
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Bitmap Viewer: render packed vram words through canvas parameters to PNG"""
+
+# NB. Rendering follows canv_disp_agu: the window and canvas dimensions decide
+#     where the canvas paints, scale repeats pixels and lines, and scroll
+#     starts the canvas part way through the buffer, wrapping at its edges.
+#     Before the vertical wrap, lines come from scroll_addr; after it, from the
+#     start of the buffer. Display latency isn't modelled: pixel (0, 0) is the
+#     first pixel of the display area.
+#
+#     Every display pixel's vram address is calculated at once with NumPy, so
+#     a whole frame takes a few milliseconds.
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from bmpconv import BPP_SHIFT, read_palette, rgb555_to_rgb
+
+BG_COLR = 0x0886  # background colour outside canvas (RGB555, as ch03)
+WORD = 32         # vram word size (bits)
+
+SIZE_RE = re.compile(r'(\d+)x(\d+)')  # canvas size in file name, e.g. crocus-256x160.mem
+
+
+class Canvas(NamedTuple):
+    """Canvas parameters as canv_disp_agu takes them; pairs are (x, y)."""
+    canv_dims: tuple
+    addr_shift: int = 3
+    addr_base: int = 0
+    scale: tuple = (1, 1)
+    scroll: tuple = (0, 0)
+    scroll_addr: int = None  # None: line at scroll y
+    win_start: tuple = (0, 0)
+    win_end: tuple = None    # None: window fits scaled canvas
+
+
+def window_end(p):
+    """Window end coordinates: win_end or the scaled canvas from win_start."""
+    if p.win_end is not None:
+        return p.win_end
+    return tuple(s + d * max(k, 1) for s, d, k in zip(p.win_start, p.canv_dims, p.scale))
+
+
+def read_words(path):
+    """Read vram words in $readmemh format (NumPy uint32 array); supports @addr."""
+    with open(path, 'r', encoding="utf-8") as f:
+        tokens = ' '.join(line.split('//', 1)[0] for line in f).split()
+    words, addr = {}, 0
+    for t in tokens:
+        if t.startswith('@'):
+            addr = int(t[1:], 16)
+        else:
+            words[addr] = int(t, 16)
+            addr += 1
+    out = np.zeros(max(words, default=-1) + 1, dtype=np.uint32)
+    out[list(words)] = list(words.values())
+    return out
+
+
+def axis_counter(size, win_start, win_end, scale, canv_size):
+    """Canvas position of each display position along one axis, and whether it paints."""
+    disp = np.arange(size)
+    pos = (disp - win_start) // max(scale, 1)  # one step per scale pixels; scale 0 acts as 1
+    paint = (disp >= win_start) & (disp < win_end) & (pos < canv_size)
+    return np.maximum(pos, 0), paint
+
+
+def window_counters(p, display):
+    """Canvas x and y of each display column and row, and paint flag for each pixel (h, w)."""
+    cx, paint_x = axis_counter(display[0], p.win_start[0], window_end(p)[0], p.scale[0],
+        p.canv_dims[0])
+    cy, paint_y = axis_counter(display[1], p.win_start[1], window_end(p)[1], p.scale[1],
+        p.canv_dims[1])
+    return cx, cy, paint_y[:, None] & paint_x[None, :]
+
+
+def agu_addrs(p, display):
+    """vram address, pixel index, and paint flag for each display pixel (h, w)."""
+    (canv_w, canv_h), (scroll_x, scroll_y) = p.canv_dims, p.scroll
+    scroll_addr = scroll_y * canv_w if p.scroll_addr is None else p.scroll_addr
+    cx, cy, paint = window_counters(p, display)
+
+    # buffer counters wrap; rows start at scroll_addr until the vertical wrap
+    bx, by = (scroll_x + cx) % canv_w, (scroll_y + cy) % canv_h
+    row = np.where(scroll_y + cy < canv_h, scroll_addr + cy * canv_w, by * canv_w)
+    pix_addr = row[:, None] + bx[None, :]
+
+    return p.addr_base + (pix_addr >> p.addr_shift), pix_addr & ((1 << p.addr_shift) - 1), paint
+
+
+def render_indices(words, p, display):
+    """Palette indices (h, w) and paint mask for display of size (w, h)."""
+    addr, pix_idx, paint = agu_addrs(p, display)
+    bpp = WORD >> p.addr_shift
+    words = np.asarray(words, dtype=np.uint32)
+    size = 1 << max(int(addr.max(initial=0)), len(words) - 1, 1).bit_length()  # vram wraps
+    vram = np.zeros(size, dtype=np.uint32)
+    vram[:len(words)] = words
+    word = vram[addr & (size - 1)]
+    return (word >> (pix_idx * bpp).astype(np.uint32)) & ((1 << bpp) - 1), paint
+
+
+def render(words, palette, p, display=None, bg=BG_COLR):
+    """Render display as RGB888 (h, w, 3); display (w, h) defaults to window end."""
+    display = window_end(p) if display is None else display
+    idx, paint = render_indices(words, p, display)
+    clut = np.zeros((1 << (WORD >> p.addr_shift), 3), dtype=np.uint8)  # missing entries are 0
+    clut[:min(len(palette), len(clut))] = rgb555_to_rgb(palette)[:len(clut)]
+    rgb = clut[idx]
+    rgb[~paint] = rgb555_to_rgb([bg])[0]
+    return rgb
+
+
+def infer_canvas(path, words, size=None, bpp=None):
+    """Canvas size and bpp from options, else from file name (name-WxH.mem) and word count."""
+    if size is None:
+        found = SIZE_RE.findall(path.stem)
+        if not found:
+            raise ValueError("canvas size needed: use --canvas or a name like image-WxH.mem")
+        size = tuple(map(int, found[-1]))
+    if bpp is None:  # deepest colour that fits; files may be padded
+        fits = [b for b in BPP_SHIFT if 0 < size[0] * size[1] * b <= len(words) * WORD]
+        if not fits:
+            raise ValueError(f"{len(words)} words is too few for a {size[0]}x{size[1]} canvas; "
+                "use --bpp")
+        bpp = max(fits)
+    return size, bpp
+
+
+def write_png(path, rgb):
+    """Write RGB888 (h, w, 3) array as PNG (needs Pillow)."""
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+    Image.fromarray(rgb, 'RGB').save(path, compress_level=1)
+
+
+def find_bitmaps(paths):
+    """Expand directories into vram .mem files; palettes are skipped."""
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found += sorted(p for p in path.rglob('*.mem') if not p.stem.endswith('_palette'))
+        else:
+            found.append(path)
+    return found
+
+
+def pair(text):
+    """Parse coordinate pair 'XxY' or 'X,Y'; a single number is used for both."""
+    parts = re.split(r'[x,]', text)
+    if len(parts) == 1:
+        parts *= 2
+    try:
+        x, y = (int(v) for v in parts)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected XxY or X,Y, not '{text}'") from None
+    return x, y
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Isle Bitmap Viewer")
+    parser.add_argument('file', nargs='+', help="vram .mem files or directories of them")
+    parser.add_argument('-o', '--out', metavar='FILE',
+        help="output PNG for a single file (default: name_preview.png)")
+    parser.add_argument('-p', '--palette', metavar='FILE',
+        help="RGB555 clut in $readmemh format (default: name_palette.mem)")
+    parser.add_argument('--canvas', type=pair, metavar='WxH',
+        help="canvas dimensions (default: from file name, e.g. crocus-256x160.mem)")
+    parser.add_argument('--bpp', type=int, choices=sorted(BPP_SHIFT),
+        help="bits per pixel (default: from canvas size and word count)")
+    parser.add_argument('--base', type=lambda v: int(v, 0), default=0,
+        help="canvas base address (vram word address; default: 0)")
+    parser.add_argument('--scale', type=pair, default=(1, 1), metavar='XxY',
+        help="canvas scale (default: 1)")
+    parser.add_argument('--scroll', type=pair, default=(0, 0), metavar='X,Y',
+        help="canvas scroll (default: 0,0)")
+    parser.add_argument('--scroll-addr', type=lambda v: int(v, 0),
+        help="pixel address of scroll line (default: matches scroll)")
+    parser.add_argument('--win-start', type=pair, default=(0, 0), metavar='X,Y',
+        help="window start (default: 0,0)")
+    parser.add_argument('--win-end', type=pair, metavar='X,Y',
+        help="window end (default: fits scaled canvas)")
+    parser.add_argument('--display', type=pair, metavar='WxH',
+        help="display size (default: window end)")
+    parser.add_argument('--bg', type=lambda v: int(v, 16), default=BG_COLR,
+        help=f"background colour, RGB555 hex (default: {BG_COLR:04X})")
+    args = parser.parse_args(argv)
+
+    files = find_bitmaps(args.file)
+    if not files:
+        parser.error("no .mem files found")
+    if args.out is not None and len(files) > 1:
+        parser.error("-o needs a single file")
+
+    start, errors = time.perf_counter(), 0
+    for path in files:
+        try:
+            words = read_words(path)
+            size, bpp = infer_canvas(path, words, args.canvas, args.bpp)
+            pal_path = args.palette or path.with_name(f"{path.stem}_palette.mem")
+            p = Canvas(size, BPP_SHIFT[bpp], args.base, args.scale, args.scroll,
+                args.scroll_addr, args.win_start, args.win_end)
+            rgb = render(words, read_palette(pal_path), p, args.display, args.bg)
+            write_png(args.out or path.with_name(f"{path.stem}_preview.png"), rgb)
+        except (OSError, ValueError) as e:
+            print(f"View error: {path}: {e}", file=sys.stderr)
+            errors += 1
+    ms = (time.perf_counter() - start) * 1000
+    print(f"bmpview: rendered {len(files) - errors} of {len(files)} bitmaps in {ms:.0f} ms",
+        file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Palette Extractor
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Palette Extractor: N-colour RGB555 palettes from images"""
+
+# NB. Each image is reduced to a histogram of its RGB555 colours (32K bins),
+#     so clustering works on at most 32,768 weighted colours however large the
+#     images are. Histograms are built in parallel, one image per process.
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from bmpconv import palette_to_mem, read_image, rgb555_to_rgb, rgb_to_rgb555
+
+COLOURS = 16  # default palette size
+METHODS = ('kmeans', 'mediancut')
+KMEANS_ITERS = 32  # maximum k-means iterations
+IMAGE_EXTS = ('.png', '.bmp', '.gif', '.jpg', '.jpeg', '.tga', '.webp')
+
+def histogram(path):
+    """RGB555 colour counts of image (NumPy array of 32768)."""
+    return np.bincount(rgb_to_rgb555(read_image(path)).reshape(-1), minlength=1 << 15)
+
+
+def weighted_colours(hist):
+    """Colours present in histogram: (RGB888 (n, 3) float, counts (n))."""
+    present = np.flatnonzero(hist)
+    return rgb555_to_rgb(present).astype(np.float64), hist[present].astype(np.float64)
+
+
+def median_cut(colrs, counts, n):
+    """Split colour boxes at the weighted median of their widest channel; returns centres."""
+    boxes = [np.arange(len(colrs))]
+    while len(boxes) < n:
+        # split the box with the most pixels among those with more than one colour
+        splittable = [i for i, box in enumerate(boxes) if len(box) > 1]
+        if not splittable:
+            break
+        i = max(splittable, key=lambda i: counts[boxes[i]].sum())
+        box = boxes.pop(i)
+        chan = np.ptp(colrs[box], axis=0).argmax()
+        box = box[np.argsort(colrs[box, chan], kind='stable')]
+        cum = np.cumsum(counts[box])
+        cut = int(np.clip(np.searchsorted(cum, cum[-1] / 2) + 1, 1, len(box) - 1))
+        boxes += [box[:cut], box[cut:]]
+    return np.array([np.average(colrs[box], axis=0, weights=counts[box]) for box in boxes])
+
+
+def nearest(colrs, centres):
+    """Index of nearest centre for each colour."""
+    dist = (colrs * colrs).sum(axis=1)[:, None] - 2 * colrs @ centres.T + \
+        (centres * centres).sum(axis=1)[None, :]
+    return dist.argmin(axis=1)
+
+
+def kmeans(colrs, counts, n, iters=KMEANS_ITERS):
+    """Weighted k-means, starting from median cut; returns centres."""
+    centres = median_cut(colrs, counts, n)
+    for _ in range(iters):
+        label = nearest(colrs, centres)
+        weight = np.bincount(label, counts, minlength=len(centres))
+        sums = np.stack([np.bincount(label, counts * colrs[:, c], minlength=len(centres))
+            for c in range(3)], axis=1)
+        used = weight > 0  # keep empty clusters where they are
+        new = centres.copy()
+        new[used] = sums[used] / weight[used, None]
+        if np.allclose(new, centres, atol=0.5):
+            return new
+        centres = new
+    return centres
+
+
+def extract(hist, n=COLOURS, method='kmeans'):
+    """Palette of up to n RGB555 colours from histogram, sorted dark to light."""
+    colrs, counts = weighted_colours(hist)
+    if len(colrs) == 0:
+        raise ValueError("no pixels")
+    if len(colrs) <= n:
+        centres = colrs
+    else:
+        centres = kmeans(colrs, counts, n) if method == 'kmeans' else median_cut(colrs, counts, n)
+    palette = np.unique(rgb_to_rgb555(np.clip(np.rint(centres), 0, 255)))
+    luma = rgb555_to_rgb(palette).astype(np.float64) @ [0.299, 0.587, 0.114]
+    return palette[np.argsort(luma, kind='stable')]
+
+
+def palette_file(path, args):
+    """Extract palette for one image (worker); returns (path, palette, error)."""
+    n, method = args
+    try:
+        return path, extract(histogram(path), n, method), None
+    except (OSError, ValueError) as e:
+        return path, None, str(e)
+
+
+def find_images(paths):
+    """Expand directories into image files; bmpconv previews are skipped."""
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found += sorted(p for p in path.rglob('*') if p.suffix.lower() in IMAGE_EXTS
+                and not p.stem.endswith('_preview'))
+        else:
+            found.append(path)
+    return found
+
+
+def combined(images, n=COLOURS, method='kmeans', jobs=None):
+    """One palette for all images; histograms are built in parallel."""
+    with ProcessPoolExecutor(jobs) as pool:
+        hist = sum(pool.map(histogram, images, chunksize=4), np.zeros(1 << 15, dtype=np.int64))
+    return extract(hist, n, method)
+
+
+def batch(images, out_dir=None, n=COLOURS, method='kmeans', jobs=None):
+    """Palette for each image, written as stem_palette.mem; returns (written, errors)."""
+    written, errors = 0, []
+    with ProcessPoolExecutor(jobs) as pool:
+        for path, palette, err in pool.map(palette_file, images, [(n, method)] * len(images)):
+            if err is not None:
+                errors.append(f"{path}: {err}")
+                continue
+            out = Path(out_dir or path.parent) / f"{path.stem}_palette.mem"
+            with open(out, 'w', encoding="utf-8") as f:
+                f.write(palette_to_mem(palette, f"Generated by palext from {path.name}"))
+            written += 1
+    return written, errors
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Isle Palette Extractor")
+    parser.add_argument('file', nargs='+', help="images or directories of images")
+    parser.add_argument('-n', '--colours', type=int, default=COLOURS,
+        help=f"palette size, e.g. 2, 4, 16, or 256 (default: {COLOURS})")
+    parser.add_argument('-m', '--method', choices=METHODS, default='kmeans',
+        help="kmeans (refines median cut; default) or mediancut")
+    parser.add_argument('-o', '--out', metavar='FILE',
+        help="write one palette for all images to FILE ('-' for stdout)")
+    parser.add_argument('-d', '--out-dir', metavar='DIR',
+        help="write a palette per image to DIR (default: next to each image)")
+    parser.add_argument('-j', '--jobs', type=int,
+        help="number of worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    if args.out is not None and args.out_dir is not None:
+        parser.error("use -o for one palette or -d for a palette per image, not both")
+    if not 1 <= args.colours <= 256:
+        parser.error("palette size must be 1-256")
+
+    images = find_images(args.file)
+    if not images:
+        parser.error("no images found")
+    if args.out is None:
+        if args.out_dir is not None:
+            os.makedirs(args.out_dir, exist_ok=True)
+        written, errors = batch(images, args.out_dir, args.colours, args.method, args.jobs)
+        for err in errors:
+            print(f"Palette error: {err}", file=sys.stderr)
+        print(f"palext: wrote {written} palettes, {len(errors)} failed", file=sys.stderr)
+        return 1 if errors else 0
+
+    try:
+        palette = combined(images, args.colours, args.method, args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"Palette error: {e}", file=sys.stderr)
+        return 1
+    names = ', '.join(p.name for p in images[:3]) + (', ...' if len(images) > 3 else '')
+    text = palette_to_mem(palette, f"Generated by palext from {names}")
+    if args.out == '-':
+        sys.stdout.write(text)
+    else:
+        with open(args.out, 'w', encoding="utf-8") as f:
+            f.write(text)
+    print(f"palext: {len(palette)} colours from {len(images)} images", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# Isle.Computer - Bitmap Converter Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Bitmap Converter Tests"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from bmpconv import (convert, diffuse, main, nearest_table, pack, quantise, read_palette,
+    rgb555_to_rgb, unpack)
+
+RES = Path(__file__).parent / "../../res"
+CROCUS = RES / "bitmaps/crocus/crocus-256x160"
+
+def read_words(path):
+    """Read $readmemh vram words."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.split('//', 1)[0] for line in f]
+    return np.array([int(t, 16) for t in ' '.join(lines).split()], dtype=np.uint32)
+
+
+class TestBmpconv:
+    """Test class for bmpconv."""
+
+    def test_pack(self):
+        """Test packing matches canv_disp_agu at every colour depth."""
+        rng = np.random.default_rng(1)
+        for bpp in (1, 2, 4, 8):
+            indices = rng.integers(0, 1 << bpp, (3, 64), dtype=np.uint8)
+            words = pack(indices, bpp)
+            assert words.shape == (3, 64 * bpp // 32)
+            assert np.array_equal(unpack(words, 64, bpp), indices)
+        assert pack(np.array([[1, 2, 3, 0, 0, 0, 0, 15]]), 4).tolist() == [[0xF0000321]]
+        with pytest.raises(ValueError, match="whole number of words"):
+            pack(np.zeros((1, 20), dtype=np.uint8), 4)
+        # crocus from img2fmem uses the same layout
+        assert unpack(read_words(f"{CROCUS}.mem"), 256).shape == (160, 256)
+
+    def test_quantise(self):
+        """Test palette colours map to themselves, and dithering keeps the average."""
+        palette = read_palette(RES / "palettes/go-16.mem")
+        table = nearest_table(palette)
+        assert np.array_equal(table[palette], np.arange(16))
+        grey = np.full((32, 64, 3), 100, dtype=np.uint8)
+        bw = np.array([0x0000, 0x7FFF], dtype=np.uint16)
+        assert not quantise(grey, bw).any()  # nearest is black
+        for dither in ('ordered', 'diffuse'):
+            mean = quantise(grey, bw, dither).mean() * 255
+            assert abs(mean - 100) < 10, dither
+        img = rgb555_to_rgb(palette)[np.arange(64).reshape(8, 8) % 16]
+        assert np.array_equal(diffuse(img, palette, table), np.arange(64).reshape(8, 8) % 16)
+
+    def test_convert(self, tmp_path):
+        """Test derived palette and CLI outputs."""
+        rgb = rgb555_to_rgb(np.array([0x7C00, 0x03E0, 0x001F]))[np.arange(32) % 3][None]
+        words, palette = convert(np.repeat(rgb, 2, axis=0), bpp=2)
+        assert sorted(palette.tolist()) == [0x001F, 0x03E0, 0x7C00]
+        assert words.shape == (2, 2)
+        out = tmp_path / "crocus.mem"
+        assert main([f"{CROCUS}.png", '-p', f"{CROCUS}_palette.mem", '-d', 'diffuse',
+            '-o', str(out)]) == 0
+        assert len(read_words(out)) == 256 * 160 // 8
+        assert np.array_equal(read_palette(tmp_path / "crocus_palette.mem"),
+            read_palette(f"{CROCUS}_palette.mem"))
+        assert (tmp_path / "crocus_preview.png").read_bytes()[:4] == b'\x89PNG'
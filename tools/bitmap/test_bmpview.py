@@ -0,0 +1,129 @@
+# Isle.Computer - Bitmap Viewer Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Bitmap Viewer Tests"""
+
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from bmpconv import unpack
+from bmpview import Canvas, agu_addrs, infer_canvas, main, read_words, render, window_end
+
+RES = Path(__file__).parent / "../../res"
+
+def agu_counters(p, display):
+    """Step canv_disp_agu counters pixel by pixel (no latency); returns (addr, pix_idx, paint)."""
+    (canv_w, canv_h), (win_x1, win_y1) = p.canv_dims, window_end(p)
+    width, height = display
+    addr = np.zeros((height, width), dtype=np.int64)
+    pix_idx, paint = np.zeros_like(addr), np.zeros(addr.shape, dtype=bool)
+
+    cnt = frame_start(p)
+    for dy in range(height):
+        if dy > p.win_start[1]:
+            line_start(cnt, p)
+        for dx in range(width):
+            in_window = p.win_start[0] <= dx < win_x1 and p.win_start[1] <= dy < win_y1
+            if in_window and cnt['cx'] < canv_w and cnt['cy'] < canv_h:
+                addr[dy, dx] = p.addr_base + (cnt['pix'] >> p.addr_shift)
+                pix_idx[dy, dx] = cnt['pix'] & ((1 << p.addr_shift) - 1)
+                paint[dy, dx] = True
+                pixel_step(cnt, p)
+    return addr, pix_idx, paint
+
+
+def frame_start(p):
+    """canv_disp_agu counters at frame start: scale, canvas, buffer, and pixel addresses."""
+    scroll_x, scroll_y = p.scroll
+    scroll_addr = scroll_y * p.canv_dims[0] if p.scroll_addr is None else p.scroll_addr
+    return {'sx': 0, 'sy': 0, 'cx': 0, 'cy': 0, 'bx': scroll_x, 'by': scroll_y,
+        'pix': scroll_addr + scroll_x, 'pix_ln': scroll_addr + scroll_x, 'pix_buf': scroll_addr}
+
+
+def line_start(cnt, p):
+    """Step counters at the start of each line after the first window line."""
+    canv_w, canv_h = p.canv_dims
+    cnt['sx'], cnt['cx'], cnt['bx'] = 0, 0, p.scroll[0]
+    if cnt['sy'] == max(p.scale[1] - 1, 0):
+        cnt['sy'], cnt['cy'] = 0, cnt['cy'] + 1
+        if cnt['by'] == canv_h - 1:
+            cnt.update(by=0, pix=p.scroll[0], pix_ln=p.scroll[0], pix_buf=0)
+        else:
+            cnt.update(by=cnt['by'] + 1, pix_ln=cnt['pix_ln'] + canv_w,
+                pix_buf=cnt['pix_buf'] + canv_w)
+            cnt['pix'] = cnt['pix_ln']
+    else:
+        cnt['sy'], cnt['pix'] = cnt['sy'] + 1, cnt['pix_ln']
+
+
+def pixel_step(cnt, p):
+    """Step counters after painting a pixel."""
+    if cnt['sx'] == max(p.scale[0] - 1, 0):
+        cnt['sx'], cnt['cx'] = 0, cnt['cx'] + 1
+        if cnt['bx'] == p.canv_dims[0] - 1:
+            cnt['bx'], cnt['pix'] = 0, cnt['pix_buf']
+        else:
+            cnt['bx'], cnt['pix'] = cnt['bx'] + 1, cnt['pix'] + 1
+    else:
+        cnt['sx'] += 1
+
+
+class TestBmpview:
+    """Test class for bmpview."""
+
+    def test_agu(self):
+        """Test vectorised addresses match canv_disp_agu counters."""
+        params = [
+            Canvas((16, 8)),
+            Canvas((16, 8), 4, addr_base=5, scale=(2, 3), win_start=(3, 2)),
+            Canvas((16, 8), 2, scale=(0, 0), scroll=(5, 3)),  # scale 0 acts as 1
+            Canvas((32, 6), 3, scale=(3, 2), scroll=(31, 5), win_start=(1, 1), win_end=(40, 11)),
+            Canvas((16, 8), 5, scroll=(4, 2), scroll_addr=64 + 4),  # scroll_addr doesn't match
+            Canvas((24, 10), 3, scroll=(0, 9), win_start=(4, 3), win_end=(20, 9)),  # window clips
+        ]
+        for p in params:
+            for display in ((48, 24), (12, 5)):
+                want = agu_counters(p, display)
+                got = agu_addrs(p, display)
+                paint = want[2]
+                assert np.array_equal(got[2], paint), p
+                assert np.array_equal(got[0][paint], want[0][paint]), p
+                assert np.array_equal(got[1][paint], want[1][paint]), p
+
+    def test_render(self):
+        """Test crocus renders as unpacked, with background outside canvas."""
+        path = RES / "bitmaps/crocus/crocus-256x160.mem"
+        words = read_words(path)
+        size, bpp = infer_canvas(path, words)
+        assert size == (256, 160) and bpp == 4
+        palette = np.arange(16, dtype=np.uint16) * 0x0421  # greys
+        rgb = render(words, palette, Canvas(size, 3, scale=(2, 2), win_start=(8, 4)),
+            display=(528, 328), bg=0x7C00)
+        idx = unpack(words, 256, 4)
+        assert np.array_equal(rgb[4:324:2, 8:520:2, 0] >> 3, idx)
+        assert np.array_equal(rgb[5:324:2, 9:520:2], rgb[4:324:2, 8:520:2])
+        assert rgb[0, 0].tolist() == [255, 0, 0] and rgb[324, 100].tolist() == [255, 0, 0]
+        # bpp inferred from padded files: latency is 2 bpp with spare words
+        path = RES / "bitmaps/latency/latency-672x384.mem"
+        assert infer_canvas(path, read_words(path)) == ((672, 384), 2)
+
+    def test_cli(self, tmp_path):
+        """Test previews for every res/bitmaps variant render in under a second."""
+        shutil.copytree(RES / "bitmaps", tmp_path / "bitmaps")
+        start = time.perf_counter()
+        assert main([str(tmp_path / "bitmaps")]) == 0
+        assert time.perf_counter() - start < 1
+        previews = sorted(tmp_path.rglob('*_preview.png'))
+        assert len(previews) == 6
+        with Image.open(tmp_path / "bitmaps/latency/latency-672x384_preview.png") as img:
+            assert img.size == (672, 384)
+        out = tmp_path / "scroll.png"
+        assert main([str(RES / "bitmaps/crocus/crocus-256x160.mem"), "--scroll", "8,4",
+            "--scale", "2", "-o", str(out)]) == 0
+        with Image.open(out) as img:
+            assert img.size == (512, 320)
@@ -0,0 +1,52 @@
+# Isle.Computer - Palette Extractor Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Palette Extractor Tests"""
+
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from bmpconv import read_palette, rgb555_to_rgb
+from palext import METHODS, extract, main
+
+CROCUS = Path(__file__).parent / "../../res/bitmaps/crocus"
+
+def hist_of(colrs, counts):
+    """Histogram with counts of RGB555 colours."""
+    hist = np.zeros(1 << 15, dtype=np.int64)
+    hist[colrs] = counts
+    return hist
+
+
+class TestPalext:
+    """Test class for palext."""
+
+    def test_extract(self):
+        """Test clusters of colours give their centres, sorted dark to light."""
+        assert extract(hist_of([0x7FFF, 0x0000, 0x001F], [1, 5, 2])).tolist() == \
+            [0x0000, 0x001F, 0x7FFF]
+        # two tight clusters: red and blue, each spread across neighbouring colours
+        reds = [(r << 10) | g for r in (28, 29, 30) for g in (0, 1)]
+        blues = [(b << 0) | (g << 5) for b in (20, 21) for g in (2, 3)]
+        hist = hist_of(reds + blues, [10] * len(reds) + [30] * len(blues))
+        assert all(len(extract(hist, 2, method)) == 2 for method in METHODS)
+        # median cut splits the heavier blue cluster; k-means moves to the cluster centres
+        rgb5 = rgb555_to_rgb(extract(hist, 2)) >> 3
+        assert rgb5.tolist() == [[0, 2, 21], [29, 0, 0]]
+
+    def test_cli(self, tmp_path):
+        """Test combined palette and palette per image."""
+        for i, colr in enumerate(((255, 0, 0), (0, 0, 255))):
+            Image.new('RGB', (8, 8), colr).save(tmp_path / f"img{i}.png")
+        out = tmp_path / "both.mem"
+        assert main([str(tmp_path), '-n', '4', '-o', str(out), '-j', '2']) == 0
+        assert read_palette(out).tolist() == [0x001F, 0x7C00]
+        assert out.read_text(encoding="utf-8").splitlines()[2] == "001F  // 0x0 - (00, 00, 31)"
+        pals = tmp_path / "pals"
+        assert main([str(CROCUS / "crocus-256x160.png"), str(tmp_path / "img1.png"),
+            '-d', str(pals)]) == 0
+        assert len(read_palette(pals / "crocus-256x160_palette.mem")) == 16
+        assert read_palette(pals / "img1_palette.mem").tolist() == [0x001F]
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Earthrise Animation Compiler
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Animation Compiler: keyframes to a base list and per-frame deltas"""
+
+# NB. Each object starts with a header word that loads xt and yt, then an
+#     optional word that loads its colour register. Earthrise translates
+#     coordinates on load, so moving an object only changes its header. Hidden
+#     objects replace the xt/yt word with a jump over the object. A frame's
+#     delta is the erlist words that differ from the frame before.
+#
+#     Earthrise keeps its registers between runs, so static drawing after an
+#     object (or at the start) reloads xt and yt with 0. Static draws should
+#     load their own colours if an object shares their colour register.
+
+import argparse
+import struct
+import sys
+from typing import NamedTuple
+
+from erasm import (COLR_MAP, INSTR_NOP, INSTR_STOP, asm_colr, asm_coord, asm_instrs,
+    pack_words, write_outputs)
+from ercost import FRAME_RATE
+from erpage import ERLIST_INSTRS
+
+UART_BAUD = 115200  # Isle UART baud rate (8N1: 10 bits per byte)
+JUMP_ADDR = 0xA000  # jump address instruction (byte address in low 12 bits)
+JUMP = 0xCA00       # jump instruction
+
+# delta stream: record count, then (erlist byte address, word) records
+DELTA_HEAD = struct.Struct('<H')
+DELTA_REC = struct.Struct('<HI')
+
+
+class Key(NamedTuple):
+    """Object keyframe at frame: position and colour."""
+    frame: int
+    x: int     # None if hidden
+    y: int     # None if hidden
+    colr: int  # None: unchanged
+
+
+class Obj(NamedTuple):
+    """Animated object: colour register (or None), body lines, and keyframes."""
+    name: str
+    colr_reg: str  # None if colour isn't animated
+    body: list
+    keys: list
+
+
+class Slot(NamedTuple):
+    """Object header in the base list: instruction index of header and object end."""
+    name: str
+    header: int
+    end: int
+    colr_reg: str
+
+
+class Anim(NamedTuple):
+    """Compiled animation: frame 0 words, per-frame deltas, and object slots."""
+    words: list
+    deltas: list
+    slots: list
+    frames: int
+
+
+def parse(lines):  # pylint: disable=too-many-branches
+    """Parse animation source; returns (sections, objects, frame count).
+
+    Sections are ('static', [(line number, line)]) or ('object', name).
+    """
+    sections, objects = [], {}
+    frames = None  # from .frames, else last keyframe + 1
+    frame = None   # current .frame
+    body = None    # lines of open .object
+    last = 0
+    for num, line in enumerate(lines, start=1):
+        tokens = line.split('#', 1)[0].split()
+        if not tokens:
+            continue
+        op = tokens[0]
+        try:
+            if body is not None:
+                if op == '.endo':
+                    body = None
+                else:
+                    body.append(object_line(num, line, op))
+            elif op == '.object':
+                obj = new_object(tokens, objects, frame)
+                objects[obj.name], body = obj, obj.body
+                sections.append(('object', obj.name))
+            elif op == '.frames':
+                frames = int(tokens[1], 0)
+                if frames < 1:
+                    raise ValueError(".frames needs at least one frame")
+            elif op == '.frame':
+                new = int(tokens[1], 0)
+                if frame is not None and new <= frame:
+                    raise ValueError(".frame numbers must increase")
+                frame = last = new
+            elif frame is not None:
+                if op not in objects:
+                    raise ValueError(f"Unknown object '{op}'")
+                objects[op].keys.append(parse_key(frame, tokens))
+            else:
+                if not sections or sections[-1][0] != 'static':
+                    sections.append(('static', []))
+                sections[-1][1].append((num, line))
+        except (ValueError, IndexError) as e:
+            raise ValueError(f"Error on line {num}: {e}") from e
+    if body is not None:
+        raise ValueError("Error: missing '.endo'")
+    return sections, objects, last + 1 if frames is None else frames
+
+
+def new_object(tokens, objects, frame):
+    """Object from '.object name [colour register]'; objects come before the first .frame."""
+    if frame is not None:
+        raise ValueError("objects must come before the first .frame")
+    if len(tokens) not in (2, 3) or tokens[1] in objects:
+        raise ValueError(".object needs a new name and optional colour register")
+    if len(tokens) == 3 and tokens[2] not in COLR_MAP:
+        raise ValueError(f"Unknown colour register '{tokens[2]}'")
+    return Obj(tokens[1], tokens[2] if len(tokens) == 3 else None, [], [])
+
+
+def object_line(num, line, op):
+    """Object body line as (line number, line); directives and xt/yt aren't allowed."""
+    if op.startswith('.'):
+        raise ValueError(f"'{op}' inside .object")
+    if op in ('xt', 'yt'):
+        raise ValueError("objects can't load xt or yt: keyframes set them")
+    return num, line
+
+
+def parse_key(frame, tokens):
+    """Keyframe from 'name x y [colour]' or 'name hide'."""
+    if tokens[1:] == ['hide']:
+        return Key(frame, None, None, None)
+    if len(tokens) not in (3, 4):
+        raise ValueError(f"keyframe needs '{tokens[0]} x y [colour]' or '{tokens[0]} hide'")
+    colr = int(tokens[3], 0) if len(tokens) == 4 else None
+    return Key(frame, int(tokens[1], 0), int(tokens[2], 0), colr)
+
+
+def obj_frames(obj, frames):
+    """Object (x, y, colr) for each frame (x, y None if hidden).
+
+    Positions between keys are linear.
+    """
+    keys = obj.keys or [Key(0, 0, 0, None)]
+    colrs, colr = [], 1  # colour registers reset to 1
+    for key in keys:  # colour holds until the next key that sets it
+        colr = colr if key.colr is None else key.colr
+        colrs.append(colr)
+    out, k = [], 0
+    for f in range(frames):
+        while k + 1 < len(keys) and keys[k+1].frame <= f:
+            k += 1
+        key, nxt = keys[k], keys[k+1] if k + 1 < len(keys) else None
+        x, y = key.x, key.y
+        if x is not None and nxt is not None and nxt.x is not None and f > key.frame:
+            t = (f - key.frame) / (nxt.frame - key.frame)
+            x, y = x + round((nxt.x - x) * t), y + round((nxt.y - y) * t)
+        out.append((x, y, colrs[k]))
+    return out
+
+
+def layout(sections, objects):
+    """Base instructions with object headers unset; returns (instrs, slots)."""
+    instrs, slots = [], []
+    restore = asm_instrs(["xt 0", "yt 0"]) if objects else []
+    for kind, item in sections:
+        if kind == 'static':
+            nums, lines = zip(*item)
+            instrs += restore + asm_instrs(lines, line_nums=nums)
+            continue
+        obj = objects[item]
+        if len(instrs) % 2:  # header must fill one erlist word
+            instrs.append(INSTR_NOP)
+        header = len(instrs)
+        instrs += [INSTR_NOP] * (4 if obj.colr_reg else 2)
+        if obj.body:
+            nums, lines = zip(*obj.body)
+            instrs += asm_instrs(lines, line_nums=nums)
+        slots.append(Slot(obj.name, header, len(instrs), obj.colr_reg))
+    instrs.append(INSTR_STOP)
+    if len(instrs) > ERLIST_INSTRS:
+        raise ValueError(f"animation needs {len(instrs)} instructions; "
+            f"erlist holds {ERLIST_INSTRS}")
+    return instrs, slots
+
+
+def frame_instrs(instrs, slots, values):
+    """Fill object headers with frame values {name: (x, y, colr)}."""
+    instrs = list(instrs)
+    for slot in slots:
+        x, y, colr = values[slot.name]
+        if x is None:  # hidden: jump to end of object
+            instrs[slot.header:slot.header+2] = [JUMP_ADDR | (2 * slot.end), JUMP]
+        else:
+            instrs[slot.header:slot.header+2] = [asm_coord('xt', x), asm_coord('yt', y)]
+        if slot.colr_reg is not None:
+            instrs[slot.header+2] = asm_colr(slot.colr_reg, colr)
+    return instrs
+
+
+def diff_words(old, new):
+    """Delta of erlist (byte address, word) writes turning old words into new."""
+    return [(4 * i, w) for i, (v, w) in enumerate(zip(old, new)) if v != w]
+
+
+def apply_delta(words, delta):
+    """Apply delta to a copy of words (list)."""
+    words = list(words)
+    for addr, word in delta:
+        words[addr >> 2] = word
+    return words
+
+
+def compile_anim(lines, loop=False):
+    """Compile animation source lines; deltas[i] takes frame i to frame i+1.
+
+    With loop, the last delta takes the final frame back to frame 0.
+    """
+    sections, objects, frames = parse(lines)
+    instrs, slots = layout(sections, objects)
+    per_obj = {name: obj_frames(obj, frames) for name, obj in objects.items()}
+    words = [pack_words(frame_instrs(instrs, slots,
+        {name: vals[f] for name, vals in per_obj.items()})).tolist() for f in range(frames)]
+    if loop:
+        words.append(words[0])
+    deltas = [diff_words(a, b) for a, b in zip(words, words[1:])]
+    return Anim(words[0], deltas, slots, frames)
+
+
+def delta_bytes(delta):
+    """Encode delta for streaming: little-endian count, then (address, word) records."""
+    return DELTA_HEAD.pack(len(delta)) + b''.join(DELTA_REC.pack(a, w) for a, w in delta)
+
+
+def frame_budget(baud=UART_BAUD, frame_rate=FRAME_RATE):
+    """UART bytes available per frame (8N1 sends 10 bits per byte)."""
+    return baud // 10 // frame_rate
+
+
+def format_report(anim, baud=UART_BAUD, frame_rate=FRAME_RATE):
+    """Summarise base list and delta sizes against the UART budget."""
+    sizes = [len(delta_bytes(d)) for d in anim.deltas]
+    budget = frame_budget(baud, frame_rate)
+    lines = [f"base list: {len(anim.words)} words ({4 * len(anim.words)} bytes), "
+        f"{len(anim.slots)} objects, {anim.frames} frames"]
+    if sizes:
+        lines.append(f"deltas: {min(sizes)}-{max(sizes)} bytes, mean {sum(sizes)/len(sizes):.1f}; "
+            f"budget {budget} bytes/frame at {baud} baud, {frame_rate} fps")
+        over = [i + 1 for i, s in enumerate(sizes) if s > budget]
+        if over:
+            lines.append(f"warning: {len(over)} deltas over budget (first at frame {over[0]})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Earthrise Animation Compiler")
+    parser.add_argument('file', help="animation source (.ean)")
+    parser.add_argument('-m', '--mem', metavar='FILE',
+        help="write base list in $readmemh format to FILE ('-' for stdout)")
+    parser.add_argument('-b', '--bin', metavar='FILE', help="write base list in binary to FILE")
+    parser.add_argument('-d', '--deltas', metavar='FILE',
+        help="write delta stream (binary) to FILE")
+    parser.add_argument('-l', '--loop', action='store_true',
+        help="add a delta from the last frame back to frame 0")
+    parser.add_argument('--baud', type=int, default=UART_BAUD,
+        help=f"UART baud rate for delta budget (default: {UART_BAUD})")
+    parser.add_argument('--fps', type=int, default=FRAME_RATE,
+        help=f"frame rate for delta budget (default: {FRAME_RATE})")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.file, 'r', encoding="utf-8") as f:
+            anim = compile_anim(f, args.loop)
+        write_outputs(anim.words, args.mem, args.bin)
+        if args.deltas is not None:
+            with open(args.deltas, 'wb') as f:
+                f.write(b''.join(map(delta_bytes, anim.deltas)))
+    except (OSError, ValueError) as e:
+        print(f"Animation error: {e}", file=sys.stderr)
+        return 1
+    print(format_report(anim, args.baud, args.fps), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
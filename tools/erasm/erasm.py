@@ -6,7 +6,70 @@
 
 """Earthrise Assembler"""
 
+import argparse
+import hashlib
+import json
+import os
 import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import ercost
+import ermacro
+import eropt
+import erpage
+from erstate import DRAW, analyse
+
+# array type code for 32-bit words ('I' is 32 bits on all common platforms)
+WORD_TYPE = 'I' if array('I').itemsize == 4 else 'L'
+
+# coordinate register opcodes (r0 shares opcode with x1)
+COORD_MAP = {
+    'x0': 0x0,
+    'y0': 0x1,
+    'x1': 0x2,
+    'y1': 0x3,
+    'x2': 0x4,
+    'y2': 0x5,
+    'x3': 0x6,
+    'y3': 0x7,
+    'xt': 0x8,
+    'yt': 0x9,
+    'r0': 0x2
+}
+
+# colour register functions (opcode 0xC)
+COLR_MAP = {
+    'lca': 0x0,
+    'lcb': 0x1,
+    'fca': 0x2,
+    'fcb': 0x3
+}
+
+# draw shape function and fill option (opcode 0xD)
+DRAW_MAP = {
+    'pix':   (0x0, 0),
+    'line':  (0x1, 0),
+    'circ':  (0x2, 0),
+    'circf': (0x2, 1),
+    'tri':   (0x3, 0),
+    'trif':  (0x3, 1),
+    'rect':  (0x4, 0),
+    'rectf': (0x4, 1)
+}
+
+# draw colour option bits
+DRAW_COLR_MAP = {
+    'ca': 0,
+    'cb': 2
+}
+
+INSTR_STOP = 0xCE00
+INSTR_NOP  = 0xCC00
+
+LINE_BLANK = -1  # line cache marker for blank and comment lines
+LINE_CACHE_MAX = 1 << 16  # maximum distinct lines to remember in asm_lines
 
 def parse_literal(lit_str):
     """Parse literal."""
@@ -24,138 +87,597 @@ def int_twos_comp_12(val):
 
 def asm_coord(reg, val):
     """Assemble coordinate registers instruction."""
-    coord_map = {
-        'x0': 0x0,
-        'y0': 0x1,
-        'x1': 0x2,
-        'y1': 0x3,
-        'x2': 0x4,
-        'y2': 0x5,
-        'x3': 0x6,
-        'y3': 0x7,
-        'xt': 0x8,
-        'yt': 0x9,
-        'r0': 0x2
-    }
-    if reg not in coord_map:
+    if reg not in COORD_MAP:
         raise ValueError(f"Unknown coordinate register '{reg}'")
-
-    opcode = coord_map[reg]
-    val12 = int_twos_comp_12(val)
-    instr = (opcode << 12) | val12
-    return instr
+    return enc_imm12(COORD_MAP[reg] << 12, val)
 
 
 def asm_colr(reg, val):
     """Assemble colour registers instruction."""
-    colr_map = {
-        'lca': 0x0,
-        'lcb': 0x1,
-        'fca': 0x2,
-        'fcb': 0x3
-    }
-    if reg not in colr_map:
+    if reg not in COLR_MAP:
         raise ValueError(f"Unknown colour register '{reg}'")
-
-    func = colr_map[reg]
-    val8 = val & 0xFF
-    instr = (0xC << 12) | (func << 8) | val8
-    return instr
+    return enc_imm8((0xC << 12) | (COLR_MAP[reg] << 8), val)
 
 
 def asm_draw(shape, colr):
     """Assemble draw instruction."""
-    draw_map = {
-        'pix':   [0x0, 0],
-        'line':  [0x1, 0],
-        'circ':  [0x2, 0],
-        'circf': [0x2, 1],
-        'tri':   [0x3, 0],
-        'trif':  [0x3, 1],
-        'rect':  [0x4, 0],
-        'rectf': [0x4, 1]
-    }
-    if shape not in draw_map:
-        raise ValueError(f"Unknown draw shape '{shape}'")
+    return enc_draw(0xD << 12, shape, colr)
+
+
+def enc_none(opcode):
+    """Encode instruction without operands."""
+    return opcode
 
-    func = draw_map[shape][0]
-    fill = draw_map[shape][1]
-    if colr == 'ca':
-        val8 = 0 | fill
-    elif colr == 'cb':
-        val8 = 2 | fill
-    else:
+
+def enc_imm12(opcode, val):
+    """Encode instruction with signed 12-bit immediate."""
+    return opcode | int_twos_comp_12(val)
+
+
+def enc_imm8(opcode, val):
+    """Encode instruction with 8-bit immediate."""
+    return opcode | (val & 0xFF)
+
+
+def enc_imm16(opcode, val):
+    """Encode raw 16-bit instruction (opcode is 0)."""
+    if val < 0 or val > 0xFFFF:
+        raise ValueError(f"Invalid 16-bit literal '{val}'")
+    return opcode | val
+
+
+def enc_draw(opcode, shape, colr):
+    """Encode draw instruction from shape and colour names."""
+    if shape not in DRAW_CODES:
+        raise ValueError(f"Unknown draw shape '{shape}'")
+    if colr not in DRAW_COLR_MAP:
         raise ValueError(f"Unknown colour '{colr}'")
+    return opcode | DRAW_CODES[shape] | DRAW_COLR_MAP[colr]
+
+
+# draw function and fill bits for each shape, ready to combine with colour
+DRAW_CODES = {shape: (func << 8) | fill for shape, (func, fill) in DRAW_MAP.items()}
+
+# encoders that take a literal operand
+LITERAL_ENCODERS = (enc_imm12, enc_imm8, enc_imm16)
+
+def build_instr_table():
+    """Build mnemonic -> (opcode, encoder, operand count) dispatch table."""
+    table = {
+        'stop': (INSTR_STOP, enc_none, 0),
+        'nop':  (INSTR_NOP, enc_none, 0),
+        'draw': (0xD << 12, enc_draw, 2),
+        'raw':  (0, enc_imm16, 1)  # any instruction, such as jumps
+    }
+    for reg, opc in COORD_MAP.items():
+        table[reg] = (opc << 12, enc_imm12, 1)
+    for reg, func in COLR_MAP.items():
+        table[reg] = ((0xC << 12) | (func << 8), enc_imm8, 1)
+    return table
+
+
+INSTR_TABLE = build_instr_table()
+
+def asm_error(line, tokens):
+    """Raise the appropriate error for a line that didn't match the table."""
+    instr = tokens[0]  # case sensitive - we don't use .lower()
 
-    instr = (0xD << 12) | (func << 8) | val8
-    return instr
+    if len(tokens) == 2:
+        if instr[0] in ('l', 'f'):  # line or fill colour
+            asm_colr(instr, parse_literal(tokens[1]))
+        elif instr[0] in ('r', 'x', 'y'):  # coordinate
+            asm_coord(instr, parse_literal(tokens[1]))
+    elif len(tokens) > 3:
+        raise ValueError(f"Unknown instruction format '{line.strip()}'")
+    raise ValueError(f"Unknown instruction '{instr}'")
 
 
 def asm_line(line):
     """Assemble line."""
-    line = line.partition('#')[0]  # remove comment - hash is always a comment
-    line = line.strip()
-    if not line:
+    line = line.split('#', 1)[0]  # remove comment - hash is always a comment
+    tokens = line.split()
+    if not tokens:
         return None
 
-    tokens = line.split()
+    entry = INSTR_TABLE.get(tokens[0])
+    if entry is None or len(tokens) != entry[2] + 1:
+        asm_error(line, tokens)
 
-    instr = tokens[0]  # case sensitive - we don't use .lower()
+    opcode, encoder, _ = entry
+    if encoder in LITERAL_ENCODERS:
+        return encoder(opcode, int(tokens[1], 0))  # infer base (2,8,10,16)
+    return encoder(opcode, *tokens[1:])
 
-    if len(tokens) == 1:
-        if instr == 'stop':
-            return 0xCE00
-        if instr == 'nop':
-            return 0xCC00
-        raise ValueError(f"Unknown instruction '{instr}'")
 
-    if len(tokens) == 2:
-        if instr[0] in ('l', 'f'):  # line or fill colour
-            val = parse_literal(tokens[1])
-            return asm_colr(instr, val)
-        if instr[0] in ('r', 'x', 'y'):  # coordinate
-            val = parse_literal(tokens[1])
-            return asm_coord(instr, val)
-        raise ValueError(f"Unknown instruction '{instr}'")
+def pack_words(instructions):
+    """Pack 16-bit instructions into 32-bit little-endian words (array)."""
+    if len(instructions) % 2 == 1:  # if odd number of instructions, append stop
+        instructions = list(instructions) + [INSTR_STOP]
 
-    if len(tokens) == 3:
-        if instr == 'draw':
-            return asm_draw(tokens[1], tokens[2])
-        raise ValueError(f"Unknown instruction '{instr}'")
+    # the first instruction of each pair goes in the lower half of the word
+    halves = array('H', instructions)
+    if sys.byteorder == 'big':
+        halves.byteswap()
+    words = array(WORD_TYPE)
+    words.frombytes(halves.tobytes())
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return words
 
-    raise ValueError(f"Unknown instruction format '{line}'")
 
+def asm_instrs(lines, sources=None, line_nums=None):
+    """Assemble iterable of lines (file, list, generator) into 16-bit instructions.
 
-def asm_file(file_input):
-    """Assemble file."""
+    If sources is a list, (line number, source text) is appended for each instruction.
+    line_nums gives the source line number of each line (default: count from 1).
+    """
     instructions = []  # assembled instructions
+    append = instructions.append
 
-    with open(file_input, 'r', encoding="utf-8") as f:
-        for line_num, line in enumerate(f, start=1):
-            # print(f"{line_num:03}: {line}", end='')
+    # generated drawings repeat many lines, so remember each line's encoding
+    cache = {}
+    numbered = enumerate(lines, start=1) if line_nums is None else zip(line_nums, lines)
+    for line_num, line in numbered:
+        instr = cache.get(line)
+        if instr is None:
             try:
                 instr = asm_line(line)
-                if instr is not None:
-                    instructions.append(instr)
             except Exception as e:
                 raise ValueError(f"Error on line {line_num}: {e}") from e
+            if instr is None:
+                instr = LINE_BLANK
+            if len(cache) < LINE_CACHE_MAX:
+                cache[line] = instr
+        if instr != LINE_BLANK:
+            append(instr)
+            if sources is not None:
+                sources.append((line_num, line.split('#', 1)[0].strip()))
+
+    return instructions
+
+
+def asm_lines(lines):
+    """Assemble iterable of lines (file, list, generator) into 32-bit words."""
+    return pack_words(asm_instrs(lines))
+
+
+def asm_bytes(lines):
+    """Assemble iterable of lines into little-endian bytes."""
+    return words_to_bytes(asm_lines(lines))
+
+
+def asm_source(file_input, sources=None):
+    """Assemble file, expanding macros, into 16-bit instructions."""
+    with open(file_input, 'r', encoding="utf-8") as f:
+        lines, line_nums = ermacro.expand(f, INSTR_TABLE)
+    return asm_instrs(lines, sources, line_nums)
+
+
+def asm_file(file_input):
+    """Assemble file into 32-bit words."""
+    return pack_words(asm_source(file_input))
+
+
+def words_to_bytes(words):
+    """Convert 32-bit words to little-endian bytes."""
+    if sys.byteorder == 'big':
+        words = array(WORD_TYPE, words)
+        words.byteswap()
+    return words.tobytes()
+
+
+def words_to_mem(words):
+    """Format 32-bit words as $readmemh text."""
+    if not words:
+        return ""
+    return "\n".join(f"{w:08X}" for w in words) + "\n"
+
+
+def write_mem(words, f):
+    """Write 32-bit words to text file in $readmemh format (single write)."""
+    f.write(words_to_mem(words))
+
+
+def write_bin(words, f):
+    """Write 32-bit words to binary file in little-endian format (single write)."""
+    f.write(words_to_bytes(words))
+
+
+def pass_keep(instrs, optimise=False, cull=None):
+    """Indices of instructions kept by optional passes; cull is canvas (w, h)."""
+    keep = None
+    if cull is not None:
+        keep = eropt.cull_keep(instrs, cull)
+    if optimise:
+        keep = eropt.optimise_keep(instrs, keep)
+    return list(range(len(instrs))) if keep is None else keep
+
+
+def asm_program(file_input, optimise=False, cull=None):
+    """Assemble file applying optional passes; returns (words, instructions saved)."""
+    instrs = asm_source(file_input)
+    keep = pass_keep(instrs, optimise, cull)
+    return pack_words([instrs[i] for i in keep]), len(instrs) - len(keep)
+
+
+def cull_stats(file_input, canvas):
+    """Work culled from file for canvas (w, h): (shapes, instructions, cycles)."""
+    return cull_counts(asm_source(file_input), canvas)
+
+
+def cull_counts(instrs, canvas):
+    """Work culled from instructions for canvas (w, h): (shapes, instructions, cycles)."""
+    kept = [instrs[i] for i in eropt.cull_keep(instrs, canvas)]
+    shapes = sum(analyse(i)[0] == DRAW for i in instrs) - sum(analyse(i)[0] == DRAW for i in kept)
+    cycles = ercost.estimate(instrs).cycles - ercost.estimate(kept).cycles
+    return shapes, len(instrs) - len(kept), cycles
+
+
+def kept_source(file_input, optimise=False, cull=None):
+    """Instructions left after passes, with their (line number, source text)."""
+    sources = []
+    instrs = asm_source(file_input, sources)
+    keep = pass_keep(instrs, optimise, cull)
+    return [instrs[i] for i in keep], [sources[i] for i in keep]
+
+
+def cycle_report(file_input, *, optimise=False,  # pylint: disable=too-many-arguments
+        canvas=None, clock=ercost.SYS_CLOCK, frame_rate=ercost.FRAME_RATE, cull=None):
+    """Estimate Earthrise cycles for a source file; returns text report."""
+    instrs, sources = kept_source(file_input, optimise, cull)
+    return cycle_text(instrs, sources, canvas, clock, frame_rate)
+
+
+def cycle_text(instrs, sources, canvas, clock, frame_rate):
+    """Cycle report for instructions with their (line number, source text)."""
+    est = ercost.estimate(instrs, canvas)
+    return ercost.format_report(est, [f"{num:4}: {text}" for num, text in sources],
+        clock, frame_rate)
+
+
+def listing(file_input, optimise=False, cull=None):
+    """Listing of assembled file: byte address, instruction, file:line, and source.
+
+    Addresses are Earthrise pc values, so a listing maps pc back to source.
+    The file is given by name only, so listings don't depend on the
+    directory erasm ran from.
+    """
+    sources = []
+    instrs = asm_source(file_input, sources)
+    return listing_text(Path(file_input).name, instrs, sources,
+        pass_keep(instrs, optimise, cull))
+
+
+def listing_text(name, instrs, sources, keep):
+    """Listing of kept instructions from file name, with their (line number, source text)."""
+    lines = [f"{2*addr:04X}  {instrs[i]:04X}  {name}:{sources[i][0]}  {sources[i][1]}"
+        for addr, i in enumerate(keep)]
+    if len(keep) % 2:  # pack_words pads odd programs with stop
+        lines.append(f"{2*len(keep):04X}  {INSTR_STOP:04X}  -  stop")
+    return "".join(line + "\n" for line in lines)
+
+
+def write_outputs(words, mem_path=None, bin_path=None):
+    """Write words to $readmemh and/or binary files ('-' for stdout mem)."""
+    if mem_path == '-':
+        write_mem(words, sys.stdout)
+    elif mem_path is not None:
+        with open(mem_path, 'w', encoding="utf-8") as f:
+            write_mem(words, f)
+    if bin_path is not None:
+        with open(bin_path, 'wb') as f:
+            write_bin(words, f)
+
+
+def write_page(instrs, out_dir, name, fmt):
+    """Write one page's instructions as name.mem and/or name.bin; returns (mem, bin) names."""
+    words = pack_words(instrs)
+    mem_name = f"{name}.mem" if fmt in ('mem', 'both') else None
+    bin_name = f"{name}.bin" if fmt in ('bin', 'both') else None
+    write_outputs(words, mem_name and os.path.join(out_dir, mem_name),
+        bin_name and os.path.join(out_dir, bin_name))
+    return mem_name, bin_name
+
+
+def write_pages(file_input, out_dir, *, fmt='mem',  # pylint: disable=too-many-arguments
+        optimise=False, page_size=erpage.ERLIST_INSTRS, cull=None):
+    """Assemble file into erlist pages and JSON manifest in out_dir; returns manifest."""
+    instrs, sources = kept_source(file_input, optimise, cull)
+
+    stem = Path(file_input).stem
+    os.makedirs(out_dir, exist_ok=True)
+    entries = []
+    for num, page in enumerate(erpage.paginate(instrs, page_size)):
+        names = write_page(page.instrs, out_dir, f"{stem}-{num:03d}", fmt)
+        entries.append({
+            'mem': names[0],
+            'bin': names[1],
+            'words': (len(page.instrs) + 1) // 2,
+            'instructions': len(page.instrs),
+            'prologue': page.prologue,
+            'lines': [sources[page.start][0], sources[page.end-1][0]],
+            'cycles': ercost.estimate(page.instrs).cycles
+        })
+
+    manifest = {'source': str(file_input), 'page_size': page_size, 'pages': entries}
+    with open(os.path.join(out_dir, f"{stem}.json"), 'w', encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return manifest
+
+
+#
+# Batch assembly
+#
+
+CACHE_FILE = '.erasm-cache.json'  # default cache file (in output or current dir)
+
+def tool_hash():
+    """Hash of the assembler modules, so changes to erasm invalidate the cache."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).resolve().parent.glob('*.py')):
+        if not path.name.startswith('test_'):
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def find_sources(paths):
+    """Expand files and directories into (source, relative output stem) pairs."""
+    sources = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            for src in sorted(path.rglob('*.eas')):
+                sources.append((src, src.relative_to(path).with_suffix('')))
+        else:
+            sources.append((path, Path(path.stem)))
+    return sources
+
+
+def build_file(job):
+    """Assemble one source file to its outputs (runs in worker process)."""
+    src, mem_path, bin_path, optimise, cull = job
+    try:
+        words, saved = asm_program(src, optimise, cull)
+        for path in (mem_path, bin_path):
+            if path is not None:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        write_outputs(words, mem_path, bin_path)
+    except Exception as e:  # pylint: disable=broad-except
+        return f"{src}: {e}", 0
+    return None, saved
+
+
+def output_stat(path):
+    """Size and modification time of an output file (None if missing)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def load_cache(cache_path):
+    """Load build cache; a missing or corrupt cache is empty."""
+    try:
+        with open(cache_path, 'r', encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache_path, cache):
+    """Save build cache atomically."""
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w', encoding="utf-8") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def stale_jobs(paths, out_dir, fmt, cache, salt):
+    """Build jobs for sources whose hash or outputs differ from the cache.
+
+    Returns ([(job, cache key, source hash, outputs)], count of up-to-date sources).
+    """
+    pending = []
+    skipped = 0
+    for src, stem in find_sources(paths):
+        base = Path(out_dir) / stem if out_dir else src.with_suffix('')
+        out_paths = (str(base.with_suffix('.mem')) if fmt in ('mem', 'both') else None,
+            str(base.with_suffix('.bin')) if fmt in ('bin', 'both') else None)
+        with open(src, 'rb') as f:
+            src_hash = hashlib.sha256(salt + f.read()).hexdigest()
+        outputs = [p for p in out_paths if p is not None]
+        entry = cache.get(os.path.abspath(src))
+        if entry and entry['hash'] == src_hash and entry['outputs'] == {
+                p: output_stat(p) for p in outputs}:
+            skipped += 1
+            continue
+        pending.append(((str(src),) + out_paths, os.path.abspath(src), src_hash, outputs))
+    return pending, skipped
+
+
+def run_jobs(job_list, jobs=None):
+    """Run build jobs in a process pool (or in this process for one job or worker)."""
+    if jobs == 1 or len(job_list) == 1:
+        return list(map(build_file, job_list))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        chunk = max(1, len(job_list) // (4 * (jobs or os.cpu_count() or 1)))
+        return list(pool.map(build_file, job_list, chunksize=chunk))
+
+
+def update_cache(cache, pending, results):
+    """Record built jobs in cache and drop failed ones; returns (errors, instructions saved)."""
+    errors = []
+    saved = 0
+    for (_, key, src_hash, outputs), (err, file_saved) in zip(pending, results):
+        saved += file_saved
+        if err is None:
+            cache[key] = {
+                'hash': src_hash,
+                'outputs': {p: output_stat(p) for p in outputs}
+            }
+        else:
+            cache.pop(key, None)
+            errors.append(err)
+    return errors, saved
+
+
+def build_files(paths, out_dir=None, *, fmt='mem', jobs=None,  # pylint: disable=too-many-arguments
+        cache_path=None, optimise=False, cull=None):
+    """
+    Assemble many files or directories of .eas files across a process pool.
+    Skips sources whose content hash matches the cache and whose outputs are
+    unchanged. Returns (built, skipped, errors, instructions saved).
+    """
+    if cache_path is None:
+        cache_path = os.path.join(out_dir or '.', CACHE_FILE)
+    cache = load_cache(cache_path)
+    salt = f"{tool_hash()}:{fmt}:{int(optimise)}:{cull}".encode()
+    pending, skipped = stale_jobs(paths, out_dir, fmt, cache, salt)
+
+    errors = []
+    saved = 0
+    if pending:
+        results = run_jobs([job + (optimise, cull) for job, *_ in pending], jobs)
+        errors, saved = update_cache(cache, pending, results)
+        save_cache(cache_path, cache)
+
+    return len(pending) - len(errors), skipped, errors, saved
+
+
+def canvas_size(arg):
+    """Parse canvas size 'WxH' for argparse."""
+    try:
+        width, height = (int(v) for v in arg.lower().split('x'))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"canvas size must be WxH, not '{arg}'") from e
+    return width, height
+
+
+def job_count(arg):
+    """Parse number of worker processes for argparse."""
+    try:
+        jobs = int(arg)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"jobs must be a number, not '{arg}'") from e
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"jobs must be at least 1, not {jobs}")
+    return jobs
+
+
+def main_batch(args, cull):
+    """Command line batch assembly; returns exit status."""
+    built, skipped, errors, saved = build_files(args.file, args.out_dir,
+        fmt=args.format, jobs=args.jobs, cache_path=args.cache, optimise=args.optimise,
+        cull=cull)
+    for err in errors:
+        print(f"Assembly error: {err}", file=sys.stderr)
+    print(f"erasm: {built} built, {skipped} up to date, {len(errors)} failed",
+        file=sys.stderr)
+    if args.optimise or args.cull:
+        print(f"erasm: passes saved {saved} instructions", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main_pages(args, cull):
+    """Command line assembly to erlist pages; returns exit status."""
+    try:
+        manifest = write_pages(args.file[0], args.pages, fmt=args.format,
+            optimise=args.optimise, page_size=args.page_size, cull=cull)
+    except Exception as e:  # pylint: disable=broad-except
+        print(f"Assembly error: {e}", file=sys.stderr)
+        return 1
+    print(f"erasm: wrote {len(manifest['pages'])} pages to {args.pages}", file=sys.stderr)
+    return 0
+
+
+def main_single(args, cull):
+    """Command line assembly of a single file; returns exit status."""
+    try:  # assemble once for every output and report
+        sources = []
+        instrs = asm_source(args.file[0], sources)
+        keep = pass_keep(instrs, args.optimise, cull)
+        shapes, culled, cycles = cull_counts(instrs, cull) if args.cull else (0, 0, 0)
+        if args.listing is not None:
+            with open(args.listing, 'w', encoding="utf-8") as f:
+                f.write(listing_text(Path(args.file[0]).name, instrs, sources, keep))
+    except Exception as e:  # pylint: disable=broad-except
+        print(f"Assembly error: {e}", file=sys.stderr)
+        return 1
+    words, saved = pack_words([instrs[i] for i in keep]), len(instrs) - len(keep)
+    if len(words) * 2 > erpage.ERLIST_INSTRS:
+        print(f"erasm: warning: {len(words) * 2} instructions don't fit the "
+            f"{erpage.ERLIST_INSTRS}-instruction erlist; use --pages", file=sys.stderr)
+    if args.cull:
+        print(f"erasm: culled {shapes} shapes off canvas: {culled} instructions, "
+            f"{cycles} cycles", file=sys.stderr)
+    if args.optimise:
+        print(f"erasm: optimiser saved {saved - culled} instructions", file=sys.stderr)
+
+    if args.cycles:
+        sys.stdout.write(cycle_text([instrs[i] for i in keep], [sources[i] for i in keep],
+            args.canvas, args.clock, args.fps))
+    elif args.mem is None and args.bin is None:
+        args.mem = '-'  # default to $readmemh on stdout
+    write_outputs(words, args.mem, args.bin)
+    return 0
+
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Earthrise Assembler")
+    parser.add_argument('file', nargs='+',
+        help="assembler source files (.eas) or directories of source files")
+    parser.add_argument('-o', '--mem', metavar='FILE',
+        help="write $readmemh output to FILE ('-' for stdout); single file only")
+    parser.add_argument('-b', '--bin', metavar='FILE',
+        help="write little-endian binary output to FILE; single file only")
+    parser.add_argument('-O', '--optimise', action='store_true',
+        help="remove nops and redundant or dead register loads")
+    parser.add_argument('-C', '--cull', action='store_true',
+        help="remove shapes outside --canvas and the loads that only feed them")
+    parser.add_argument('-d', '--out-dir', metavar='DIR',
+        help="batch: write outputs to DIR (default: next to each source)")
+    parser.add_argument('-f', '--format', choices=('mem', 'bin', 'both'), default='mem',
+        help="batch: output format (default: mem)")
+    parser.add_argument('-j', '--jobs', type=job_count,
+        help="batch: number of worker processes (default: CPU count)")
+    parser.add_argument('--cache', metavar='FILE',
+        help=f"batch: build cache file (default: {CACHE_FILE} in output dir)")
+    parser.add_argument('-p', '--pages', metavar='DIR',
+        help="split program into erlist pages with manifest in DIR; single file only")
+    parser.add_argument('--page-size', type=int, default=erpage.ERLIST_INSTRS,
+        help=f"pages: instructions per page (default: {erpage.ERLIST_INSTRS})")
+    parser.add_argument('-l', '--listing', metavar='FILE',
+        help="write listing (address, instruction, file:line, source) to FILE; single file only")
+    parser.add_argument('--cycles', action='store_true',
+        help="report estimated Earthrise cycles instead of writing stdout output")
+    parser.add_argument('--canvas', metavar='WxH', type=canvas_size,
+        help="canvas size for culling and clipped pixel counts, e.g. 672x384")
+    parser.add_argument('--clock', type=float, default=ercost.SYS_CLOCK,
+        help=f"cycles: system clock in Hz (default: {ercost.SYS_CLOCK:g})")
+    parser.add_argument('--fps', type=float, default=ercost.FRAME_RATE,
+        help=f"cycles: frame rate in Hz (default: {ercost.FRAME_RATE})")
+    args = parser.parse_args(argv)
+    if args.cull and args.canvas is None:
+        parser.error("--cull needs --canvas")
+    cull = args.canvas if args.cull else None
 
-    # if odd number of instructions, append stop
-    if len(instructions) % 2 == 1:
-        instructions.append(0xCE00)
+    batch = len(args.file) > 1 or os.path.isdir(args.file[0]) or args.out_dir is not None
+    if batch:
+        if args.mem is not None or args.bin is not None:
+            parser.error("-o and -b need a single source file; use -d and -f for batches")
+        if args.cycles or args.pages is not None or args.listing is not None:
+            parser.error("--cycles, --pages, and --listing need a single source file")
+        return main_batch(args, cull)
 
-    # output 32-bit little endian format
-    for i in range(0, len(instructions), 2):
-        instr32 = instructions[i+1] << 16 | instructions[i]
-        print(f"{instr32:08X}")
+    if args.pages is not None:
+        if args.listing is not None:
+            parser.error("--listing doesn't support --pages")
+        return main_pages(args, cull)
 
+    return main_single(args, cull)
 
 if __name__ == "__main__":
-    if len(sys.argv) == 2:
-        try:
-            asm_file(sys.argv[1])
-        except Exception as e:  # pylint: disable=broad-except
-            print(f"Assembly error: {e}", file=sys.stderr)
-            sys.exit(1)
-    else:
-        print("erasm.py filename.eas")
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Earthrise Assembler Benchmark
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Assembler Benchmark"""
+
+import argparse
+import random
+import sys
+import time
+
+from erasm import asm_lines
+
+def gen_mesh(line_cnt, canv_w=336, canv_h=192):
+    """Generate triangle mesh drawing lines (7 lines per triangle)."""
+    lines = []
+    while len(lines) < line_cnt:
+        for reg, lim in (('x0', canv_w), ('y0', canv_h), ('x1', canv_w),
+                         ('y1', canv_h), ('x2', canv_w), ('y2', canv_h)):
+            lines.append(f"{reg} {random.randrange(lim)}")
+        lines.append("draw trif ca" if random.getrandbits(1) else "draw tri cb")
+    return lines[:line_cnt]
+
+
+def gen_plot(line_cnt, canv_w=336, canv_h=192):
+    """Generate plotted data drawing lines (one pixel per x-coordinate)."""
+    lines = ["lca 10"]
+    x = 0
+    while len(lines) < line_cnt:
+        lines.append(f"x0 {x}")
+        lines.append(f"y0 {random.randrange(canv_h)}  # sample {x}")
+        lines.append("draw pix ca")
+        x = (x + 1) % canv_w
+    return lines[:line_cnt]
+
+
+def gen_unique(line_cnt):
+    """Generate lines that are all different (worst case for line cache)."""
+    return [f"x{i % 4} {random.randrange(-2048, 2048)}  # {i}" for i in range(line_cnt)]
+
+
+GENERATORS = {
+    'mesh': gen_mesh,
+    'plot': gen_plot,
+    'unique': gen_unique
+}
+
+def bench(lines, repeat):
+    """Return best time to assemble lines (seconds) and word count."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        words = asm_lines(lines)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(words)
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Earthrise Assembler Benchmark")
+    parser.add_argument('-n', '--lines', type=int, default=1_000_000,
+        help="lines per synthetic drawing (default: 1,000,000)")
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+        help="runs per drawing, best time is reported (default: 3)")
+    parser.add_argument('-d', '--drawing', choices=GENERATORS, action='append',
+        help="synthetic drawing to assemble (default: all)")
+    parser.add_argument('--limit', type=float, metavar='SECONDS',
+        help="fail if any drawing except 'unique' takes longer than SECONDS")
+    parser.add_argument('--seed', type=int, default=1, help="random seed")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    failed = False
+    for name in args.drawing or GENERATORS:
+        lines = GENERATORS[name](args.lines)
+        elapsed, word_cnt = bench(lines, args.repeat)
+        print(f"{name:>6}: {len(lines):,} lines -> {word_cnt:,} words in {elapsed:.3f} s"
+              f" ({len(lines) / elapsed / 1e6:.2f} M lines/s)")
+        if args.limit is not None and name != 'unique' and elapsed > args.limit:
+            print(f"{name:>6}: slower than limit of {args.limit} s", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
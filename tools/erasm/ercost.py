@@ -0,0 +1,117 @@
+# Isle.Computer - Earthrise Cycle Cost Estimator
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Cycle Cost Estimator"""
+
+from typing import NamedTuple
+
+from erstate import (
+    DRAW,
+    LCA,
+    OTHER,
+    STOP,
+    ErState,
+    analyse
+)
+from ermodel import (
+    INSTR_CYCLES,
+    START_CYCLES,
+    STOP_CYCLES,
+    draw_shape
+)
+
+SYS_CLOCK = 20_000_000  # Isle system clock (Hz)
+FRAME_RATE = 60  # display frame rate (Hz)
+
+class InstrCost(NamedTuple):
+    """Estimated cost of one instruction."""
+    cycles: int
+    pixels: int = 0   # pixels Earthrise calculates
+    clipped: int = 0  # pixels outside the canvas (calculated but not written)
+    note: str = ''
+
+
+class Estimate(NamedTuple):
+    """Estimated cost of a program."""
+    costs: list  # InstrCost for each instruction executed
+    cycles: int  # total cycles (estimate of Earthrise cycle_cnt)
+    note: str = ''
+
+
+def clip_count(shape, canvas):
+    """Count pixels and spans outside canvas (w, h)."""
+    if canvas is None:
+        return 0
+    w, h = canvas
+    clipped = sum(1 for x, y in shape.pixels if not (0 <= x < w and 0 <= y < h))
+    for y, xa, xb in shape.spans:
+        if 0 <= y < h:
+            clipped += (xb - xa + 1) - max(0, min(xb, w - 1) - max(xa, 0) + 1)
+        else:
+            clipped += xb - xa + 1
+    return clipped
+
+
+def estimate(instrs, canvas=None, state=None):
+    """Estimate cycles for each instruction; canvas (w, h) enables clip counts.
+
+    Registers start as they are after reset unless an ErState is given.
+    """
+    state = ErState.reset() if state is None else state.copy()
+    costs = []
+    total = START_CYCLES
+    for instr in instrs:
+        kind, reads, _ = analyse(instr)
+        if kind == DRAW:
+            if any(state.regs[reg] is None for reg in reads if reg < LCA):
+                cost = InstrCost(INSTR_CYCLES, note="registers unknown; shape not estimated")
+            else:
+                shape = draw_shape(state.regs, instr)
+                pixels = len(shape.pixels) + sum(xb - xa + 1 for _, xa, xb in shape.spans)
+                cost = InstrCost(shape.cycles, pixels, clip_count(shape, canvas),
+                    "degenerate triangle: Earthrise halts" if shape.halt else '')
+                if shape.halt:
+                    costs.append(cost)
+                    return Estimate(costs, total + cost.cycles, cost.note)
+        elif kind == STOP:
+            costs.append(InstrCost(STOP_CYCLES))
+            return Estimate(costs, total + STOP_CYCLES)
+        elif kind == OTHER:
+            cost = InstrCost(INSTR_CYCLES, note="flow control isn't followed")
+        else:
+            cost = InstrCost(INSTR_CYCLES)
+        state.step(instr)
+        costs.append(cost)
+        total += cost.cycles
+    return Estimate(costs, total, "no stop: Earthrise continues to end of command list")
+
+
+def format_report(est, sources=None, clock=SYS_CLOCK, frame_rate=FRAME_RATE, top=5):
+    """Format per-instruction and total cycle estimate as text."""
+    out = ["addr    cycles   pixels  clipped  source"]
+    for i, cost in enumerate(est.costs):
+        src = sources[i] if sources else ''
+        note = f"  ({cost.note})" if cost.note else ''
+        out.append(f"0x{2*i:03X} {cost.cycles:9,} {cost.pixels:8,} {cost.clipped:8,}  {src}{note}")
+
+    frame_cycles = clock / frame_rate
+    pixels = sum(c.pixels for c in est.costs)
+    clipped = sum(c.clipped for c in est.costs)
+    out.append("")
+    out.append(f"total: {len(est.costs)} instructions, {est.cycles:,} cycles, "
+        f"{est.cycles / clock * 1e6:,.1f} us at {clock / 1e6:g} MHz "
+        f"({100 * est.cycles / frame_cycles:.1f}% of a {frame_rate:g} Hz frame)")
+    out.append(f"pixels: {pixels:,} calculated, {clipped:,} clipped")
+    if est.note:
+        out.append(f"note: {est.note}")
+
+    draws = sorted((i for i, c in enumerate(est.costs) if c.pixels),
+        key=lambda i: -est.costs[i].cycles)
+    if draws:
+        out.append("")
+        out.append("most expensive:")
+        for i in draws[:top]:
+            src = sources[i] if sources else ''
+            out.append(f"0x{2*i:03X} {est.costs[i].cycles:9,}  {src}")
+    return "\n".join(out) + "\n"
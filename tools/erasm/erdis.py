@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Earthrise Disassembler
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Disassembler: $readmemh or binary command lists to erasm source"""
+
+# NB. Output uses the syntax erasm accepts and reassembles to the same words.
+#     Instructions without a mnemonic (jumps, invalid, unused bits) use raw.
+
+import argparse
+import re
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from erasm import COLR_MAP, COORD_MAP, DRAW_COLR_MAP, DRAW_MAP, INSTR_NOP, INSTR_STOP
+
+MEM_COMMENT = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+def draw_table():
+    """Draw source text indexed by (function << 2) | option bits ('' if invalid)."""
+    # function and fill from DRAW_MAP; colour from option bit 1
+    names = np.full(32, '', dtype=object)
+    for shape, (func, filled) in DRAW_MAP.items():
+        for colr, bits in DRAW_COLR_MAP.items():
+            names[(func << 2) | bits | filled] = f"draw {shape} {colr}"
+    return names
+
+
+@lru_cache(maxsize=None)
+def dis_table():
+    """Source text for every 16-bit instruction (NumPy object array)."""
+    codes = np.arange(0x10000, dtype=np.int32)
+    opc, fun = codes >> 12, (codes >> 8) & 0xF
+    imm8, imm12 = codes & 0xFF, codes & 0xFFF
+    val12 = imm12 - ((imm12 & 0x800) << 1)  # sign extend
+    table = np.char.mod('raw 0x%04X', codes).astype(object)
+
+    def fill(mask, names, vals=None):
+        text = names if vals is None else np.char.add(np.char.add(names, ' '),
+            vals[mask].astype(str))
+        table[mask] = text
+
+    coord_names = np.array(sorted((k for k in COORD_MAP if k != 'r0'), key=COORD_MAP.get))
+    mask = opc < len(coord_names)
+    fill(mask, coord_names[opc[mask]], val12)
+
+    colr_names = np.array(sorted(COLR_MAP, key=COLR_MAP.get))
+    mask = (opc == 0xC) & (fun < len(colr_names))
+    fill(mask, colr_names[fun[mask]], imm8)
+
+    draw_names = draw_table()
+    code = np.where((opc == 0xD) & (fun < 8) & (imm8 < 4), (fun << 2) | imm8, 0)
+    mask = (opc == 0xD) & (fun < 8) & (imm8 < 4) & (draw_names[code] != '')
+    table[mask] = draw_names[code[mask]]
+
+    table[INSTR_NOP] = 'nop'
+    table[INSTR_STOP] = 'stop'
+    return table
+
+
+def read_mem(text):
+    """Parse $readmemh text into 32-bit words (NumPy array)."""
+    tokens = MEM_COMMENT.sub(' ', text).split()
+    if all(len(t) == 8 for t in tokens):  # fast path: contiguous 32-bit words
+        try:
+            return np.frombuffer(bytes.fromhex(''.join(tokens)), dtype='>u4').astype('<u4')
+        except ValueError:
+            pass  # address or invalid token: parse one at a time for the error
+
+    words = {}
+    addr = 0
+    for token in tokens:
+        token = token.replace('_', '')
+        if token.startswith('@'):
+            addr = int(token[1:], 16)
+            continue
+        try:
+            words[addr] = int(token, 16)
+        except ValueError as e:
+            raise ValueError(f"Invalid $readmemh token '{token}'") from e
+        addr += 1
+    mem = np.zeros(max(words, default=-1) + 1, dtype='<u4')
+    mem[list(words)] = list(words.values())
+    return mem
+
+
+def read_bin(data):
+    """Parse little-endian binary into 32-bit words (NumPy array)."""
+    if len(data) % 4:
+        raise ValueError(f"Binary length {len(data)} isn't a multiple of 4 bytes")
+    return np.frombuffer(data, dtype='<u4')
+
+
+def words_to_instrs(words):
+    """Split 32-bit words into 16-bit instructions; the lower half runs first."""
+    return np.ascontiguousarray(words, dtype='<u4').view('<u2')
+
+
+def disassemble(words, until_stop=False, addresses=False):
+    """Disassemble 32-bit words into a list of source lines."""
+    instrs = words_to_instrs(words)
+    if until_stop:
+        stops = np.flatnonzero(instrs == INSTR_STOP)
+        if stops.size:
+            instrs = instrs[:stops[0] + 1]
+    lines = dis_table()[instrs]
+    if addresses:  # byte address and encoding as a comment (ignored by erasm)
+        comments = np.char.mod('  # 0x%03X: ', 2 * np.arange(instrs.size))
+        comments = np.char.add(comments, np.char.mod('%04X', instrs))
+        lines = np.char.add(np.char.ljust(lines.astype(str), 16), comments)
+    return lines.tolist()
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Earthrise Disassembler")
+    parser.add_argument('file', help="command list: $readmemh (.mem) or binary (.bin)")
+    parser.add_argument('-o', '--output', metavar='FILE', help="output file (default: stdout)")
+    parser.add_argument('-b', '--bin', action='store_true',
+        help="input is binary (default: binary if file ends .bin)")
+    parser.add_argument('-s', '--until-stop', action='store_true',
+        help="stop after the first stop instruction")
+    parser.add_argument('-a', '--addresses', action='store_true',
+        help="add address and encoding comments")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.bin or args.file.endswith('.bin'):
+            with open(args.file, 'rb') as f:
+                words = read_bin(f.read())
+        else:
+            with open(args.file, 'r', encoding="utf-8") as f:
+                words = read_mem(f.read())
+    except (OSError, ValueError) as e:
+        print(f"Disassembly error: {e}", file=sys.stderr)
+        return 1
+
+    lines = disassemble(words, args.until_stop, args.addresses)
+    text = "\n".join(lines) + "\n" if lines else ""
+    if args.output is None:
+        sys.stdout.write(text)
+    else:
+        with open(args.output, 'w', encoding="utf-8") as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# Isle.Computer - Earthrise Assembler Macros
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Assembler Macros: shape instances with the translation registers"""
+
+# NB. Earthrise adds the translation registers when a coordinate is loaded, not
+#     when a shape is drawn, so each instance reloads the shape's coordinates
+#     after setting xt and yt. Loads that don't change a translated coordinate
+#     are removed by the optimiser (-O).
+
+MACRO_DEPTH = 32  # maximum nesting of instances and repeats
+
+# registers translated on load (x1 load also sets r0)
+TRANS_COORDS = frozenset(('x0', 'y0', 'x1', 'y1', 'x2', 'y2', 'x3', 'y3', 'r0'))
+
+TRANS_REGS = ('xt', 'yt')
+
+
+class Expander:
+    """Expand macro instances and repeats into plain assembler lines."""
+
+    def __init__(self, reserved=()):
+        self.reserved = frozenset(reserved)  # names macros can't take, e.g. instructions
+        self.macros = {}  # name -> (params, body [(line number, line)])
+        self.lines = []
+        self.line_nums = []
+        self.trans = [None, None]  # translation loaded by expanded program (None: unknown)
+
+    def emit(self, num, line):
+        """Output line with source line number."""
+        self.lines.append(line)
+        self.line_nums.append(num)
+
+    def set_trans(self, num, want):
+        """Load translation registers that differ from want."""
+        for axis in (0, 1):
+            if want[axis] is not None and self.trans[axis] != want[axis]:
+                self.emit(num, f"{TRANS_REGS[axis]} {want[axis]}")
+                self.trans[axis] = want[axis]
+
+    @staticmethod
+    def displace(want):
+        """Instances move the translation; unknown translation is taken as 0 (reset)."""
+        for axis in (0, 1):
+            if want[axis] is None:
+                want[axis] = 0
+
+    @staticmethod
+    def block(items, pos, start, end):
+        """Find end of block opened at items[pos]; returns (body, index after end)."""
+        depth = 0
+        for i in range(pos + 1, len(items)):
+            tokens = items[i][1].split('#', 1)[0].split()
+            if tokens and tokens[0] == start:
+                depth += 1
+            elif tokens and tokens[0] == end:
+                if depth == 0:
+                    return items[pos+1:i], i + 1
+                depth -= 1
+        raise ValueError(f"Error on line {items[pos][0]}: missing '{end}'")
+
+    def define(self, num, tokens, body):
+        """Define macro from '.macro name [param ...]'."""
+        if len(tokens) < 2:
+            raise ValueError(f"Error on line {num}: .macro needs a name")
+        name, params = tokens[1], tokens[2:]
+        if (name.startswith('.') or name in TRANS_COORDS or name in TRANS_REGS
+                or name in self.reserved):
+            raise ValueError(f"Error on line {num}: invalid macro name '{name}'")
+        if any(b[1].split('#', 1)[0].split()[:1] == ['.macro'] for b in body):
+            raise ValueError(f"Error on line {num}: macros can't be defined inside macros")
+        self.macros[name] = (params, body)
+
+    def instance(self, num, tokens, want, depth):
+        """Expand 'name x y [arg ...]' at translation (x, y) from current."""
+        params, body = self.macros[tokens[0]]
+        if len(tokens) != len(params) + 3:
+            raise ValueError(f"Error on line {num}: macro '{tokens[0]}' "
+                f"needs x, y, and {len(params)} arguments")
+        x, y = int(tokens[1], 0), int(tokens[2], 0)
+        args = dict(zip(params, tokens[3:]))
+        self.displace(want)
+
+        def subst(line):
+            for param in sorted(params, key=len, reverse=True):  # longest first
+                line = line.replace(f"\\{param}", args[param])
+            return line
+
+        self.run([(n, subst(line)) for n, line in body], [want[0] + x, want[1] + y],
+            depth + 1)
+
+    def repeat(self, tokens, body, want, depth):
+        """Expand '.repeat count dx dy' body, moving translation by (dx, dy) each time."""
+        if len(tokens) != 4:
+            raise ValueError(".repeat needs count, dx, and dy")
+        count, dx, dy = (int(t, 0) for t in tokens[1:])
+        self.displace(want)
+        for k in range(count):
+            self.run(body, [want[0] + k*dx, want[1] + k*dy], depth + 1)
+
+    def translate(self, num, tokens, want, base):
+        """Load 'xt val' or 'yt val' relative to the instance translation base."""
+        axis = TRANS_REGS.index(tokens[0])
+        val = int(tokens[1], 0)
+        want[axis] = val if base[axis] is None else base[axis] + val
+        self.emit(num, f"{tokens[0]} {want[axis]}")
+        self.trans[axis] = want[axis]
+
+    def run(self, items, want, depth=0):
+        """Expand items [(line number, line)] with translation want [xt, yt]."""
+        if depth > MACRO_DEPTH:
+            raise ValueError(f"Error on line {items[0][0] if items else 0}: "
+                f"macros nested more than {MACRO_DEPTH} deep")
+        base = list(want)  # translation of this instance: explicit xt/yt are relative
+        pos = 0
+        while pos < len(items):
+            num, line = items[pos]
+            tokens = line.split('#', 1)[0].split()
+            pos += 1
+            if not tokens:
+                continue
+            op = tokens[0]
+            try:
+                if op == '.macro':
+                    body, pos = self.block(items, pos - 1, '.macro', '.endm')
+                    self.define(num, tokens, body)
+                elif op == '.repeat':
+                    body, pos = self.block(items, pos - 1, '.repeat', '.endr')
+                    self.repeat(tokens, body, want, depth)
+                elif op.startswith('.'):
+                    raise ValueError(f"Unknown directive '{op}'")
+                elif op in self.macros:
+                    self.instance(num, tokens, want, depth)
+                elif op in TRANS_REGS and len(tokens) == 2:
+                    self.translate(num, tokens, want, base)
+                else:
+                    if op in TRANS_COORDS:  # restore translation after instances
+                        self.set_trans(num, want)
+                    self.emit(num, line)
+            except ValueError as e:
+                if str(e).startswith("Error on line"):
+                    raise
+                raise ValueError(f"Error on line {num}: {e}") from e
+
+
+def expand(lines, reserved=()):
+    """Expand macros and repeats; returns (lines, source line numbers or None).
+
+    Macros can't be named after reserved names, such as assembler instructions.
+    """
+    lines = list(lines)
+    if not any(line.lstrip().startswith('.') for line in lines):
+        return lines, None  # plain program: no directives, so no macros
+    expander = Expander(reserved)
+    expander.run(list(enumerate(lines, start=1)), [None, None])
+    return expander.lines, expander.line_nums
@@ -0,0 +1,287 @@
+# Isle.Computer - Earthrise Shape Model
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Shape Model: pixels and clock cycles for each drawing instruction"""
+
+# NB. This follows the state machines in earthrise.v, line.v, fline.v, and
+#     circle.v, including 12-bit coordinate wrapping. Cycle counts assume
+#     Earthrise is always enabled (en=1) and don't include vram write latency.
+
+from typing import NamedTuple
+
+from erstate import (
+    R0, TVX0, TVY0, TVX1, TVY1, TVX2, TVY2,
+    draw_colr_reg,
+    sext12
+)
+
+START_CYCLES = 2  # idle cycle that starts execution and the first fetch
+INSTR_CYCLES = 3  # fetch, decode, and execute
+DRAW_CYCLES  = 2  # decode and execute; drawing returns straight to decode
+STOP_CYCLES  = 2  # decode and execute (done isn't counted by cycle_cnt)
+
+class Shape(NamedTuple):
+    """Drawing result: pixels and horizontal spans (y, x_start, x_end) in draw order."""
+    cycles: int
+    pixels: list
+    spans: list
+    colr_reg: int
+    halt: bool = False
+
+
+def wrap14(val):
+    """Wrap to 14-bit signed (circle error register)."""
+    return ((val & 0x3FFF) ^ 0x2000) - 0x2000
+
+
+def line_points(x0, y0, x1, y1):
+    """Pixels drawn by line.v, always from the top (smallest y) end."""
+    if y0 > y1:  # swap points so y increases
+        x0, y0, x1, y1 = x1, y1, x0, y0
+    right = x0 < x1
+    step = 1 if right else -1
+    dx = x1 - x0 if right else x0 - x1
+    dy = y0 - y1
+    err = dx + dy
+    x, y = x0, y0
+    points = [(x, y)]
+    while x != x1 or y != y1:
+        movx = 2*err >= dy
+        movy = 2*err <= dx
+        if movx:
+            x += step
+            err += dy
+        if movy:
+            y += 1
+            err += dx
+        points.append((x, y))
+    return points
+
+
+def circle_offsets(r0):
+    """Offsets (xa, ya) calculated by circle.v; xa is zero or negative."""
+    xa, ya = -r0, 0
+    err = 2 - 2*r0
+    offsets = []
+    while True:
+        offsets.append((xa, ya))
+        if xa == 0:
+            return offsets
+        err_tmp = err
+        if err <= ya:
+            ya += 1
+            err = wrap14(err + 2*ya + 1)
+        if err_tmp > xa or err > ya:
+            xa += 1
+            err = wrap14(err + 2*xa + 1)
+
+
+def fline_cycles(x0, x1):
+    """Cycles for a fast line, including start and finish."""
+    return abs(x1 - x0) + 3
+
+
+class LineUnit:  # pylint: disable=too-many-instance-attributes
+    """Cycle-level model of line.v for triangles, which interleave two lines."""
+    IDLE, INIT_0, INIT_1, DRAW = range(4)
+
+    def __init__(self):
+        self.state = self.IDLE
+        self.x = self.y = self.xs = 0
+        self.x_end = self.y_end = 0
+        self.xa = self.ya = self.xb = self.yb = 0
+        self.right = False
+        self.dx = self.dy = self.err = 0
+        self.start = False
+
+    def begin(self, x0, y0, x1, y1):
+        """Set end points and raise start (as registered by earthrise)."""
+        if y0 > y1:
+            self.xa, self.ya, self.xb, self.yb = x1, y1, x0, y0
+        else:
+            self.xa, self.ya, self.xb, self.yb = x0, y0, x1, y1
+        self.start = True
+
+    def busy(self):
+        """Calculation in progress."""
+        return self.state != self.IDLE or self.start
+
+    def end_coord(self):
+        """At end point."""
+        return self.x == self.x_end and self.y == self.y_end
+
+    def fill(self, oe):
+        """Ready for fill: last pixel on this row."""
+        return self.state == self.DRAW and oe and (2*self.err <= self.dx or self.end_coord())
+
+    def clock(self, oe):
+        """Advance one clock cycle."""
+        if self.state == self.DRAW:
+            if oe:
+                if self.end_coord():
+                    self.state = self.IDLE
+                else:
+                    movx = 2*self.err >= self.dy
+                    movy = 2*self.err <= self.dx
+                    step = 1 if self.right else -1
+                    if movx and movy:
+                        self.x += step
+                        self.xs = self.x
+                        self.y += 1
+                        self.err += self.dy + self.dx
+                    elif movx:
+                        self.x += step
+                        self.err += self.dy
+                    elif movy:
+                        self.y += 1
+                        self.err += self.dx
+        elif self.state == self.INIT_0:
+            self.state = self.INIT_1
+            self.dx = self.xb - self.xa if self.right else self.xa - self.xb
+            self.dy = self.ya - self.yb
+        elif self.state == self.INIT_1:
+            self.state = self.DRAW
+            self.err = self.dx + self.dy
+            self.x = self.xs = self.xa
+            self.y = self.ya
+            self.x_end, self.y_end = self.xb, self.yb
+        elif self.start:
+            self.state = self.INIT_0
+            self.right = self.xa < self.xb
+
+
+def tri_sort(verts):
+    """Sort triangle vertices by y-coordinate as earthrise.v does."""
+    (_, y0), (_, y1), (_, y2) = verts
+    tri_min = 0 if (y0 <= y1 and y0 <= y2) else (1 if y1 <= y2 else 2)
+    tri_max = 0 if (y0 > y1 and y0 > y2) else (1 if y1 > y2 else 2)
+    tri_mid = tri_min ^ tri_max ^ 3
+    return verts[tri_min], verts[tri_mid], verts[tri_max]
+
+
+def draw_tri(verts, filled):  # pylint: disable=too-many-branches,too-many-statements,too-many-locals
+    """Triangle cycles, edge pixels, and fill spans (cycle-level state machine)."""
+    (x0s, y0s), (x1s, y1s), (x2s, y2s) = tri_sort(verts)
+    line_a, line_b = LineUnit(), LineUnit()
+    pixels, spans = [], []
+
+    line_a.begin(x0s, y0s, x2s, y2s)  # TRI_INIT_B0
+    line_b.begin(x0s, y0s, x1s, y1s)
+    a_xdec, b_xdec = x0s > x2s, x0s > x1s
+    b_edge, b1_skip = False, False
+    a_xlo = a_xhi = fline_x0 = fline_x1 = fline_y = 0
+    cycles = 1
+    state = 'WAIT'
+
+    while state != 'DONE':
+        cycles += 1
+        prev = state
+        a_oe, b_oe = state == 'LINE_A', state == 'LINE_B'
+        if state == 'WAIT':
+            state = 'LINE_B' if b1_skip else 'LINE_A'
+        elif state == 'LINE_A':
+            if a_oe and line_a.state == LineUnit.DRAW:
+                pixels.append((line_a.x, line_a.y))
+            if line_a.fill(a_oe) or not line_a.busy():
+                state = 'LINE_B'
+                a_xlo = line_a.x if a_xdec else line_a.xs
+                a_xhi = line_a.xs if a_xdec else line_a.x
+        elif state == 'LINE_B':
+            if b_oe and line_b.state == LineUnit.DRAW:
+                pixels.append((line_b.x, line_b.y))
+            if line_b.fill(b_oe) or not line_b.busy():
+                state = 'FILL_INIT'
+                fline_y = line_b.y
+                b_left = line_b.x if b_xdec else line_b.xs
+                b_right = line_b.xs if b_xdec else line_b.x
+                if a_xlo < b_right:  # line A on left
+                    fline_x0, fline_x1 = sext12(a_xhi + 1), sext12(b_left - 1)
+                else:
+                    fline_x0, fline_x1 = sext12(b_right + 1), sext12(a_xlo - 1)
+        elif state == 'FILL_INIT':
+            state = 'NEXT_Y'
+            if not filled or not (line_a.busy() or line_b.busy()):
+                pass
+            elif b1_skip:
+                b1_skip = False
+            elif fline_x0 <= fline_x1:  # lines are frozen while fast line draws
+                spans.append((fline_y, fline_x0, fline_x1))
+                cycles += fline_cycles(fline_x0, fline_x1)
+        elif state == 'NEXT_Y':
+            if line_b.busy():
+                state = 'LINE_A'
+            elif b_edge:
+                state = 'DONE'
+            else:  # TRI_INIT_B1
+                cycles += 1
+                line_b.begin(x1s, y1s, x2s, y2s)
+                b_edge, b_xdec, b1_skip = True, x1s > x2s, True
+                state = 'WAIT'
+                continue
+
+        line_a.clock(a_oe)
+        line_b.clock(b_oe)
+        if prev == 'WAIT':  # earthrise clears start signals in TRI_WAIT
+            line_a.start = line_b.start = False
+    return cycles, pixels, spans
+
+
+def draw_shape(regs, instr):  # pylint: disable=too-many-locals,too-many-return-statements
+    """Model drawing instruction with register values (all used registers known)."""
+    fun = (instr >> 8) & 0xF
+    opts = instr & 0xFF
+    filled = bool(opts & 1)
+    colr_reg = draw_colr_reg(opts)
+    x0, y0, x1, y1 = regs[TVX0], regs[TVY0], regs[TVX1], regs[TVY1]
+
+    if fun == 0x0:  # pixel
+        return Shape(INSTR_CYCLES, [(x0, y0)], [], colr_reg)
+
+    if fun == 0x1:  # line
+        if y0 == y1:  # fast line
+            return Shape(DRAW_CYCLES + fline_cycles(x0, x1), [],
+                [(y0, min(x0, x1), max(x0, x1))], colr_reg)
+        points = line_points(x0, y0, x1, y1)
+        return Shape(DRAW_CYCLES + len(points) + 4, points, [], colr_reg)
+
+    if fun == 0x2:  # circle
+        r0 = regs[R0]
+        if r0 <= 0:
+            return Shape(INSTR_CYCLES, [], [], colr_reg)
+        cycles = DRAW_CYCLES + 1
+        pixels, spans = [], []
+        for xa, ya in circle_offsets(r0):
+            xl, xr = sext12(x0 + xa), sext12(x0 - xa)
+            yd, yu = sext12(y0 + ya), sext12(y0 - ya)
+            if filled:
+                spans.append((yd, min(xl, xr), max(xl, xr)))
+                spans.append((yu, min(xl, xr), max(xl, xr)))
+                cycles += 3 + 2*fline_cycles(xl, xr)  # calc, fill down, fill up
+            else:
+                pixels.extend(((sext12(x0 - xa), yd), (sext12(x0 + xa), yd),
+                               (sext12(x0 + xa), yu), (sext12(x0 - xa), yu)))
+                cycles += 5
+        return Shape(cycles, pixels, spans, colr_reg)
+
+    if fun == 0x3:  # triangle
+        x2, y2 = regs[TVX2], regs[TVY2]
+        if x0 == x1 == x2:  # degenerate: Earthrise halts
+            return Shape(STOP_CYCLES, [], [], colr_reg, halt=True)
+        cycles, pixels, spans = draw_tri(((x0, y0), (x1, y1), (x2, y2)), filled)
+        return Shape(DRAW_CYCLES + cycles, pixels, spans, colr_reg)
+
+    # rect: sort corners
+    xl, xr = min(x0, x1), max(x0, x1)
+    yt, yb = min(y0, y1), max(y0, y1)
+    if filled:
+        spans = [(y, xl, xr) for y in range(yt, yb + 1)]
+        return Shape(DRAW_CYCLES + len(spans) * (1 + fline_cycles(xl, xr)),
+            [], spans, colr_reg)
+    pixels = []
+    cycles = DRAW_CYCLES
+    for edge in ((xl, yt, xr, yt), (xl, yb, xr, yb), (xl, yt, xl, yb), (xr, yt, xr, yb)):
+        points = line_points(*edge)
+        pixels.extend(points)
+        cycles += 1 + len(points) + 4
+    return Shape(cycles, pixels, [], colr_reg)
@@ -0,0 +1,139 @@
+# Isle.Computer - Earthrise Peephole Optimiser
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Peephole Optimiser"""
+
+# NB. Register values are unknown at the start of a command list: Earthrise
+#     keeps its registers between runs. Programs with jumps are left unchanged
+#     because removing instructions would move jump targets. Culling only
+#     knows shape positions once the list loads xt and yt: another list may
+#     have left the translation set.
+
+from erstate import (
+    ALL_REGS,
+    DRAW,
+    LOAD,
+    NOP,
+    R0,
+    STOP,
+    ErState,
+    analyse,
+    has_flow_control
+)
+
+COORD_MIN, COORD_MAX = -2048, 2047  # 12-bit signed coordinates
+
+def drop_nops(instrs, keep):
+    """Remove nop instructions."""
+    return [i for i in keep if analyse(instrs[i])[0] != NOP]
+
+
+def drop_unreachable(instrs, keep):
+    """Remove instructions after the first stop; Earthrise never reaches them."""
+    for pos, i in enumerate(keep):
+        if analyse(instrs[i])[0] == STOP:
+            return keep[:pos+1]
+    return keep
+
+
+def drop_redundant(instrs, keep):
+    """Remove loads of values the registers already hold."""
+    state = ErState()
+    kept = []
+    for i in keep:
+        if state.redundant(instrs[i]):
+            continue
+        state.step(instrs[i])
+        kept.append(i)
+    return kept
+
+
+def drop_dead(instrs, keep):
+    """Remove loads whose values are overwritten before being used."""
+    # registers are live at the end unless the program stops (then nothing is read)
+    ends = keep and analyse(instrs[keep[-1]])[0] == STOP
+    live = set() if ends else set(ALL_REGS)
+    kept = []
+    for i in reversed(keep):
+        kind, reads, writes = analyse(instrs[i])
+        if kind == LOAD:
+            if live.isdisjoint(writes):
+                continue
+            live.difference_update(writes)
+            live.update(reads)
+        elif kind == DRAW:
+            live.update(reads)
+        elif kind == STOP:
+            live.clear()
+        kept.append(i)
+    kept.reverse()
+    return kept
+
+
+def shape_bounds(regs, instr):
+    """Bounding box (x0, y0, x1, y1) of a draw; None if unknown or it might wrap."""
+    fun = (instr >> 8) & 0xF
+    count = {0x0: 1, 0x1: 2, 0x3: 3, 0x4: 2}.get(fun, 1)
+    coords = regs[:2*count]
+    if None in coords:
+        return None
+    xs, ys = coords[0::2], coords[1::2]
+    if fun == 0x2:  # circle: coordinates wrap beyond 12 bits
+        if regs[R0] is None:
+            return None
+        r0 = abs(regs[R0])
+        xs, ys = (xs[0] - r0, xs[0] + r0), (ys[0] - r0, ys[0] + r0)
+        if min(xs + ys) < COORD_MIN or max(xs + ys) > COORD_MAX:
+            return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def drop_offcanvas(instrs, keep, canvas):
+    """Remove draws whose bounding box misses the canvas (w, h)."""
+    width, height = canvas
+    state = ErState()  # translation unknown until the list loads xt and yt
+    kept = []
+    for i in keep:
+        if analyse(instrs[i])[0] == DRAW:
+            bounds = shape_bounds(state.regs, instrs[i])
+            # degenerate triangles halt Earthrise, so they're never removed
+            if (bounds is not None and ((instrs[i] >> 8) & 0xF != 0x3 or
+                    state.degenerate_tri() is False)):
+                x0, y0, x1, y1 = bounds
+                if x1 < 0 or y1 < 0 or x0 >= width or y0 >= height:
+                    continue
+        state.step(instrs[i])
+        kept.append(i)
+    return kept
+
+
+def cull_keep(instrs, canvas, keep=None):
+    """Return indices of instructions kept after removing off-canvas draws and their loads."""
+    keep = list(range(len(instrs))) if keep is None else keep
+    if has_flow_control(instrs):
+        return keep
+    culled = drop_offcanvas(instrs, keep, canvas)
+    # only loads left dead by culling go; ones dead already are for the optimiser
+    dead = set(culled).difference(drop_dead(instrs, culled))
+    dead.difference_update(set(keep).difference(drop_dead(instrs, keep)))
+    return [i for i in culled if i not in dead]
+
+
+def optimise_keep(instrs, keep=None):
+    """Return indices of instructions kept by the optimiser."""
+    keep = list(range(len(instrs))) if keep is None else keep
+    if has_flow_control(instrs):
+        return keep
+
+    keep = drop_unreachable(instrs, drop_nops(instrs, keep))
+    while True:  # removing dead loads can reveal redundant ones (and vice versa)
+        count = len(keep)
+        keep = drop_dead(instrs, drop_redundant(instrs, keep))
+        if len(keep) == count:
+            return keep
+
+
+def optimise(instrs):
+    """Optimise list of 16-bit instructions; output renders the same."""
+    return [instrs[i] for i in optimise_keep(instrs)]
@@ -0,0 +1,153 @@
+# Isle.Computer - Earthrise Command List Paging
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Command List Paging: split programs into erlist-sized pages"""
+
+# NB. Pages end after a draw instruction. Each page starts with a prologue
+#     that loads the registers the page reads before writing, so pages can run
+#     on their own. Register values follow the program, unknown at the start
+#     as for the optimiser; registers the program hasn't loaded are left for
+#     pages to read from Earthrise, as the whole program would. Coordinates
+#     are loaded with zero translation, then xt and yt restored.
+
+from typing import NamedTuple
+
+from erstate import (
+    DRAW,
+    LCA,
+    LCB,
+    FCA,
+    FCB,
+    OTHER,
+    R0,
+    STOP,
+    TVX1,
+    XT,
+    YT,
+    ErState,
+    analyse,
+    sext12
+)
+
+ERLIST_INSTRS = 2048  # 4 KiB erlist holds 2048 16-bit instructions
+INSTR_STOP = 0xCE00
+
+class Page(NamedTuple):
+    """Command list page: instructions and range of program instructions it runs."""
+    instrs: list
+    start: int     # index of first program instruction
+    end: int       # index after last program instruction
+    prologue: int  # prologue instruction count
+
+
+def imm12(val):
+    """12-bit immediate for value."""
+    return val & 0xFFF
+
+
+def prologue(regs, live, raw=None):
+    """Instructions loading live registers with values regs (unknown values skipped).
+
+    raw holds the untranslated values last loaded into the coordinate registers:
+    while the program hasn't loaded a translation register, its coordinates are
+    reloaded as the program loaded them, leaving the translation alone.
+    """
+    raw = raw or [None] * 8
+
+    def reloadable(reg):
+        return reg < 8 and raw[reg] is not None and regs[YT if reg & 1 else XT] is None
+
+    live = {reg for reg in live if regs[reg] is not None or reloadable(reg)}
+    instrs = []
+    xt = yt = None  # translation during prologue (None: not set)
+
+    def set_trans(reg, val):
+        nonlocal xt, yt
+        if (xt if reg == XT else yt) != val:
+            instrs.append((0x8 if reg == XT else 0x9) << 12 | imm12(val))
+            if reg == XT:
+                xt = val
+            else:
+                yt = val
+
+    # x1 load also sets r0 to the untranslated value, so a live x1 picks the translation;
+    # with unknown translation, x1 and r0 both come from the program's last x1 load
+    if R0 in live:
+        if TVX1 in live and regs[TVX1] is not None:
+            set_trans(XT, sext12(regs[TVX1] - regs[R0]))
+        instrs.append(0x2 << 12 | imm12(regs[R0]))
+        live.discard(TVX1)
+    for reg in range(8):  # translated vertices: load with zero translation
+        if reg in live and regs[reg] is None:
+            instrs.append(reg << 12 | imm12(raw[reg]))
+        elif reg in live:
+            set_trans(YT if reg & 1 else XT, 0)
+            instrs.append(reg << 12 | imm12(regs[reg]))
+    for reg in (XT, YT):
+        if reg in live:
+            set_trans(reg, regs[reg])
+    for reg in (LCA, LCB, FCA, FCB):
+        if reg in live:
+            instrs.append(((0xC0 + reg - LCA) << 8) | regs[reg])
+    return instrs
+
+
+def paginate(instrs, page_size=ERLIST_INSTRS):
+    """Split 16-bit instructions into pages of at most page_size instructions."""
+    if any(analyse(instr)[0] == OTHER for instr in instrs):
+        raise ValueError("Paging doesn't support programs with jumps")
+    for pos, instr in enumerate(instrs):  # Earthrise never runs beyond stop
+        if analyse(instr)[0] == STOP:
+            instrs = instrs[:pos]
+            break
+
+    pages = []
+    state = ErState()
+    raw = [None] * 8  # untranslated coordinates last loaded
+    start = 0
+    while start < len(instrs):
+        end = page_end(instrs, start, (state.regs, raw), page_size)
+        head = [] if start == 0 else prologue(state.regs, live_in(instrs, start, end), raw)
+        for instr in instrs[start:end]:
+            state.step(instr)
+            if instr >> 12 <= 0x7:
+                raw[instr >> 12] = sext12(instr)
+        pages.append(Page(head + instrs[start:end] + [INSTR_STOP], start, end, len(head)))
+        start = end
+    return pages
+
+
+def page_end(instrs, start, known, page_size):
+    """End of page from start: after the last draw that fits with prologue and stop.
+
+    known is (register values, untranslated coordinates) at start, as for prologue.
+    """
+    regs, raw = known
+    live, written = set(), set()
+    end = None
+    pos = start
+    while pos < len(instrs):
+        kind, reads, writes = analyse(instrs[pos])
+        live.update(reg for reg in reads if reg not in written)
+        written.update(writes)
+        pos += 1
+        size = pos - start + 1 + (0 if start == 0 else len(prologue(regs, live, raw)))
+        if size > page_size:
+            break
+        if kind == DRAW or pos == len(instrs):
+            end = pos
+    if end is None:
+        raise ValueError(f"Instructions from {start} don't fit in a page "
+            f"of {page_size} with a draw")
+    return end
+
+
+def live_in(instrs, start, end):
+    """Registers instructions start to end read before writing."""
+    live, written = set(), set()
+    for instr in instrs[start:end]:
+        _, reads, writes = analyse(instr)
+        live.update(reg for reg in reads if reg not in written)
+        written.update(writes)
+    return live
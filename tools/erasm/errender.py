@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Earthrise Reference Renderer
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Reference Renderer: draw command lists into a NumPy canvas"""
+
+# NB. Shapes come from ermodel, which follows the Earthrise state machines,
+#     so pixels match the hardware. Writes outside the canvas are dropped, as
+#     canv_draw_agu does, and colours are truncated to the canvas bpp.
+
+import argparse
+import sys
+
+import numpy as np
+
+from erasm import asm_source, canvas_size, words_to_mem
+from erdis import read_bin, read_mem, words_to_instrs
+from ermodel import draw_shape
+from erstate import DRAW, DRAW_NAMES, DRAW_READS, OTHER, REG_NAMES, STOP, ErState, analyse
+
+CANVAS = (672, 384)  # default canvas size (pixels)
+BPP = 4              # default canvas bits per pixel
+MAX_INSTRS = 1 << 20  # instruction limit when following jumps
+
+def plot(canvas, shape, colr):
+    """Write shape pixels and spans to canvas (clipped), all in one colour."""
+    height, width = canvas.shape
+    if shape.pixels:
+        xs, ys = np.array(shape.pixels, dtype=np.int32).T
+        vis = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        canvas[ys[vis], xs[vis]] = colr
+    if shape.spans:
+        ys, xa, xb = np.array(shape.spans, dtype=np.int32).T
+        xa, xb = np.maximum(xa, 0), np.minimum(xb, width - 1)
+        vis = (ys >= 0) & (ys < height) & (xa <= xb)
+        ys, xa, xb = ys[vis], xa[vis], xb[vis]
+        lens = xb - xa + 1
+        # flat index of every span pixel: span start plus offset within span
+        starts = np.repeat(ys * width + xa - np.cumsum(lens) + lens, lens)
+        canvas.reshape(-1)[starts + np.arange(lens.sum())] = colr
+
+
+def render(instrs, canvas=None, size=CANVAS, bpp=BPP, state=None):
+    """Run 16-bit instructions, drawing into canvas (new canvas if None)."""
+    if canvas is None:
+        canvas = np.zeros((size[1], size[0]), dtype=np.uint8)
+    state = ErState.reset() if state is None else state
+    colr_mask = (1 << bpp) - 1
+    pc = pc_start = 0  # instruction index and jump target (byte address)
+    for _ in range(MAX_INSTRS):
+        if pc >= len(instrs):
+            return canvas
+        instr = int(instrs[pc])
+        pc += 1
+        kind = analyse(instr)[0]
+        if kind == DRAW:
+            fun = (instr >> 8) & 0xF
+            unknown = [REG_NAMES[r] for r in DRAW_READS[fun] if state.regs[r] is None]
+            if unknown:
+                raise ValueError(f"draw {DRAW_NAMES[fun]} at 0x{2*(pc-1):03X} uses "
+                    f"registers that aren't loaded: {', '.join(unknown)}")
+            shape = draw_shape(state.regs, instr)
+            if shape.halt:  # degenerate triangle
+                return canvas
+            plot(canvas, shape, state.regs[shape.colr_reg] & colr_mask)
+        elif kind == STOP:
+            return canvas
+        elif kind == OTHER:
+            if instr >> 12 == 0xA:  # jump address
+                pc_start = instr & 0xFFF
+            else:  # jump
+                pc = pc_start >> 1
+        state.step(instr)
+    raise ValueError(f"no stop after {MAX_INSTRS} instructions")
+
+
+def pack_canvas(canvas, bpp=BPP):
+    """Pack canvas into 32-bit vram words; the first pixel is in the lowest bits."""
+    per_word = 32 // bpp
+    pixels = canvas.reshape(-1).astype(np.uint32) & ((1 << bpp) - 1)
+    pixels = np.pad(pixels, (0, -len(pixels) % per_word))
+    shifts = np.arange(per_word, dtype=np.uint32) * bpp
+    return np.bitwise_or.reduce(pixels.reshape(-1, per_word) << shifts, axis=1)
+
+
+def read_palette(path):
+    """Read $readmemh palette of RGB555 colours (NumPy array)."""
+    with open(path, 'r', encoding="utf-8") as f:
+        return read_mem(f.read()).astype(np.uint16)
+
+
+def grey_palette(bpp=BPP):
+    """Greyscale RGB555 palette with 2^bpp entries (up to 32 levels)."""
+    levels = np.linspace(0, 31, 1 << bpp).round().astype(np.uint16)
+    return (levels << 10) | (levels << 5) | levels
+
+
+def canvas_to_rgb(canvas, palette):
+    """Look up canvas colours in RGB555 palette, returning 24-bit RGB (h, w, 3)."""
+    palette = np.asarray(palette, dtype=np.uint16)
+    if canvas.max(initial=0) >= len(palette):
+        raise ValueError(f"canvas uses colour {canvas.max()}; palette has {len(palette)}")
+    rgb5 = np.stack(((palette >> 10) & 0x1F, (palette >> 5) & 0x1F, palette & 0x1F), axis=1)
+    rgb8 = ((rgb5 << 3) | (rgb5 >> 2)).astype(np.uint8)  # scale from 5 to 8 bits
+    return rgb8[canvas]
+
+
+def write_png(path, canvas, palette):
+    """Write canvas as PNG through RGB555 palette (needs Pillow)."""
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+    Image.fromarray(canvas_to_rgb(canvas, palette), 'RGB').save(path)
+
+
+def load_instrs(path, optimise=False):
+    """Load .eas source, $readmemh, or binary command list as 16-bit instructions."""
+    if path.endswith('.eas'):
+        instrs = asm_source(path)
+        if optimise:
+            from eropt import optimise as opt  # pylint: disable=import-outside-toplevel
+            instrs = opt(instrs)
+        return instrs
+    if path.endswith('.bin'):
+        with open(path, 'rb') as f:
+            return words_to_instrs(read_bin(f.read()))
+    with open(path, 'r', encoding="utf-8") as f:
+        return words_to_instrs(read_mem(f.read()))
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Earthrise Reference Renderer")
+    parser.add_argument('file',
+        help="drawing: assembler (.eas), $readmemh (.mem), or binary (.bin)")
+    parser.add_argument('-o', '--png', metavar='FILE', help="write PNG image to FILE")
+    parser.add_argument('-m', '--mem', metavar='FILE',
+        help="write packed vram words in $readmemh format to FILE")
+    parser.add_argument('--canvas', metavar='WxH', type=canvas_size, default=CANVAS,
+        help=f"canvas size (default: {CANVAS[0]}x{CANVAS[1]})")
+    parser.add_argument('--bpp', type=int, choices=(1, 2, 4, 8), default=BPP,
+        help=f"canvas bits per pixel (default: {BPP})")
+    parser.add_argument('-p', '--palette', metavar='FILE',
+        help="RGB555 palette in $readmemh format (default: greyscale)")
+    parser.add_argument('-O', '--optimise', action='store_true',
+        help="optimise assembler source before rendering")
+    args = parser.parse_args(argv)
+    if args.png is None and args.mem is None:
+        parser.error("nothing to do: use -o for PNG and/or -m for vram words")
+
+    try:
+        canvas = render(load_instrs(args.file, args.optimise), size=args.canvas, bpp=args.bpp)
+        if args.mem is not None:
+            with open(args.mem, 'w', encoding="utf-8") as f:
+                f.write(words_to_mem(pack_canvas(canvas, args.bpp).tolist()))
+        if args.png is not None:
+            palette = read_palette(args.palette) if args.palette else grey_palette(args.bpp)
+            write_png(args.png, canvas, palette)
+    except (OSError, ValueError) as e:
+        print(f"Render error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
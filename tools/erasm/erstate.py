@@ -0,0 +1,157 @@
+# Isle.Computer - Earthrise Register State Model
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Register State Model (for assembler passes)"""
+
+# NB. Earthrise adds the translation registers when a coordinate is loaded,
+#     so the state holds translated vertices, as in earthrise.v.
+
+# register ids: translated vertices, radius, translation, and colours
+TVX0, TVY0, TVX1, TVY1, TVX2, TVY2, TVX3, TVY3 = range(8)
+R0, XT, YT = 8, 9, 10
+LCA, LCB, FCA, FCB = 11, 12, 13, 14
+REG_CNT = 15
+
+REG_NAMES = (
+    'x0', 'y0', 'x1', 'y1', 'x2', 'y2', 'x3', 'y3',
+    'r0', 'xt', 'yt', 'lca', 'lcb', 'fca', 'fcb'
+)
+
+ALL_REGS = frozenset(range(REG_CNT))
+
+# instruction kinds
+LOAD  = 0  # load register(s)
+DRAW  = 1  # draw shape
+NOP   = 2  # no operation
+STOP  = 3  # stop (or invalid instruction, which also ends execution)
+OTHER = 4  # flow control: jump and jump address
+
+# draw function -> coordinate registers read
+DRAW_READS = {
+    0x0: (TVX0, TVY0),                          # pixel
+    0x1: (TVX0, TVY0, TVX1, TVY1),              # line
+    0x2: (TVX0, TVY0, R0),                      # circle
+    0x3: (TVX0, TVY0, TVX1, TVY1, TVX2, TVY2),  # triangle
+    0x4: (TVX0, TVY0, TVX1, TVY1)               # rect
+}
+
+# shape names for draw functions
+DRAW_NAMES = {0x0: 'pix', 0x1: 'line', 0x2: 'circ', 0x3: 'tri', 0x4: 'rect'}
+
+def sext12(val):
+    """Sign extend 12-bit value."""
+    return ((val & 0xFFF) ^ 0x800) - 0x800
+
+
+def draw_colr_reg(opts):
+    """Colour register used by draw options (bit 0: fill, bit 1: colour B)."""
+    return (FCB if opts & 2 else FCA) if opts & 1 else (LCB if opts & 2 else LCA)
+
+
+def analyse(instr):  # pylint: disable=too-many-return-statements
+    """Return (kind, reads, writes) for a 16-bit instruction."""
+    opc = instr >> 12
+    if opc <= 0x7:  # coordinate: x-coordinates use xt, y-coordinates use yt
+        trans = YT if opc & 1 else XT
+        writes = (opc, R0) if opc == 0x2 else (opc,)
+        return LOAD, (trans,), writes
+    if opc == 0x8:
+        return LOAD, (), (XT,)
+    if opc == 0x9:
+        return LOAD, (), (YT,)
+    if opc == 0xA:
+        return OTHER, (), ()
+    fun = (instr >> 8) & 0xF
+    if opc == 0xC:
+        if fun <= 0x3:
+            return LOAD, (), (LCA + fun,)
+        if fun == 0xC:
+            return NOP, (), ()
+        if fun == 0xA:
+            return OTHER, (), ()
+        return STOP, (), ()  # stop or invalid
+    if opc == 0xD and fun in DRAW_READS:
+        return DRAW, DRAW_READS[fun] + (draw_colr_reg(instr & 0xFF),), ()
+    return STOP, (), ()  # invalid instruction
+
+
+def has_flow_control(instrs):
+    """True if instructions include jumps; passes must leave these programs alone."""
+    return any(analyse(instr)[0] == OTHER for instr in instrs)
+
+
+class ErState:
+    """Earthrise register values; None is unknown."""
+
+    def __init__(self, regs=None):
+        self.regs = list(regs) if regs is not None else [None] * REG_CNT
+
+    @classmethod
+    def reset(cls):
+        """State after Earthrise reset: no translation and colour 1; vertices unknown."""
+        regs = [None] * REG_CNT
+        regs[XT] = regs[YT] = 0
+        regs[LCA] = regs[LCB] = regs[FCA] = regs[FCB] = 1
+        return cls(regs)
+
+    def copy(self):
+        """Copy state."""
+        return ErState(self.regs)
+
+    def load_values(self, instr):
+        """Values an instruction would load as [(reg, value)]; None if not a load."""
+        opc = instr >> 12
+        imm12 = instr & 0xFFF
+        if opc <= 0x7:
+            trans = self.regs[YT if opc & 1 else XT]
+            tv = None if trans is None else sext12(imm12 + trans)
+            if opc == 0x2:
+                return [(TVX1, tv), (R0, sext12(imm12))]
+            return [(opc, tv)]
+        if opc == 0x8:
+            return [(XT, sext12(imm12))]
+        if opc == 0x9:
+            return [(YT, sext12(imm12))]
+        if opc == 0xC and (instr >> 8) & 0xF <= 0x3:
+            return [(LCA + ((instr >> 8) & 0xF), instr & 0xFF)]
+        return None
+
+    def redundant(self, instr):
+        """True if instr is a load of values the registers already hold."""
+        values = self.load_values(instr)
+        return values is not None and all(
+            val is not None and self.regs[reg] == val for reg, val in values)
+
+    def step(self, instr):
+        """Update register values for instruction."""
+        values = self.load_values(instr)
+        if values is not None:
+            for reg, val in values:
+                self.regs[reg] = val
+
+    def draws(self, instrs):
+        """Step through instrs until stop; returns draws with the register values they read."""
+        seen = []
+        for instr in instrs:
+            kind, reads, _ = analyse(instr)
+            if kind == DRAW:
+                seen.append((instr, [self.regs[reg] for reg in reads]))
+            elif kind == STOP:
+                break
+            self.step(instr)
+        return seen
+
+    def vertices(self, count):
+        """First count translated vertices as [(x, y)]; None if any are unknown."""
+        coords = self.regs[:2*count]
+        if None in coords:
+            return None
+        return list(zip(coords[0::2], coords[1::2]))
+
+    def degenerate_tri(self):
+        """True/False if the triangle halts Earthrise (x-coords in line); None if unknown."""
+        xs = (self.regs[TVX0], self.regs[TVX1], self.regs[TVX2])
+        if None in xs:
+            return None
+        return xs[0] == xs[1] == xs[2]
@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - SVG to Earthrise Converter
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""SVG to Earthrise Converter: filled shapes to erasm source"""
+
+# NB. Polygons are triangulated by ear clipping on integer coordinates, so
+#     every triangle has area and Earthrise won't halt on a degenerate one.
+#     Triangles are ordered so neighbours share vertices in the same registers;
+#     only coordinates that change are loaded. Holes aren't supported: each
+#     subpath is filled on its own.
+
+import argparse
+import math
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+
+from erasm import asm_instrs, asm_lines, write_bin, write_mem
+from ercost import estimate
+
+SVG_NS = '{http://www.w3.org/2000/svg}'
+CURVE_STEP = 4  # approximate length of curve segments (pixels)
+COLR_MAX = 255  # fca loads an 8-bit colour index; 0 is the background
+
+COLR_NAMES = {
+    'black': 0x000000, 'white': 0xFFFFFF, 'red': 0xFF0000, 'lime': 0x00FF00,
+    'green': 0x008000, 'blue': 0x0000FF, 'yellow': 0xFFFF00, 'cyan': 0x00FFFF,
+    'aqua': 0x00FFFF, 'magenta': 0xFF00FF, 'fuchsia': 0xFF00FF, 'grey': 0x808080,
+    'gray': 0x808080, 'silver': 0xC0C0C0, 'maroon': 0x800000, 'navy': 0x000080,
+    'olive': 0x808000, 'purple': 0x800080, 'teal': 0x008080, 'orange': 0xFFA500
+}
+
+NUM_PAT = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+PATH_PAT = re.compile(r'([MmLlHhVvCcSsQqTtAaZz])|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)')
+TRANSFORM_PAT = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+
+#
+# SVG parsing
+#
+
+def mat_mul(m, n):
+    """Multiply 2D affine matrices (a, b, c, d, e, f) as in SVG."""
+    a, b, c, d, e, f = m
+    return (a*n[0] + c*n[1], b*n[0] + d*n[1], a*n[2] + c*n[3], b*n[2] + d*n[3],
+            a*n[4] + c*n[5] + e, b*n[4] + d*n[5] + f)
+
+
+def parse_transform(text):
+    """Parse SVG transform attribute into an affine matrix."""
+    mat = (1, 0, 0, 1, 0, 0)
+    for name, args in TRANSFORM_PAT.findall(text or ''):
+        v = [float(x) for x in NUM_PAT.findall(args)]
+        if name == 'matrix':
+            m = tuple(v)
+        elif name == 'translate':
+            m = (1, 0, 0, 1, v[0], v[1] if len(v) > 1 else 0)
+        elif name == 'scale':
+            m = (v[0], 0, 0, v[1] if len(v) > 1 else v[0], 0, 0)
+        elif name == 'rotate':
+            t = math.radians(v[0])
+            m = (math.cos(t), math.sin(t), -math.sin(t), math.cos(t), 0, 0)
+            if len(v) == 3:  # rotate about (cx, cy)
+                m = mat_mul(mat_mul((1, 0, 0, 1, v[1], v[2]), m), (1, 0, 0, 1, -v[1], -v[2]))
+        elif name == 'skewX':
+            m = (1, 0, math.tan(math.radians(v[0])), 1, 0, 0)
+        else:
+            m = (1, math.tan(math.radians(v[0])), 0, 1, 0, 0)
+        mat = mat_mul(mat, m)
+    return mat
+
+
+def apply(mat, pt):
+    """Apply affine matrix to point."""
+    a, b, c, d, e, f = mat
+    return a*pt[0] + c*pt[1] + e, b*pt[0] + d*pt[1] + f
+
+
+def parse_colr(text):
+    """Parse SVG colour as 24-bit RGB; None for none or unsupported."""
+    text = (text or '').strip().lower()
+    if text in COLR_NAMES:
+        return COLR_NAMES[text]
+    if re.fullmatch(r'#[0-9a-f]{6}', text):
+        return int(text[1:], 16)
+    if re.fullmatch(r'#[0-9a-f]{3}', text):
+        return int(''.join(ch * 2 for ch in text[1:]), 16)
+    match = re.fullmatch(r'rgb\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)', text)
+    if match:
+        r, g, b = (min(255, int(v)) for v in match.groups())
+        return r << 16 | g << 8 | b
+    return None
+
+
+def style_attrs(elem):
+    """Element presentation attributes, with style overriding attributes."""
+    attrs = {k: elem.get(k) for k in ('fill', 'stroke') if elem.get(k) is not None}
+    for decl in (elem.get('style') or '').split(';'):
+        if ':' in decl:
+            key, val = decl.split(':', 1)
+            if key.strip() in ('fill', 'stroke'):
+                attrs[key.strip()] = val.strip()
+    return attrs
+
+
+def arc_points(p0, rx, ry, phi, large, sweep, p1):  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    """Flatten SVG elliptical arc from p0 to p1 (endpoint parameterisation)."""
+    if rx == 0 or ry == 0:
+        return [p1]
+    rx, ry, phi = abs(rx), abs(ry), math.radians(phi)
+    cos_p, sin_p = math.cos(phi), math.sin(phi)
+    dx, dy = (p0[0] - p1[0]) / 2, (p0[1] - p1[1]) / 2
+    x1, y1 = cos_p*dx + sin_p*dy, -sin_p*dx + cos_p*dy
+    scale = x1*x1/(rx*rx) + y1*y1/(ry*ry)
+    if scale > 1:  # radii too small: scale up
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+    num = rx*rx*ry*ry - rx*rx*y1*y1 - ry*ry*x1*x1
+    coef = math.sqrt(max(0, num / (rx*rx*y1*y1 + ry*ry*x1*x1)))
+    if large == sweep:
+        coef = -coef
+    cx1, cy1 = coef * rx*y1/ry, -coef * ry*x1/rx
+    cx = cos_p*cx1 - sin_p*cy1 + (p0[0] + p1[0]) / 2
+    cy = sin_p*cx1 + cos_p*cy1 + (p0[1] + p1[1]) / 2
+    t0 = math.atan2((y1 - cy1)/ry, (x1 - cx1)/rx)
+    t1 = math.atan2((-y1 - cy1)/ry, (-x1 - cx1)/rx)
+    dt = t1 - t0
+    if sweep and dt < 0:
+        dt += 2 * math.pi
+    elif not sweep and dt > 0:
+        dt -= 2 * math.pi
+    steps = max(2, math.ceil(abs(dt) * max(rx, ry) / CURVE_STEP))
+    pts = []
+    for i in range(1, steps + 1):
+        t = t0 + dt * i / steps
+        x, y = rx * math.cos(t), ry * math.sin(t)
+        pts.append((cos_p*x - sin_p*y + cx, sin_p*x + cos_p*y + cy))
+    return pts
+
+
+def bezier_points(ctrl):
+    """Flatten quadratic or cubic Bezier (control points include start)."""
+    length = sum(math.dist(ctrl[i], ctrl[i+1]) for i in range(len(ctrl) - 1))
+    steps = max(2, math.ceil(length / CURVE_STEP))
+    pts = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        pts_t = list(ctrl)
+        while len(pts_t) > 1:  # de Casteljau
+            pts_t = [((1-t)*a[0] + t*b[0], (1-t)*a[1] + t*b[1]) for a, b in zip(pts_t, pts_t[1:])]
+        pts.append(pts_t[0])
+    return pts
+
+
+def reflect(pos, ctrl):
+    """Reflection of previous control point about pos (pos if there isn't one)."""
+    return pos if ctrl is None else (2*pos[0] - ctrl[0], 2*pos[1] - ctrl[1])
+
+
+def parse_path(text):  # pylint: disable=too-many-branches,too-many-statements,too-many-locals
+    """Parse SVG path data into subpaths (lists of points); curves are flattened."""
+    tokens = [(m.group(1), m.group(2), m.start()) for m in PATH_PAT.finditer(text or '')]
+    subpaths, cur = [], []
+    pos = start = (0.0, 0.0)
+    last_ctrl, cmd, i = None, None, 0
+
+    def nums(count):
+        nonlocal i
+        args = tokens[i:i + count]
+        if len(args) < count or any(t[0] for t in args):
+            at = tokens[i - 1][2] if i else 0
+            raise ValueError(f"Path data: {cmd} at {at} needs {count} numbers")
+        i += count
+        return [float(t[1]) for t in args]
+
+    while i < len(tokens):
+        if tokens[i][0]:
+            cmd = tokens[i][0]
+            i += 1
+            if cmd in 'Zz':
+                if cur:
+                    subpaths.append(cur)
+                cur, pos, last_ctrl = [], start, None
+                continue
+        elif cmd is None:
+            raise ValueError("Path data must start with a command")
+        elif cmd in 'Zz':
+            raise ValueError(f"Path data: number at {tokens[i][2]} after {cmd}")
+        rel = cmd.islower()
+        ox, oy = pos if rel else (0.0, 0.0)
+        op = cmd.upper()
+        ctrl = None
+        if op == 'M':
+            x, y = nums(2)
+            if cur:
+                subpaths.append(cur)
+            pos = start = (ox + x, oy + y)
+            cur = [pos]
+            cmd = 'l' if rel else 'L'  # further pairs are lines
+        elif op == 'L':
+            x, y = nums(2)
+            pos = (ox + x, oy + y)
+            cur.append(pos)
+        elif op == 'H':
+            pos = ((ox if rel else 0.0) + nums(1)[0], pos[1])
+            cur.append(pos)
+        elif op == 'V':
+            pos = (pos[0], (oy if rel else 0.0) + nums(1)[0])
+            cur.append(pos)
+        elif op in 'CS':
+            if op == 'C':
+                x1, y1, x2, y2, x, y = nums(6)
+                c1 = (ox + x1, oy + y1)
+            else:
+                x2, y2, x, y = nums(4)
+                c1 = reflect(pos, last_ctrl)
+            ctrl = (ox + x2, oy + y2)
+            end = (ox + x, oy + y)
+            cur.extend(bezier_points([pos, c1, ctrl, end]))
+            pos = end
+        elif op in 'QT':
+            if op == 'Q':
+                x1, y1, x, y = nums(4)
+                ctrl = (ox + x1, oy + y1)
+            else:
+                x, y = nums(2)
+                ctrl = reflect(pos, last_ctrl)
+            end = (ox + x, oy + y)
+            cur.extend(bezier_points([pos, ctrl, end]))
+            pos = end
+        elif op == 'A':
+            rx, ry, phi, large, sweep, x, y = nums(7)
+            end = (ox + x, oy + y)
+            cur.extend(arc_points(pos, rx, ry, phi, bool(large), bool(sweep), end))
+            pos = end
+        last_ctrl = ctrl if op in 'CSQT' else None
+    if cur:
+        subpaths.append(cur)
+    return subpaths
+
+
+def ellipse_points(cx, cy, rx, ry):
+    """Flatten ellipse to polygon."""
+    steps = max(8, math.ceil(2 * math.pi * max(rx, ry) / CURVE_STEP))
+    return [(cx + rx*math.cos(2*math.pi*i/steps), cy + ry*math.sin(2*math.pi*i/steps))
+        for i in range(steps)]
+
+
+def rect_corners(x, y, w, h):
+    """Corners of rectangle, clockwise from (x, y)."""
+    return [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+
+
+def elem_shapes(elem, tag, mat):
+    """Shapes for one element transformed by mat: [(kind, geometry)] as in svg_shapes."""
+    num = lambda key: float(NUM_PAT.match(elem.get(key, '0')).group())  # pylint: disable=unnecessary-lambda-assignment
+    subpaths = []
+    if tag == 'rect':
+        corners = rect_corners(num('x'), num('y'), num('width'), num('height'))
+        if abs(mat[1]) < 1e-9 and abs(mat[2]) < 1e-9:  # axis aligned
+            (ax, ay), (bx, by) = apply(mat, corners[0]), apply(mat, corners[2])
+            return [('rect', (min(ax, bx), min(ay, by), max(ax, bx), max(ay, by)))]
+        subpaths = [corners]
+    elif tag == 'circle' and abs(mat[0] - mat[3]) < 1e-9 and abs(mat[1] + mat[2]) < 1e-9:
+        cx, cy = apply(mat, (num('cx'), num('cy')))  # similarity keeps circles round
+        return [('circ', (cx, cy, num('r') * math.hypot(mat[0], mat[1])))]
+    elif tag in ('circle', 'ellipse'):
+        rx = num('r') if tag == 'circle' else num('rx')
+        ry = num('r') if tag == 'circle' else num('ry')
+        subpaths = [ellipse_points(num('cx'), num('cy'), rx, ry)]
+    elif tag in ('polygon', 'polyline'):
+        vals = [float(v) for v in NUM_PAT.findall(elem.get('points', ''))]
+        subpaths = [list(zip(vals[0::2], vals[1::2]))]
+    elif tag == 'path':
+        subpaths = parse_path(elem.get('d'))
+    return [('poly', [apply(mat, p) for p in pts]) for pts in subpaths]
+
+
+def svg_shapes(root):
+    """Filled shapes in document order: ('poly', colr, [points]), ('rect', colr, box),
+    or ('circ', colr, (cx, cy, r)); coordinates are transformed but not rounded."""
+    shapes = []
+
+    def walk(elem, mat, inherited):
+        tag = elem.tag.replace(SVG_NS, '')
+        attrs = dict(inherited, **style_attrs(elem))
+        mat = mat_mul(mat, parse_transform(elem.get('transform')))
+        colr = parse_colr(attrs.get('fill', 'black'))
+        if tag in ('g', 'svg'):
+            for child in elem:
+                walk(child, mat, attrs)
+            return
+        if colr is None or tag in ('defs', 'clipPath', 'mask', 'symbol'):
+            return
+        shapes.extend((kind, colr, geom) for kind, geom in elem_shapes(elem, tag, mat))
+
+    walk(root, (1, 0, 0, 1, 0, 0), {})
+    return shapes
+
+#
+# Triangulation
+#
+
+def cross(o, a, b):
+    """Cross product of vectors o->a and o->b (twice signed triangle area)."""
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def clean_polygon(pts):
+    """Remove repeated and collinear points (integer coordinates)."""
+    changed = True
+    while changed and len(pts) >= 3:
+        changed = False
+        out = []
+        for i, p in enumerate(pts):
+            prev, nxt = (out[-1] if out else pts[i-1]), pts[(i+1) % len(pts)]
+            if p == prev or cross(prev, p, nxt) == 0:
+                changed = True
+                continue
+            out.append(p)
+        pts = out
+    return pts if len(pts) >= 3 else []
+
+
+def in_triangle(p, a, b, c):
+    """True if p is inside or on the edge of triangle abc (either winding)."""
+    d1, d2, d3 = cross(a, b, p), cross(b, c, p), cross(c, a, p)
+    return not ((d1 < 0 or d2 < 0 or d3 < 0) and (d1 > 0 or d2 > 0 or d3 > 0))
+
+
+def triangulate(pts):
+    """Ear-clipping triangulation of a simple polygon; returns [(a, b, c)]."""
+    pts = clean_polygon(pts)
+    if not pts:
+        return []
+    area = sum(cross((0, 0), pts[i-1], pts[i]) for i in range(len(pts)))
+    sign = 1 if area > 0 else -1
+    idx = list(range(len(pts)))
+    tris = []
+    while len(idx) > 3:
+        n = len(idx)
+        ear = None
+        for k in range(n):
+            a, b, c = pts[idx[k-1]], pts[idx[k]], pts[idx[(k+1) % n]]
+            if cross(a, b, c) * sign <= 0:
+                continue  # reflex or collinear
+            if any(in_triangle(pts[j], a, b, c) for j in idx
+                    if pts[j] not in (a, b, c)):
+                continue
+            ear = k
+            break
+        if ear is None:  # self-intersecting: clip a convex vertex to make progress
+            ear = next((k for k in range(n) if cross(pts[idx[k-1]], pts[idx[k]],
+                pts[idx[(k+1) % n]]) * sign > 0), None)
+            if ear is None:
+                break
+        tris.append((pts[idx[ear-1]], pts[idx[ear]], pts[idx[(ear+1) % n]]))
+        del idx[ear]
+        rest = clean_polygon([pts[j] for j in idx])  # drop points made collinear
+        idx = [j for j in idx if pts[j] in rest]
+    if len(idx) == 3 and cross(pts[idx[0]], pts[idx[1]], pts[idx[2]]) != 0:
+        tris.append(tuple(pts[j] for j in idx))
+    return tris
+
+
+def order_tris(tris):
+    """Order triangles so each shares as many vertices as possible with the last."""
+    by_vertex = defaultdict(set)
+    for n, tri in enumerate(tris):
+        for v in tri:
+            by_vertex[v].add(n)
+    remaining = set(range(len(tris)))
+    order = []
+    cur = None
+    while remaining:
+        cands = set() if cur is None else {n for v in tris[cur] for n in by_vertex[v]} & remaining
+        if cands:
+            cur = max(sorted(cands), key=lambda n: len(set(tris[n]) & set(tris[cur])))
+        else:
+            cur = min(remaining)
+        remaining.discard(cur)
+        order.append(tris[cur])
+    return order
+
+#
+# Output
+#
+
+class Emitter:
+    """Emit erasm source, skipping loads of values registers already hold."""
+
+    def __init__(self):
+        self.lines = []
+        self.regs = {}   # register -> immediate loaded (x1 and r0 share a register)
+        self.slots = [None, None, None]  # triangle vertex in each register pair
+
+    def load(self, reg, val):
+        """Load register unless it holds val."""
+        key = 'x1' if reg == 'r0' else reg
+        if self.regs.get(key) != val:
+            self.lines.append(f"{reg} {val}")
+            self.regs[key] = val
+
+    def colr(self, colr):
+        """Load fill colour A."""
+        self.load('fca', colr)
+
+    def tri(self, tri):
+        """Filled triangle, keeping shared vertices in their registers."""
+        slots = [v if v in tri else None for v in self.slots]
+        for v in tri:
+            if v not in slots:
+                slots[slots.index(None)] = v
+        self.slots = slots
+        for n, (x, y) in enumerate(slots):
+            self.load(f"x{n}", x)
+            self.load(f"y{n}", y)
+        self.lines.append("draw trif ca")
+
+    def rect(self, box):
+        """Filled rectangle (inclusive corners)."""
+        self.slots = [None, None, None]
+        x0, y0, x1, y1 = box
+        self.load('x0', x0)
+        self.load('y0', y0)
+        self.load('x1', x1)
+        self.load('y1', y1)
+        self.lines.append("draw rectf ca")
+
+    def circ(self, x, y, r):
+        """Filled circle."""
+        self.slots = [None, None, None]
+        self.load('x0', x)
+        self.load('y0', y)
+        self.load('r0', r)
+        self.lines.append("draw circf ca")
+
+
+def nearest_colr(rgb, palette):
+    """Index of nearest palette colour (RGB555 palette, 24-bit colour)."""
+    r, g, b = rgb >> 19 & 0x1F, rgb >> 11 & 0x1F, rgb >> 3 & 0x1F
+    return min(range(len(palette)), key=lambda i: (
+        ((palette[i] >> 10 & 0x1F) - r) ** 2 + ((palette[i] >> 5 & 0x1F) - g) ** 2 +
+        ((palette[i] & 0x1F) - b) ** 2))
+
+
+def emit_shape(out, kind, geom, coord, scale):
+    """Emit shape with out; returns naive lines (every register loaded for every shape)."""
+    naive = []
+    if kind == 'rect':
+        (x0, y0), (x1, y1) = coord(geom[:2]), coord(geom[2:])
+        if x1 > x0 and y1 > y0:
+            out.rect((x0, y0, x1 - 1, y1 - 1))
+            naive.extend((f"x0 {x0}", f"y0 {y0}", f"x1 {x1 - 1}", f"y1 {y1 - 1}",
+                "draw rectf ca"))
+    elif kind == 'circ':
+        (x, y), r = coord(geom[:2]), round(geom[2] * scale)
+        if r > 0:
+            out.circ(x, y, r)
+            naive.extend((f"x0 {x}", f"y0 {y}", f"r0 {r}", "draw circf ca"))
+    else:
+        tris = triangulate([coord(p) for p in geom])
+        for tri in order_tris(tris):
+            out.tri(tri)
+        for tri in tris:
+            naive.extend(f"{axis}{n} {val}" for n, pt in enumerate(tri)
+                for axis, val in zip('xy', pt))
+            naive.append("draw trif ca")
+    return naive
+
+
+def convert(svg_text, palette=None, scale=1.0, offset=(0, 0)):
+    """Convert SVG document to erasm source lines; returns (lines, naive lines)."""
+    colr_idx = {}
+    out, naive = Emitter(), []
+
+    def coord(pt):
+        return (round(pt[0] * scale + offset[0]), round(pt[1] * scale + offset[1]))
+
+    for kind, rgb, geom in svg_shapes(ET.fromstring(svg_text)):
+        if palette:
+            colr = nearest_colr(rgb, palette)
+            if colr > COLR_MAX:
+                raise ValueError(f"Palette index {colr} is above {COLR_MAX}")
+        else:  # colours numbered in order of first use
+            colr = colr_idx.setdefault(rgb, len(colr_idx) + 1)
+            if colr > COLR_MAX:
+                raise ValueError(f"More than {COLR_MAX} colours; use a palette (-p)")
+        out.colr(colr)
+        naive.append(f"fca {colr}")
+        naive.extend(emit_shape(out, kind, geom, coord, scale))
+    out.lines.append("stop")
+    return out.lines, naive
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="SVG to Earthrise Converter")
+    parser.add_argument('file', help="SVG file")
+    parser.add_argument('-o', '--output', metavar='FILE',
+        help="write erasm source to FILE (default: stdout)")
+    parser.add_argument('-m', '--mem', metavar='FILE',
+        help="write assembled $readmemh to FILE")
+    parser.add_argument('-b', '--bin', metavar='FILE', help="write assembled binary to FILE")
+    parser.add_argument('-p', '--palette', metavar='FILE',
+        help="RGB555 palette ($readmemh) for nearest colours (default: number colours by use)")
+    parser.add_argument('-s', '--scale', type=float, default=1.0, help="scale coordinates")
+    parser.add_argument('--offset', metavar='X,Y', default='0,0',
+        help="add offset to coordinates after scaling")
+    args = parser.parse_args(argv)
+
+    try:
+        offset = tuple(float(v) for v in args.offset.split(','))
+        palette = None
+        if args.palette:
+            with open(args.palette, 'r', encoding="utf-8") as f:
+                palette = [int(line.split('//')[0], 16) for line in f
+                    if line.split('//')[0].strip()]
+        with open(args.file, 'r', encoding="utf-8") as f:
+            lines, naive = convert(f.read(), palette, args.scale, offset)
+        words = asm_lines(lines)
+    except (OSError, ValueError, ET.ParseError) as e:
+        print(f"Conversion error: {e}", file=sys.stderr)
+        return 1
+
+    text = "".join(f"{line}\n" for line in lines)
+    if args.output is None and args.mem is None and args.bin is None:
+        sys.stdout.write(text)
+    if args.output is not None:
+        with open(args.output, 'w', encoding="utf-8") as f:
+            f.write(f"# converted from {args.file} by svg2eas\n\n" + text)
+    if args.mem is not None:
+        with open(args.mem, 'w', encoding="utf-8") as f:
+            write_mem(words, f)
+    if args.bin is not None:
+        with open(args.bin, 'wb') as f:
+            write_bin(words, f)
+
+    naive_instrs = asm_instrs(naive + ["stop"])
+    instrs = asm_instrs(lines)
+    print(f"svg2eas: {len(instrs)} instructions, {estimate(instrs).cycles:,} cycles "
+        f"(one load per vertex: {len(naive_instrs)} instructions, "
+        f"{estimate(naive_instrs).cycles:,} cycles)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# Isle.Computer - Earthrise Animation Compiler Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Animation Compiler Tests"""
+
+import numpy as np
+import pytest
+
+from erasm import asm_instrs
+from erdis import words_to_instrs
+from eranim import apply_delta, compile_anim, delta_bytes, frame_budget, main
+from errender import render
+from erstate import FCB, XT, YT, ErState
+
+SIZE = (64, 32)
+
+ANIM = """\
+fca 2
+x0 0
+y0 10
+x1 63
+y1 10
+draw line ca
+.object box fcb
+x0 0
+y0 0
+x1 7
+y1 7
+draw rectf cb
+.endo
+.frame 0
+box 0 0 3
+.frame 10
+box 40 20
+.frame 12
+box hide
+.frame 14
+box 10 10 5
+.frames 16
+"""
+
+def box(x, y, colr):
+    """Render frame with line and box drawn directly."""
+    src = ["fca 2", "x0 0", "y0 10", "x1 63", "y1 10", "draw line ca"]
+    if colr:
+        src += [f"fcb {colr}", f"x0 {x}", f"y0 {y}", f"x1 {x+7}", f"y1 {y+7}", "draw rectf cb"]
+    return render(asm_instrs(src + ["stop"]), size=SIZE)
+
+
+class TestEranim:
+    """Test class for eranim."""
+
+    def test_frames(self):
+        """Test every frame, rebuilt from deltas, renders as expected."""
+        anim = compile_anim(ANIM.splitlines(), loop=True)
+        assert anim.frames == 16 and len(anim.deltas) == 16
+        expect = [(4*f, 2*f, 3) for f in range(11)] + [(40, 20, 3), (0, 0, 0), (0, 0, 0),
+            (10, 10, 5), (10, 10, 5)]
+        words = anim.words
+        for f, (x, y, colr) in enumerate(expect):
+            assert np.array_equal(render(words_to_instrs(words), size=SIZE), box(x, y, colr)), f
+            words = apply_delta(words, anim.deltas[f])
+        assert words == anim.words  # loop returns to frame 0
+        # moving touches one word; hiding, showing, and colour changes one or two
+        assert [len(d) for d in anim.deltas] == [1] * 10 + [0, 1, 0, 2, 0, 2]
+        assert all(len(delta_bytes(d)) <= frame_budget() for d in anim.deltas)
+
+    def test_registers(self):
+        """Test static drawing reloads translation left by the previous run."""
+        instrs = words_to_instrs(compile_anim(ANIM.splitlines()).words)
+        state = ErState.reset()
+        for instr in instrs:  # registers left by the first run
+            state.step(instr)
+        assert state.regs[XT] == 0 and state.regs[FCB] == 3
+        state.regs[XT] = state.regs[YT] = 20
+        assert np.array_equal(render(instrs, size=SIZE, state=state), box(0, 0, 3))
+
+    def test_errors(self):
+        """Test errors give line numbers."""
+        with pytest.raises(ValueError, match="line 2"):
+            compile_anim([".object a", "xt 4", ".endo"])
+        with pytest.raises(ValueError, match="Unknown object 'b'"):
+            compile_anim([".object a", ".endo", ".frame 0", "b 1 2"])
+        with pytest.raises(ValueError, match="line 4"):
+            compile_anim([".object a", ".endo", ".frame 2", ".frame 1"])
+
+    def test_cli(self, tmp_path, capsys):
+        """Test base list and delta stream output."""
+        src, mem, deltas = tmp_path / "box.ean", tmp_path / "box.mem", tmp_path / "box.bin"
+        src.write_text(ANIM)
+        assert main([str(src), '-m', str(mem), '-d', str(deltas)]) == 0
+        assert len(mem.read_text().split()) == 9
+        assert len(deltas.read_bytes()) == 15 * 2 + 6 * 13
+        assert "16 frames" in capsys.readouterr().err
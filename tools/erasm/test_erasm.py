@@ -4,15 +4,26 @@
 
 """Earthrise Assembler Tests"""
 
+import io
+
 import pytest
 
+import erasm
 from erasm import (
+    asm_bytes,
     asm_colr,
     asm_coord,
     asm_draw,
     asm_line,
+    asm_lines,
+    build_files,
     int_twos_comp_12,
-    parse_literal
+    listing,
+    main,
+    pack_words,
+    parse_literal,
+    write_bin,
+    write_mem
 )
 
 class TestErasm:
@@ -98,3 +109,111 @@ class TestErasm:
         assert asm_line("draw trif ca") == 0xD301
         assert asm_line("draw rect cb") == 0xD402
         assert asm_line("draw rectf cb") == 0xD403
+        assert asm_line("  x1 0x10  # comment") == 0x2010
+
+    def test_asm_line_errors(self):
+        """Test line assembly error messages."""
+        with pytest.raises(ValueError, match="Unknown instruction 'halt'"):
+            asm_line("halt")
+        with pytest.raises(ValueError, match="Unknown instruction 'x0'"):
+            asm_line("x0")
+        with pytest.raises(ValueError, match="Unknown instruction 'nop'"):
+            asm_line("nop 1")
+        with pytest.raises(ValueError, match="Unknown colour register 'lcc'"):
+            asm_line("lcc 1")
+        with pytest.raises(ValueError, match="Unknown coordinate register 'x4'"):
+            asm_line("x4 1")
+        with pytest.raises(ValueError, match="Invalid 12-bit literal"):
+            asm_line("y0 4096")
+        with pytest.raises(ValueError, match="Unknown draw shape 'quad'"):
+            asm_line("draw quad ca")
+        with pytest.raises(ValueError, match="Unknown colour 'cc'"):
+            asm_line("draw pix cc")
+        with pytest.raises(ValueError, match="Unknown instruction 'move'"):
+            asm_line("move x0 y0")
+        with pytest.raises(ValueError, match="Unknown instruction format 'draw pix ca ca'"):
+            asm_line("draw pix ca ca  # too many")
+
+    def test_asm_lines(self):
+        """Test assembly of line iterables into 32-bit words."""
+        lines = ["lca 10  # colour", "", "x0 8", "draw pix ca"]
+        assert list(asm_lines(lines)) == [0x0008C00A, 0xCE00D000]
+        assert list(asm_lines(iter(lines[:3]))) == [0x0008C00A]
+        assert list(asm_lines(io.StringIO("nop\nstop\n"))) == [0xCE00CC00]
+        assert not asm_lines([])
+        assert list(asm_lines(["x0 8"] * 4)) == [0x00080008, 0x00080008]  # cached lines
+        with pytest.raises(ValueError, match="Error on line 2"):
+            asm_lines(["nop", "draw circle ca"])
+
+    def test_pack_words(self):
+        """Test packing 16-bit instructions into 32-bit words."""
+        assert list(pack_words([0x1234, 0x5678])) == [0x56781234]
+        assert list(pack_words([0x1234])) == [0xCE001234]  # padded with stop
+
+    def test_asm_bytes(self):
+        """Test little-endian byte output."""
+        assert asm_bytes(["x0 8", "y0 -1"]) == bytes([0x08, 0x00, 0xFF, 0x1F])
+
+    def test_write(self):
+        """Test $readmemh and binary writers."""
+        words = pack_words([0x0008, 0x1FFF, 0xD000])
+        mem = io.StringIO()
+        write_mem(words, mem)
+        assert mem.getvalue() == "1FFF0008\nCE00D000\n"
+        raw = io.BytesIO()
+        write_bin(words, raw)
+        assert raw.getvalue() == bytes([0x08, 0x00, 0xFF, 0x1F, 0x00, 0xD0, 0x00, 0xCE])
+
+    def test_build_files(self, tmp_path):
+        """Test batch assembly with content-hash cache."""
+        src_dir = tmp_path / "src"
+        (src_dir / "sub").mkdir(parents=True)
+        (src_dir / "a.eas").write_text("x0 8\ny0 -1\n", encoding="utf-8")
+        (src_dir / "sub" / "b.eas").write_text("nop\n", encoding="utf-8")
+        out_dir = tmp_path / "out"
+
+        assert build_files([src_dir], out_dir, fmt='both', jobs=2) == (2, 0, [], 0)
+        assert (out_dir / "a.mem").read_text(encoding="utf-8") == "1FFF0008\n"
+        assert (out_dir / "sub" / "b.bin").read_bytes() == bytes([0x00, 0xCC, 0x00, 0xCE])
+
+        # no-op rebuild, then rebuild after changing a source or deleting an output
+        assert build_files([src_dir], out_dir, fmt='both') == (0, 2, [], 0)
+        (src_dir / "a.eas").write_text("x0 9\n", encoding="utf-8")
+        (out_dir / "sub" / "b.mem").unlink()
+        assert build_files([src_dir], out_dir, fmt='both', jobs=1) == (2, 0, [], 0)
+        assert (out_dir / "a.mem").read_text(encoding="utf-8") == "CE000009\n"
+
+        # errors are reported per file and never cached
+        (src_dir / "a.eas").write_text("x0 5000\n", encoding="utf-8")
+        built, skipped, errors, _ = build_files([src_dir], out_dir, fmt='both')
+        assert (built, skipped) == (0, 1)
+        assert len(errors) == 1 and "Invalid 12-bit literal" in errors[0]
+        assert build_files([src_dir], out_dir, fmt='both')[2] == errors
+
+    def test_listing(self, tmp_path):
+        """Test listing maps byte addresses to source lines, after passes."""
+        src = tmp_path / "a.eas"
+        src.write_text("x0 8   # left\nnop\ny0 -1\n", encoding="utf-8")
+        assert listing(src).splitlines() == [
+            "0000  0008  a.eas:1  x0 8",
+            "0002  CC00  a.eas:2  nop",
+            "0004  1FFF  a.eas:3  y0 -1",
+            "0006  CE00  -  stop"]
+        assert listing(src, optimise=True).splitlines()[1] == "0002  1FFF  a.eas:3  y0 -1"
+
+    def test_main(self, tmp_path, monkeypatch, capsys):
+        """Test jobs must be at least 1 and a single file assembles once for every output."""
+        src = tmp_path / "a.eas"
+        src.write_text("x0 8\ny0 -1\ndraw pix ca\n", encoding="utf-8")
+        for jobs in ('0', '-2', 'two'):
+            with pytest.raises(SystemExit):
+                main([str(src), '-d', str(tmp_path / "out"), '-j', jobs])
+            assert "jobs must be" in capsys.readouterr().err
+        calls, asm_source = [], erasm.asm_source
+        def counted(*args):
+            calls.append(args)
+            return asm_source(*args)
+        monkeypatch.setattr(erasm, "asm_source", counted)
+        assert main([str(src), '-O', '-C', '--canvas', '16x16', '-l',
+            str(tmp_path / "a.lst"), '--cycles']) == 0
+        assert len(calls) == 1
@@ -0,0 +1,83 @@
+# Isle.Computer - Earthrise Cycle Cost Estimator Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Cycle Cost Estimator Tests"""
+
+from erasm import asm_instrs, cycle_report
+from ercost import estimate
+from ermodel import circle_offsets, draw_tri, line_points, tri_sort
+
+def cycles(src, canvas=None):
+    """Estimated cycles for each instruction of assembler source lines."""
+    return [cost.cycles for cost in estimate(asm_instrs(src), canvas).costs]
+
+
+class TestErmodel:
+    """Test class for ermodel."""
+
+    def test_line_points(self):
+        """Test line pixels always run from top to bottom."""
+        assert line_points(0, 0, 3, 1) == [(0, 0), (1, 0), (2, 1), (3, 1)]
+        assert line_points(3, 1, 0, 0) == line_points(0, 0, 3, 1)
+        assert line_points(2, 0, 2, 3) == [(2, 0), (2, 1), (2, 2), (2, 3)]
+
+    def test_circle_offsets(self):
+        """Test circle offsets cover an octant from (-r, 0) to (0, r)."""
+        offsets = circle_offsets(5)
+        assert offsets[0] == (-5, 0)
+        assert offsets[-1] == (0, 5)
+        assert all(xa <= 0 <= ya for xa, ya in offsets)
+
+    def test_tri_sort(self):
+        """Test triangle vertices are sorted by y."""
+        assert tri_sort(((0, 9), (5, 1), (8, 4))) == ((5, 1), (8, 4), (0, 9))
+
+    def test_tri_fill(self):
+        """Test filled triangle spans stay inside the edges."""
+        _, pixels, spans = draw_tri(((4, 4), (12, 12), (0, 16)), True)
+        assert spans
+        for y, xa, xb in spans:
+            row = [x for x, py in pixels if py == y]
+            assert min(row) < xa <= xb < max(row)
+
+
+class TestErcost:
+    """Test class for ercost."""
+
+    def test_simple(self):
+        """Test cycles for loads, pixel, and stop."""
+        assert cycles(["x0 1", "y0 2", "draw pix ca", "stop"]) == [3, 3, 3, 2]
+        assert estimate(asm_instrs(["stop"])).cycles == 4
+
+    def test_lines(self):
+        """Test cycles for Bresenham and fast horizontal lines."""
+        assert cycles(["x0 0", "y0 0", "x1 9", "y1 3", "draw line ca"])[-1] == 2 + 10 + 4
+        assert cycles(["x0 0", "y0 0", "x1 9", "y1 0", "draw line ca"])[-1] == 2 + 9 + 3
+
+    def test_rect(self):
+        """Test filled rect is one fast line per row."""
+        assert cycles(["x0 0", "y0 0", "x1 9", "y1 3", "draw rectf ca"])[-1] == 2 + 4 * (1 + 12)
+
+    def test_unknown(self):
+        """Test draws with unknown registers and degenerate triangles."""
+        est = estimate(asm_instrs(["draw pix ca", "stop"]))
+        assert est.costs[0].note
+        src = ["x0 1", "y0 1", "x1 1", "y1 5", "x2 1", "y2 9", "draw tri ca", "stop"]
+        est = estimate(asm_instrs(src))
+        assert len(est.costs) == 7 and "halts" in est.note
+
+    def test_clipped(self):
+        """Test pixels outside the canvas are counted."""
+        est = estimate(asm_instrs(["x0 -2", "y0 0", "x1 7", "y1 1", "draw rectf ca"]), (4, 4))
+        assert est.costs[-1].pixels == 20
+        assert est.costs[-1].clipped == 12
+
+    def test_report(self, tmp_path):
+        """Test report from source file lists lines and totals."""
+        src = tmp_path / "pix.eas"
+        src.write_text("x0 1\ny0 2\ndraw pix ca  # dot\nx0 1\nstop\n")
+        report = cycle_report(src)
+        assert "3: draw pix ca" in report
+        assert "total: 5 instructions, 16 cycles" in report
+        assert "total: 4 instructions, 13 cycles" in cycle_report(src, optimise=True)
@@ -0,0 +1,61 @@
+# Isle.Computer - Earthrise Disassembler Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Disassembler Tests"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from erasm import asm_file, asm_lines, words_to_bytes
+from erdis import disassemble, main, read_bin, read_mem
+
+DRAWINGS = Path(__file__).parent / "../../res/drawings"
+
+class TestErdis:
+    """Test class for erdis."""
+
+    def test_all_instructions(self):
+        """Test every 16-bit instruction round-trips through erasm."""
+        words = np.arange(0x10000, dtype='<u2').view('<u4')
+        lines = disassemble(words)
+        assert lines[:3] == ['x0 0', 'x0 1', 'x0 2']
+        assert np.array_equal(np.array(asm_lines(lines), dtype='<u4'), words)
+
+    def test_mnemonics(self):
+        """Test common instructions use mnemonics, others raw."""
+        words = np.array([0xC00A_1FFF, 0xCE00_D303, 0xCA00_D001, 0xCC00_C305], dtype='<u4')
+        assert disassemble(words) == ['y0 -1', 'lca 10', 'draw trif cb', 'stop',
+            'raw 0xD001', 'raw 0xCA00', 'fcb 5', 'nop']
+
+    def test_drawings(self):
+        """Test compiled drawings disassemble to the same words."""
+        for src in DRAWINGS.glob('*.eas'):
+            words = np.array(asm_file(src), dtype='<u4')
+            assert np.array_equal(np.array(asm_lines(disassemble(words)), dtype='<u4'), words)
+            addressed = disassemble(words, addresses=True)
+            assert np.array_equal(np.array(asm_lines(addressed), dtype='<u4'), words)
+
+    def test_read(self):
+        """Test $readmemh comments, addresses, and binary input."""
+        mem = "// header\nC00A1FFF /* two */ CE00D303\n@4 CC00C305\n"
+        assert read_mem(mem).tolist() == [0xC00A1FFF, 0xCE00D303, 0, 0, 0xCC00C305]
+        assert read_mem("C00A1FFF\nCE00D303\n").tolist() == [0xC00A1FFF, 0xCE00D303]
+        with pytest.raises(ValueError):
+            read_mem("C00A1FFG\n")
+        data = words_to_bytes(asm_file(DRAWINGS / "basic-test.eas"))
+        assert read_bin(data).tolist() == list(asm_file(DRAWINGS / "basic-test.eas"))
+        with pytest.raises(ValueError):
+            read_bin(b'\0' * 6)
+
+    def test_cli(self, tmp_path, capsys):
+        """Test compiled all-shapes drawing disassembles up to stop."""
+        assert main([str(DRAWINGS / "all-shapes.mem"), '-s']) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0] == 'lca 10' and lines[-1] == 'stop'
+        out = tmp_path / "all-shapes.eas"
+        assert main([str(DRAWINGS / "all-shapes.mem"), '-o', str(out)]) == 0
+        with open(DRAWINGS / "all-shapes.mem", encoding="utf-8") as f:
+            assert list(asm_file(out)) == read_mem(f.read()).tolist()
@@ -0,0 +1,68 @@
+# Isle.Computer - Earthrise Assembler Macros Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Assembler Macros Tests"""
+
+from pathlib import Path
+
+import pytest
+
+from erasm import INSTR_TABLE, asm_instrs, asm_source
+from ermacro import expand
+from eropt import optimise
+from erstate import ErState
+
+DRAWINGS = Path(__file__).parent / "../../res/drawings"
+
+def shapes(instrs):
+    """Draw instructions with register values they read, from reset."""
+    return ErState.reset().draws(instrs)
+
+
+class TestErmacro:
+    """Test class for ermacro."""
+
+    def test_plain(self):
+        """Test programs without directives are unchanged."""
+        lines = ["x0 1  # comment", "", "draw pix ca"]
+        assert expand(lines) == (lines, None)
+
+    def test_instance(self):
+        """Test macro instances set translation, arguments, and restore translation."""
+        src = [".macro dot c", "lca \\c", "x0 0", "y0 0", "draw pix ca", ".endm",
+               "dot 10 20 3", "dot 12 20 4", "x0 5", "stop"]
+        lines, nums = expand(src)
+        assert lines == ["lca 3", "xt 10", "yt 20", "x0 0", "y0 0", "draw pix ca",
+                         "lca 4", "xt 12", "x0 0", "y0 0", "draw pix ca",
+                         "xt 0", "yt 0", "x0 5", "stop"]
+        assert nums[:3] == [2, 3, 3] and nums[-1] == 10
+
+    def test_repeat(self):
+        """Test nested repeats offset translation relative to current."""
+        src = ["xt 100", ".repeat 2 0 8", ".repeat 3 4 0", "x0 0", "y0 0",
+               "draw pix ca", ".endr", ".endr", "stop"]
+        got = [regs[:2] for _, regs in shapes(asm_instrs(expand(src)[0]))]
+        assert got == [[100 + 4*i, 8*j] for j in range(2) for i in range(3)]
+
+    def test_errors(self):
+        """Test directive errors report the source line."""
+        with pytest.raises(ValueError, match="line 1"):
+            expand([".macro sq", "x0 1"])
+        with pytest.raises(ValueError, match="line 3"):
+            expand([".macro sq", ".endm", "sq 1"])
+        with pytest.raises(ValueError, match="line 1"):
+            expand([".include other.eas"])
+
+    def test_reserved_names(self):
+        """Test macros can't take over instruction or register names."""
+        for name in ("stop", "nop", "raw", "draw", "lca", "x0", "xt"):
+            with pytest.raises(ValueError, match=f"invalid macro name '{name}'"):
+                expand([f".macro {name}", "draw pix ca", ".endm", "stop"], INSTR_TABLE)
+
+    def test_squares(self):
+        """Test macro drawing matches the hand-written drawing."""
+        plain = asm_source(DRAWINGS / "16-squares.eas")
+        macro = asm_source(DRAWINGS / "16-squares-macro.eas")
+        assert shapes(macro) == shapes(plain)
+        assert shapes(optimise(macro)) == shapes(plain)
@@ -0,0 +1,101 @@
+# Isle.Computer - Earthrise Peephole Optimiser Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Peephole Optimiser Tests"""
+
+from erasm import asm_instrs
+from eropt import cull_keep, optimise
+
+def opt(src):
+    """Optimise assembler source lines, returning assembled instructions."""
+    return optimise(asm_instrs(src))
+
+
+def cull(src, canvas):
+    """Cull assembler source lines for canvas, returning assembled instructions."""
+    instrs = asm_instrs(src)
+    return [instrs[i] for i in cull_keep(instrs, canvas)]
+
+
+class TestEropt:
+    """Test class for eropt."""
+
+    def test_nop(self):
+        """Test nop removal."""
+        assert opt(["x0 1", "nop", "y0 2", "draw pix ca", "nop", "stop"]) == (
+            asm_instrs(["x0 1", "y0 2", "draw pix ca", "stop"]))
+
+    def test_duplicate_loads(self):
+        """Test loads of values registers already hold are removed."""
+        src = ["xt 0", "lca 3", "x0 1", "y0 2", "draw pix ca",
+               "lca 3", "x0 1", "xt 0", "draw pix ca", "stop"]
+        assert opt(src) == asm_instrs(["xt 0", "lca 3", "x0 1", "y0 2", "draw pix ca",
+               "draw pix ca", "stop"])
+
+    def test_translation(self):
+        """Test translation is applied when coordinates are loaded."""
+        # same x0 value after changing xt is a different vertex
+        src = ["xt 0", "yt 0", "x0 1", "y0 1", "draw pix ca",
+               "xt 4", "x0 1", "y0 1", "draw pix ca", "stop"]
+        assert opt(src) == asm_instrs(["xt 0", "yt 0", "x0 1", "y0 1", "draw pix ca",
+               "xt 4", "x0 1", "draw pix ca", "stop"])
+        # translated vertex matches a different raw value
+        src = ["xt 0", "x0 5", "y0 0", "draw pix ca", "xt 4", "x0 1", "draw pix ca", "stop"]
+        assert opt(src) == asm_instrs(["xt 0", "x0 5", "y0 0", "draw pix ca",
+               "draw pix ca", "stop"])
+        # unknown translation: can't remove coordinate loads
+        src = ["x0 1", "y0 1", "draw pix ca", "x0 1", "draw pix ca", "stop"]
+        assert opt(src) == asm_instrs(src)
+
+    def test_dead_loads(self):
+        """Test overwritten and unused loads are removed."""
+        src = ["x0 1", "x0 2", "y0 2", "fca 4", "draw pix ca", "y1 3", "stop"]
+        assert opt(src) == asm_instrs(["x0 2", "y0 2", "draw pix ca", "stop"])
+        # without stop, registers may be used by the rest of the command list
+        assert opt(src[:-1]) == asm_instrs(["x0 2", "y0 2", "fca 4", "draw pix ca", "y1 3"])
+
+    def test_radius(self):
+        """Test r0 and x1 share a register load."""
+        src = ["xt 0", "x0 8", "y0 8", "x1 4", "y1 4", "draw line ca",
+               "r0 4", "draw circ ca", "stop"]
+        assert opt(src) == asm_instrs(["xt 0", "x0 8", "y0 8", "x1 4", "y1 4",
+               "draw line ca", "draw circ ca", "stop"])
+        # x1 translated by xt, so r0 load is still needed
+        src = ["xt 2", "x0 8", "y0 8", "x1 4", "y1 4", "draw line ca",
+               "xt 0", "r0 4", "draw circ ca", "stop"]
+        assert opt(src) == asm_instrs(src)
+
+    def test_unreachable(self):
+        """Test instructions after stop are removed."""
+        assert opt(["x0 1", "y0 1", "draw pix ca", "stop", "draw pix cb"]) == (
+            asm_instrs(["x0 1", "y0 1", "draw pix ca", "stop"]))
+
+    def test_flow_control(self):
+        """Test programs with jumps are unchanged."""
+        instrs = asm_instrs(["x0 1", "x0 1", "nop", "stop"]) + [0xCA00]
+        assert optimise(instrs) == instrs
+
+    def test_cull(self):
+        """Test draws outside the canvas are removed with their loads."""
+        canvas = (64, 32)
+        src = ["xt 0", "yt 0", "lca 2", "x0 8", "y0 8", "draw pix ca", "x0 70", "draw pix ca",
+               "xt -20", "x0 8", "x1 30", "y1 9", "draw line ca",  # translated: x -12..10
+               "x0 4", "x1 10", "draw line ca", "stop"]
+        assert cull(src, canvas) == asm_instrs(["xt 0", "yt 0", "lca 2", "x0 8", "y0 8",
+               "draw pix ca", "xt -20", "x0 8", "x1 30", "y1 9", "draw line ca", "stop"])
+        # circles: radius reaches canvas
+        src = ["xt 0", "yt 0", "x0 -10", "y0 8", "r0 12", "draw circ ca", "r0 8", "draw circ ca",
+               "stop"]
+        assert cull(src, canvas) == asm_instrs(["xt 0", "yt 0", "x0 -10", "y0 8", "r0 12",
+               "draw circ ca", "stop"])
+        # degenerate triangles halt Earthrise, so stay
+        src = ["xt 0", "yt 0", "x0 -9", "y0 0", "x1 -9", "y1 4", "x2 -9", "y2 8", "draw tri ca",
+               "stop"]
+        assert cull(src, canvas) == asm_instrs(src)
+        # translation left by another list is unknown
+        src = ["x0 70", "y0 8", "draw pix ca", "stop"]
+        assert cull(src, canvas) == asm_instrs(src)
+        # loads that didn't feed a culled shape are left for the optimiser
+        src = ["xt 0", "yt 0", "lca 3", "lca 2", "x0 70", "y0 8", "draw pix ca", "stop"]
+        assert cull(src, canvas) == asm_instrs(["lca 3", "stop"])
@@ -0,0 +1,81 @@
+# Isle.Computer - Earthrise Command List Paging Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Command List Paging Tests"""
+
+import json
+import random
+
+import pytest
+
+from erasm import asm_instrs, main
+from erpage import paginate, prologue
+from erstate import REG_CNT, ErState
+
+def scene(count, seed=1):
+    """Random program of translated shapes."""
+    rng = random.Random(seed)
+    src = ["yt 0", "lca 1"]
+    for _ in range(count):
+        src.append(f"xt {rng.randint(-64, 64)}")
+        src.append(f"fca {rng.randint(0, 15)}")
+        for reg in ('x0', 'y0', 'x1', 'y1', 'x2', 'y2'):
+            if rng.random() < 0.7:
+                src.append(f"{reg} {rng.randint(0, 300)}")
+        src.append(rng.choice(("draw trif ca", "draw line ca", "draw rectf ca", "draw pix ca")))
+        if rng.random() < 0.2:
+            src.extend(("r0 8", "draw circ ca"))
+    src.extend(("x0 0", "y0 0", "r0 10", "draw circf ca"))
+    return asm_instrs(src) + [0xCE00]
+
+
+class TestErpage:
+    """Test class for erpage."""
+
+    def test_prologue(self):
+        """Test prologue reproduces translated vertices, radius, and translation."""
+        regs = [5, 6, 40, 8, None, None, None, None, 12, -3, 7, 1, 2, 3, 4]
+        state = ErState([99] * REG_CNT)
+        for instr in prologue(regs, range(REG_CNT)):
+            state.step(instr)
+        assert state.regs == [99 if val is None else val for val in regs]
+
+    def test_pages_run_alone(self):
+        """Test each page draws the same as the program from any start state."""
+        instrs = scene(200)
+        pages = paginate(instrs, 128)
+        assert len(pages) > 1
+        assert all(len(page.instrs) <= 128 for page in pages)
+        assert [p.start for p in pages[1:]] == [p.end for p in pages[:-1]]
+        expect = ErState.reset().draws(instrs)
+        got = []
+        for num, page in enumerate(pages):
+            start = ErState.reset() if num == 0 else ErState([77] * REG_CNT)
+            got.extend(start.draws(page.instrs))
+        assert got == expect
+        # registers the program doesn't load are left for pages to read; coordinates
+        # loaded with unknown translation are reloaded as they were
+        pages = paginate(asm_instrs(["x0 1", "y0 1"] + ["draw pix ca"] * 20), 8)
+        assert len(pages) > 1
+        assert all(p.instrs[:p.prologue] == asm_instrs(["x0 1", "y0 1"]) for p in pages[1:])
+
+    def test_too_big(self):
+        """Test runs without a draw that can't fit a page are errors."""
+        with pytest.raises(ValueError):
+            paginate(asm_instrs(["lca 1"] * 20 + ["draw pix ca"]), 16)
+        with pytest.raises(ValueError):
+            paginate([0xCA00])
+
+    def test_cli(self, tmp_path):
+        """Test pages and manifest written by erasm."""
+        src = tmp_path / "big.eas"
+        src.write_text("x0 1\ny0 1\n" + "draw pix ca\n" * 5000 + "stop\n")
+        assert main([str(src), '-p', str(tmp_path / "out"), '-f', 'both']) == 0
+        manifest = json.loads((tmp_path / "out" / "big.json").read_text())
+        assert len(manifest['pages']) == 3
+        assert sum(p['instructions'] - p['prologue'] - 1 for p in manifest['pages']) == 5002
+        for page in manifest['pages']:
+            assert page['words'] <= 1024
+            assert (tmp_path / "out" / page['mem']).exists()
+            assert (tmp_path / "out" / page['bin']).stat().st_size == 4 * page['words']
@@ -0,0 +1,79 @@
+# Isle.Computer - Earthrise Reference Renderer Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Earthrise Reference Renderer Tests"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from erasm import asm_instrs, asm_source
+from eropt import cull_keep, optimise
+from erpage import paginate
+from errender import canvas_to_rgb, load_instrs, main, pack_canvas, read_palette, render
+
+RES = Path(__file__).parent / "../../res"
+DRAWINGS = sorted((RES / "drawings").glob('*.eas'))
+
+class TestErrender:
+    """Test class for errender."""
+
+    def test_basic_test(self):
+        """Test basic-test drawing matches chapter 3 test bench pixels (672x384, 2 bpp)."""
+        canvas = render(load_instrs(str(RES / "drawings/basic-test.mem")), bpp=2)
+        rgb = canvas_to_rgb(canvas, read_palette(RES / "palettes/aqua-4.mem"))
+        assert tuple(rgb[1, 2]) == (0, 11 << 3 | 11 >> 2, 17 << 3 | 17 >> 2)
+        rows = {  # colour index from x=0 (chapter 3 bench spot checks; some are ch03.py PIXELS)
+            1:  "0010",
+            5:  "002222222200002333200013310",
+            9:  "0000000000000000000000133333310",
+            12: "000010000000002333200"
+        }
+        for y, row in rows.items():
+            assert ''.join(map(str, canvas[y, :len(row)])) == row
+
+    def test_shapes(self):
+        """Test clipping, colour truncation, and jumps."""
+        src = ["fca 0x13", "x0 -4", "y0 -2", "x1 3", "y1 1", "draw rectf ca", "stop"]
+        canvas = render(asm_instrs(src), size=(8, 4), bpp=4)
+        assert canvas.tolist() == [[3] * 4 + [0] * 4] * 2 + [[0] * 8] * 2
+        # jump over first pixel: 0xA00A sets target to byte address 10 (sixth instruction)
+        instrs = (asm_instrs(["x0 2", "y0 0"]) + [0xA00A, 0xCA00] +
+            asm_instrs(["draw pix ca", "x0 1", "draw pix ca", "stop"]))
+        canvas = render(instrs, size=(4, 1))
+        assert canvas.tolist() == [[0, 1, 0, 0]]
+        with pytest.raises(ValueError, match="y0"):
+            render(asm_instrs(["x0 1", "draw pix ca"]))
+
+    def test_pack(self):
+        """Test canvas packing puts the first pixel in the lowest bits."""
+        canvas = np.array([[1, 2, 3, 0] * 4, [3] * 16], dtype=np.uint8)
+        assert pack_canvas(canvas, 2).tolist() == [0x39393939, 0xFFFFFFFF]
+        assert pack_canvas(canvas[:1, :8], 4).tolist() == [0x03210321]
+
+    def test_passes(self):
+        """Test optimised, culled, paged, and macro programs render the same."""
+        size = (336, 192)
+        for src in DRAWINGS:
+            instrs = asm_source(src)
+            expect = render(instrs, size=size)
+            assert np.array_equal(render(optimise(instrs), size=size), expect), src.name
+            culled = [instrs[i] for i in cull_keep(instrs, size)]
+            assert np.array_equal(render(culled, size=size), expect), src.name
+            canvas = None
+            for page in paginate(instrs, 64):  # each page alone from the program's start state
+                canvas = render(page.instrs, canvas, size)
+            assert np.array_equal(canvas, expect), src.name
+        assert np.array_equal(render(asm_source(RES / "drawings/16-squares-macro.eas")),
+            render(asm_source(RES / "drawings/16-squares.eas")))
+
+    def test_cli(self, tmp_path):
+        """Test PNG and vram output."""
+        png, mem = tmp_path / "basic.png", tmp_path / "basic.mem"
+        assert main([str(RES / "drawings/basic-test.eas"), '--canvas', '32x16',
+            '--bpp', '2', '-p', str(RES / "palettes/aqua-4.mem"),
+            '-o', str(png), '-m', str(mem)]) == 0
+        assert png.read_bytes()[:4] == b'\x89PNG'
+        assert len(mem.read_text().split()) == 32 * 16 // 16
@@ -0,0 +1,79 @@
+# Isle.Computer - SVG to Earthrise Converter Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""SVG to Earthrise Converter Tests"""
+
+import numpy as np
+import pytest
+
+from erasm import asm_instrs
+from errender import render
+from svg2eas import convert, cross, order_tris, parse_path, parse_transform, triangulate
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg">{}</svg>'
+
+def area(pts):
+    """Polygon area."""
+    return abs(sum(cross((0, 0), pts[i-1], pts[i]) for i in range(len(pts)))) / 2
+
+
+class TestSvg2eas:
+    """Test class for svg2eas."""
+
+    def test_triangulate(self):
+        """Test concave polygon gives n-2 triangles covering its area."""
+        star = [(10, 0), (13, 7), (20, 8), (15, 13), (17, 20), (10, 16), (3, 20),
+                (5, 13), (0, 8), (7, 7)]
+        for pts in (star, star[::-1]):
+            tris = triangulate(pts)
+            assert len(tris) == len(pts) - 2
+            assert sum(area(t) for t in tris) == area(pts)
+            assert all(len({x for x, _ in t}) > 1 for t in tris)  # Earthrise halts if x equal
+        # collinear and repeated points are removed
+        assert len(triangulate([(0, 0), (5, 0), (5, 0), (10, 0), (10, 10), (0, 10)])) == 2
+
+    def test_order(self):
+        """Test ordered triangles share vertices with the one before."""
+        tris = order_tris(triangulate([(0, 0), (40, 0), (40, 10), (30, 2), (20, 10),
+            (10, 2), (0, 10)]))
+        shared = [len(set(a) & set(b)) for a, b in zip(tris, tris[1:])]
+        assert min(shared) >= 1 and shared.count(2) >= 3  # middle triangle has 3 neighbours
+
+    def test_path(self):
+        """Test path commands and transforms."""
+        assert parse_path("M10 10 h 10 v10 H10 z m 5,5 l1 0 1 1") == [
+            [(10, 10), (20, 10), (20, 20), (10, 20)], [(15, 15), (16, 15), (17, 16)]]
+        curve = parse_path("M0 0 Q 10 20 20 0")[0]
+        assert curve[-1] == (20, 0) and max(y for _, y in curve) == 10
+        assert parse_transform("translate(5) scale(2)") == (2, 0, 0, 2, 5, 0)
+        # numbers after close path and missing numbers
+        with pytest.raises(ValueError, match="number at 14 after Z"):
+            parse_path("M0 0 L10 10 Z 20 20")
+        with pytest.raises(ValueError, match="L at 5 needs 2 numbers"):
+            parse_path("M0 0 L10")
+        with pytest.raises(ValueError, match="C at 5 needs 6 numbers"):
+            parse_path("M0 0 C1 1 2 2 Z")
+
+    def test_convert(self):
+        """Test converted shapes render as expected with fewer loads."""
+        svg = SVG.format('<rect x="2" y="2" width="4" height="3" fill="#f00"/>'
+            '<polygon points="10,0 20,0 20,10 15,4 10,10" fill="blue"/>'
+            '<circle cx="30" cy="5" r="3" fill="red"/>')
+        lines, naive = convert(svg)
+        canvas = render(asm_instrs(lines), size=(40, 12))
+        assert canvas[2:5, 2:6].tolist() == [[1] * 4] * 3 and canvas[5, 2] == 0
+        assert canvas[1, 11] == 2 and canvas[9, 15] == 0 and canvas[5, 30] == 1
+        assert len(lines) < len(naive)
+        assert np.array_equal(canvas, render(asm_instrs(naive + ["stop"]), size=(40, 12)))
+        # palette: nearest colour
+        lines, _ = convert(SVG.format('<rect width="2" height="2" fill="#0000f0"/>'),
+            palette=[0x0000, 0x7C00, 0x001F])
+        assert lines[0] == "fca 2"
+        # numbered colours must fit fca's 8-bit index
+        rects = ''.join(f'<rect width="2" height="2" fill="#{i:06x}"/>' for i in range(256))
+        with pytest.raises(ValueError, match="255 colours"):
+            convert(SVG.format(rects))
+        with pytest.raises(ValueError, match="Palette index 256"):
+            convert(SVG.format('<rect width="2" height="2" fill="#fff"/>'),
+                palette=[0] * 256 + [0x7FFF])
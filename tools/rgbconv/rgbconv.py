@@ -6,41 +6,47 @@
 
 """RGB Colour Converter: RGB555 <-> RGB888"""
 
+# NB. Colours are held as 24-bit RGB888 integers. RGB555 expands through a
+#     32K lookup table and RGB888 reduces by shifting, so RGB555 files
+#     convert to RGB888 and back unchanged. Batch mode needs NumPy.
+
+import argparse
+import os
 import re
 import sys
+from functools import lru_cache
+
+# 24-bit: RRGGBB, #RRGGBB, or 0xRRGGBB
+HEX_24_PAT = re.compile(r"^(?:#|0x)?([0-9a-fA-F]{6})$")
+
+# 15-bit: ABCD or 0xABCD
+HEX_15_PAT = re.compile(r"^(?:0x)?([0-9a-fA-F]{4})$")
+
+# 15-bit RGB(r,g,b) - allows spaces and RGB is case-insensitive
+RGB_15_PAT = re.compile(r"^RGB\s*\(\s*(\d{1,2})\s*,\s*(\d{1,2})\s*,\s*(\d{1,2})\s*\)$",
+    re.IGNORECASE)
+
+# batch: one colour per line in any of the string formats above
+HEX_LIST_PAT = re.compile(r"^[ \t]*(?:(?:#|0x)?([0-9a-fA-F]{6})|(?:0x)?([0-9a-fA-F]{4})|"
+    r"RGB\s*\(\s*(\d{1,2})\s*,\s*(\d{1,2})\s*,\s*(\d{1,2})\s*\))[ \t]*$",
+    re.IGNORECASE | re.MULTILINE)
+COMMENT_PAT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+DEC_RGB_PAT = re.compile(r"^[ \t]*(\d+)[ \t]+(\d+)[ \t]+(\d+)", re.MULTILINE)
+
+FORMATS = ('mem', 'gpl', 'pal', 'hex')  # batch file formats (by extension)
+GPL_COLUMNS = 16  # GIMP palette columns
 
 def parse_colr(colr_str):
     """Parse RGB colour string."""
+    match = HEX_24_PAT.match(colr_str)
+    if match:
+        return 8, int(match[1], 16)
+
+    match = HEX_15_PAT.match(colr_str)
+    if match:
+        return 5, int(match[1], 16)
 
-    # 24-bit string RRGGBB (6 chars)
-    hex_0x24_pat = re.compile(r"^[0-9a-fA-F]{6}$")
-    if hex_0x24_pat.match(colr_str):
-        return 8, int(colr_str, 16)
-
-    # 24-bit hex triplet #RRGGBB (7 chars)
-    hex_triplet_pat = re.compile(r"^#[0-9a-fA-F]{6}$")
-    if hex_triplet_pat.match(colr_str):
-        return 8, int(colr_str[1:], 16)
-
-    # 24-bit 0x string 0xRRGGBB (8 chars)
-    hex_0x24_pat = re.compile(r"^0x[0-9a-fA-F]{6}$")
-    if hex_0x24_pat.match(colr_str):
-        return 8, int(colr_str[2:], 16)
-
-    # 15-bit string ABCD (4 chars)
-    hex_15_pat = re.compile(r"^[0-9a-fA-F]{4}$")
-    if hex_15_pat.match(colr_str):
-        return 5, int(colr_str, 16)
-
-    # 15-bit 0x string 0xABCD (6 chars)
-    hex_0x15_pat = re.compile(r"^0x[0-9a-fA-F]{4}$")
-    if hex_0x15_pat.match(colr_str):
-        return 5, int(colr_str[2:], 16)
-
-    # 15-bit RGB(r,g,b) - allows spaces and RGB is case-insensitive
-    rgb_pattern = re.compile(r"^RGB\s*\(\s*(\d{1,2})\s*,\s*(\d{1,2})\s*,\s*(\d{1,2})\s*\)$",
-        re.IGNORECASE)
-    match = rgb_pattern.match(colr_str)
+    match = RGB_15_PAT.match(colr_str)
     if match:
         r, g, b = map(int, match.groups())
         if r > 31 or g > 31 or b > 31:
@@ -50,37 +56,270 @@ def parse_colr(colr_str):
     raise ValueError(f"Unknown colour '{colr_str}'")
 
 
-if __name__ == "__main__":
+def rgb555_to_888(rgb555):
+    """Expand RGB555 to RGB888, scaling each channel from 5 to 8 bits."""
+    r5 = (rgb555 >> 10) & 0x1F
+    g5 = (rgb555 >> 5)  & 0x1F
+    b5 = rgb555         & 0x1F
+    return ((r5 << 3 | r5 >> 2) << 16) | ((g5 << 3 | g5 >> 2) << 8) | (b5 << 3 | b5 >> 2)
+
+
+def rgb888_to_555(rgb888):
+    """Reduce RGB888 to RGB555 (works on integers and NumPy arrays)."""
+    return ((rgb888 >> 9) & 0x7C00) | ((rgb888 >> 6) & 0x03E0) | ((rgb888 >> 3) & 0x001F)
+
+
+def format_colr(colr):
+    """Format parsed colour as RGB888, RGB555, and 5-bit channels."""
+    rgb888 = rgb555_to_888(colr[1]) if colr[0] == 5 else colr[1]
+    rgb555 = colr[1] if colr[0] == 5 else rgb888_to_555(colr[1])
+    r5, g5, b5 = (rgb555 >> 10) & 0x1F, (rgb555 >> 5) & 0x1F, rgb555 & 0x1F
+    return f"#{rgb888:06X} - {rgb555:04X} - rgb({r5:02}, {g5:02}, {b5:02})"
+
+
+#
+# Batch conversion
+#
+
+@lru_cache(maxsize=1)
+def rgb555_table():
+    """RGB888 for every RGB555 colour (NumPy array of 32768, built once)."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    return rgb555_to_888(np.arange(1 << 15, dtype=np.uint32))
+
+
+def hex_array(tokens, digits):
+    """Parse equal-length hex strings in one pass (NumPy uint32 array)."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    data = np.frombuffer(bytes.fromhex(''.join(tokens)), dtype=np.uint8)
+    data = data.reshape(-1, digits // 2).astype(np.uint32)
+    return (data << (8 * np.arange(digits // 2 - 1, -1, -1, dtype=np.uint32))).sum(
+        axis=1, dtype=np.uint32)
+
+
+def channels_to_888(rgb, bits=8):
+    """Pack (n, 3) channel array to RGB888 (bits per channel: 8, or 5 for RGB555)."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    rgb = np.asarray(rgb, dtype=np.uint32).reshape(-1, 3)
+    if rgb.size and rgb.max() >= 1 << bits:
+        raise ValueError(f"colour channel {rgb.max()} is more than {bits} bits")
+    if bits == 5:
+        return rgb555_table()[(rgb[:, 0] << 10) | (rgb[:, 1] << 5) | rgb[:, 2]]
+    return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+
+def read_mem(text):
+    """Read $readmemh palette: RGB555 (4 digits) or RGB888 (6 digits)."""
+    tokens = COMMENT_PAT.sub(' ', text).split()
+    if not tokens:
+        return channels_to_888([])
+    widths = set(map(len, tokens))
+    if widths == {4}:
+        return rgb555_table()[hex_array(tokens, 4) & 0x7FFF]
+    if widths == {6}:
+        return hex_array(tokens, 6)
+    raise ValueError("mem palette needs all 4-digit (RGB555) or all 6-digit (RGB888) values")
+
+
+def read_gpl(text):
+    """Read GIMP palette (.gpl)."""
+    if not text.startswith("GIMP Palette"):
+        raise ValueError("GIMP palette must start with 'GIMP Palette'")
+    return channels_to_888(DEC_RGB_PAT.findall(text))
+
+
+def read_pal(text):
+    """Read JASC palette (.pal)."""
+    tokens = text.split()
+    if tokens[:2] != ['JASC-PAL', '0100'] or len(tokens) < 3:
+        raise ValueError("JASC palette must start with 'JASC-PAL' and '0100'")
+    count = int(tokens[2])
+    if len(tokens) - 3 < 3 * count:
+        raise ValueError(f"JASC palette has fewer than {count} colours")
+    return channels_to_888(tokens[3:3 + 3*count])
+
+
+def strip_prefix(token):
+    """Hex digits of RRGGBB, #RRGGBB, 0xRRGGBB, ABCD, or 0xABCD."""
+    if len(token) == 7 and token[0] == '#':
+        return token[1:]
+    return token[2:] if token[:2] == '0x' else token
+
+
+def read_hex(text):
+    """Read list of colours in rgbconv string formats, one per line."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    # fast path: all 24-bit or all 15-bit hex, converted in one pass
+    tokens = [strip_prefix(t) for t in COMMENT_PAT.sub(' ', text).split()]
+    widths = set(map(len, tokens))
+    if widths in ({4}, {6}):
+        try:
+            vals = hex_array(tokens, widths.pop())
+            return vals if len(tokens[0]) == 6 else rgb555_table()[vals & 0x7FFF]
+        except ValueError:
+            pass  # not hex: use line by line matching for the error
+
+    lines = [line for line in COMMENT_PAT.sub('', text).splitlines() if line.strip()]
+    matches = HEX_LIST_PAT.findall('\n'.join(lines))
+    if len(matches) != len(lines):
+        bad = next(line for line in lines if not HEX_LIST_PAT.match(line))
+        raise ValueError(f"Unknown colour '{bad.strip()}'")
+    if not matches:
+        return channels_to_888([])
+    cols = np.array(matches).T  # hex24, hex15, r, g, b
+    colrs = np.zeros(len(matches), dtype=np.uint32)
+    for col, digits in ((cols[0], 6), (cols[1], 4)):
+        mask = col != ''
+        if mask.any():
+            vals = hex_array(col[mask].tolist(), digits)
+            colrs[mask] = vals if digits == 6 else rgb555_table()[vals & 0x7FFF]
+    mask = cols[2] != ''
+    if mask.any():
+        colrs[mask] = channels_to_888(cols[2:, mask].T.astype(np.uint32), 5)
+    return colrs
+
+
+def format_rows(fmt, *cols):
+    """Format NumPy columns row by row with str.format, as one string."""
+    return "".join(map(fmt.format, *(col.tolist() for col in cols)))
+
+
+def digit_cols(vals, digits, base=16):
+    """Fixed-width digits of each value as ASCII columns (NumPy (n, digits) array)."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    places = base ** np.arange(digits - 1, -1, -1, dtype=np.uint32)
+    return np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)[
+        (np.asarray(vals, dtype=np.uint32)[:, None] // places) % base]
+
+
+def text_rows(*parts):
+    """Join ASCII columns and literal bytes into one line per row."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    rows = len(next(p for p in parts if not isinstance(p, bytes)))
+    cols = [np.broadcast_to(np.frombuffer(p, dtype=np.uint8), (rows, len(p)))
+        if isinstance(p, bytes) else p for p in parts]
+    return np.concatenate(cols + [np.full((rows, 1), ord('\n'), dtype=np.uint8)],
+        axis=1).tobytes().decode('ascii')
+
+
+def write_mem(colrs, name=None):  # pylint: disable=unused-argument
+    """Format RGB555 $readmemh palette, with index and 5-bit channels."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    if len(colrs) == 0:
+        return ""
+    rgb555 = rgb888_to_555(colrs)
+    index = np.arange(len(colrs))
+    return text_rows(digit_cols(rgb555, 4), b"  // 0x",
+        digit_cols(index, len(f"{len(colrs) - 1:X}")), b" - (",
+        digit_cols(rgb555 >> 10, 2, 10), b", ",
+        digit_cols((rgb555 >> 5) & 0x1F, 2, 10), b", ",
+        digit_cols(rgb555 & 0x1F, 2, 10), b")")
+
+
+def write_gpl(colrs, name=None):
+    """Format GIMP palette (.gpl)."""
+    head = f"GIMP Palette\nName: {name or 'Isle'}\nColumns: {GPL_COLUMNS}\n#\n"
+    return head + format_rows("{:3} {:3} {:3}\t#{:06X}\n",
+        colrs >> 16, (colrs >> 8) & 0xFF, colrs & 0xFF, colrs)
+
+
+def write_pal(colrs, name=None):  # pylint: disable=unused-argument
+    """Format JASC palette (.pal) with CRLF line endings."""
+    return f"JASC-PAL\r\n0100\r\n{len(colrs)}\r\n" + format_rows("{} {} {}\r\n",
+        colrs >> 16, (colrs >> 8) & 0xFF, colrs & 0xFF)
+
+
+def write_hex(colrs, name=None):  # pylint: disable=unused-argument
+    """Format list of #RRGGBB colours."""
+    return text_rows(b"#", digit_cols(colrs, 6)) if len(colrs) else ""
+
+
+READERS = {'mem': read_mem, 'gpl': read_gpl, 'pal': read_pal, 'hex': read_hex}
+WRITERS = {'mem': write_mem, 'gpl': write_gpl, 'pal': write_pal, 'hex': write_hex}
+
+def file_format(path):
+    """Palette format from file extension (unknown extensions are hex lists)."""
+    ext = os.path.splitext(path)[1].lstrip('.').lower()
+    return ext if ext in FORMATS else 'hex'
+
+
+def convert_file(src, dst, fmt=None):
+    """Convert palette file src to dst (format from dst extension if fmt is None).
+
+    Returns number of colours.
+    """
+    with open(src, 'r', encoding="utf-8", newline='') as f:
+        colrs = READERS[file_format(src)](f.read())
+    fmt = fmt or file_format(dst)
+    name = os.path.splitext(os.path.basename(src))[0]
+    with open(dst, 'w', encoding="utf-8", newline='') as f:
+        f.write(WRITERS[fmt](colrs, name))
+    return len(colrs)
+
+
+def batch(paths, out=None, out_dir=None, fmt=None):
+    """Convert palette files; returns (files converted, colours, errors)."""
+    done = count = 0
+    errors = []
+    for src in paths:
+        if out is not None:
+            dst = out
+        else:
+            ext = fmt or 'mem'
+            stem = os.path.splitext(os.path.basename(src))[0]
+            dst = os.path.join(out_dir or os.path.dirname(src), f"{stem}.{ext}")
+            if os.path.abspath(dst) == os.path.abspath(src):
+                errors.append(f"{src}: output would overwrite input")
+                continue
+        try:
+            count += convert_file(src, dst, fmt)
+            done += 1
+        except (OSError, ValueError) as e:
+            errors.append(f"{src}: {e}")
+    return done, count, errors
+
+
+def interactive():
+    """Convert colour strings from stdin, one per line."""
     try:
         print("Isle RGB Colour Converter - Press ctrl-D to exit")
         for line in sys.stdin:
             line = line.strip()
             if not line:
                 continue
-            colr = parse_colr(line)
-
-            if colr[0] == 5:  #RGB555
-                # unpack 5-bit values
-                r5 = (colr[1] >> 10) & 0x1F
-                g5 = (colr[1] >> 5)  & 0x1F
-                b5 = colr[1]         & 0x1F
-                # scale from 5 to 8 bits
-                r8 = (r5 << 3) | (r5 >> 2)
-                g8 = (g5 << 3) | (g5 >> 2)
-                b8 = (b5 << 3) | (b5 >> 2)
-
-            else:  # RGB888
-                # unpack 8-bit values
-                r8 = (colr[1] >> 16) & 0xFF
-                g8 = (colr[1] >> 8)  & 0xFF
-                b8 = colr[1]         & 0xFF
-                # scale from 8 to 5 bits
-                r5 = r8 >> 3
-                g5 = g8 >> 3
-                b5 = b8 >> 3
-
-            rgb555 = (r5 << 10) + (g5 << 5) + b5
-            print(f"#{r8:02X}{g8:02X}{b8:02X} - {rgb555:04X} - rgb({r5:02}, {g5:02}, {b5:02})")
+            print(format_colr(parse_colr(line)))
 
     except EOFError:  # end of file (ctrl-D)
         pass
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="RGB Colour Converter: RGB555 <-> RGB888",
+        epilog="Without files, converts colour strings from stdin.")
+    parser.add_argument('file', nargs='*',
+        help="batch: palette files (.mem, .gpl, .pal, or hex list)")
+    parser.add_argument('-o', '--out', metavar='FILE', help="batch: output file; single file only")
+    parser.add_argument('-d', '--out-dir', metavar='DIR',
+        help="batch: write outputs to DIR (default: next to each input)")
+    parser.add_argument('-f', '--format', choices=FORMATS,
+        help="batch: output format (default: from -o extension, else mem)")
+    args = parser.parse_args(argv)
+
+    if not args.file:
+        interactive()
+        return 0
+    if args.out is not None and (len(args.file) > 1 or args.out_dir is not None):
+        parser.error("-o needs a single input file; use -d for several")
+    if args.out_dir is not None:
+        os.makedirs(args.out_dir, exist_ok=True)
+    done, count, errors = batch(args.file, args.out, args.out_dir, args.format)
+    for err in errors:
+        print(f"Conversion error: {err}", file=sys.stderr)
+    print(f"rgbconv: converted {done} files ({count} colours), {len(errors)} failed",
+        file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
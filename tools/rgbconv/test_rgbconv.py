@@ -0,0 +1,66 @@
+# Isle.Computer - RGB Colour Converter Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""RGB Colour Converter Tests"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from rgbconv import (format_colr, main, parse_colr, read_gpl, read_hex, read_mem, read_pal,
+    rgb555_table, rgb555_to_888, rgb888_to_555, write_gpl, write_hex, write_mem, write_pal)
+
+PALETTES = Path(__file__).parent / "../../res/palettes"
+
+class TestRgbconv:
+    """Test class for rgbconv."""
+
+    def test_parse_colr(self):
+        """Test colour string formats."""
+        assert parse_colr("1098b1") == parse_colr("#1098b1") == parse_colr("0x1098b1") \
+            == (8, 0x1098B1)
+        assert parse_colr("0A76") == parse_colr("0x0A76") == parse_colr("rgb( 2,19, 22)") \
+            == (5, 0x0A76)
+        assert format_colr(parse_colr("#1098b1")) == "#1098B1 - 0A76 - rgb(02, 19, 22)"
+        assert format_colr(parse_colr("0A76")) == "#109CB5 - 0A76 - rgb(02, 19, 22)"
+        for bad in ("#ABCD", "rgb(32,0,0)", "1098b1 "):
+            with pytest.raises(ValueError):
+                parse_colr(bad)
+
+    def test_table(self):
+        """Test lookup table matches scalar conversion and round-trips."""
+        table = rgb555_table()
+        assert len(table) == 1 << 15
+        assert [int(table[c]) for c in (0, 0x0C43, 0x7FFF)] == \
+            [rgb555_to_888(c) for c in (0, 0x0C43, 0x7FFF)]
+        assert np.array_equal(rgb888_to_555(table), np.arange(1 << 15))
+
+    def test_formats(self):
+        """Test every file format round-trips an Isle palette."""
+        with open(PALETTES / "go-16.mem", encoding="utf-8") as f:
+            mem = f.read()
+        colrs = read_mem(mem)
+        assert len(colrs) == 16 and colrs[0] == 0x181018
+        for read, write in ((read_mem, write_mem), (read_gpl, write_gpl),
+                (read_pal, write_pal), (read_hex, write_hex)):
+            assert np.array_equal(read(write(colrs, "go-16")), colrs), write.__name__
+        assert write_mem(colrs).splitlines()[0] == "0C43  // 0x0 - (03, 02, 03)"
+        assert read_hex("0C43\nrgb(31,31,31)\n// note\n#1098b1\n\n").tolist() == \
+            [0x181018, 0xFFFFFF, 0x1098B1]
+        with pytest.raises(ValueError, match="foo"):
+            read_hex("0C43\nfoo\n")
+        with pytest.raises(ValueError):
+            read_mem("0C43 1098B1\n")
+
+    def test_batch(self, tmp_path):
+        """Test batch conversion to output directory."""
+        out = tmp_path / "out"
+        assert main([str(PALETTES / "go-16.mem"), str(PALETTES / "aqua-4.mem"),
+            '-d', str(out), '-f', 'gpl']) == 0
+        assert (out / "aqua-4.gpl").read_text(encoding="utf-8").startswith(
+            "GIMP Palette\nName: aqua-4\n")
+        assert main([str(out / "go-16.gpl"), '-o', str(tmp_path / "go-16.mem")]) == 0
+        assert np.array_equal(read_mem((tmp_path / "go-16.mem").read_text(encoding="utf-8")),
+            read_mem((PALETTES / "go-16.mem").read_text(encoding="utf-8")))
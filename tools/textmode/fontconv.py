@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Font Converter
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Font Converter: BDF and Unifont hex fonts to font ROM and glyph index table"""
+
+# NB. Glyphs are read one at a time and written as soon as they're seen, in
+#     source order, so memory holds only the distinct glyph bitmaps (for
+#     deduplication) and the code point runs for the index table.
+#
+#     The ROM has one line per glyph: HEIGHT words of WIDTH bits, as rom_sync
+#     loads them for font_glyph. The leftmost pixel is the most significant bit
+#     unless --lsb is given (font_glyph parameter LSB).
+#
+#     The index table maps code points to glyph indices as runs: three UCPW-bit
+#     words per run (first code point, last code point, glyph index of the first
+#     code point), sorted by code point. Code points in a run have consecutive
+#     glyph indices.
+
+import argparse
+import bisect
+import sys
+from contextlib import nullcontext
+from typing import NamedTuple
+
+HEIGHT = 16  # default glyph height (pixels)
+WIDTH = 8    # default glyph width (pixels); half-width glyphs
+UCP_MAX = 0x10FFFF  # largest Unicode code point
+
+# BDF glyph keywords (only valid between STARTCHAR and ENDCHAR) and their glyph properties
+BDF_GLYPH_KEYS = {'ENCODING': 'ucp', 'DWIDTH': 'dwidth', 'BBX': 'bbx', 'BITMAP': None}
+
+
+class Glyph(NamedTuple):
+    """Glyph bitmap: code point, name, and pixel rows (ints, leftmost pixel in MSB)."""
+    ucp: int
+    name: str
+    rows: tuple
+
+
+class Run(NamedTuple):
+    """Index table entry: code points first..last map to glyph index upwards."""
+    first: int
+    last: int
+    index: int
+
+
+def parse_ranges(text):
+    """Parse code point ranges, e.g. '20-7E,2580-259F,FFFD' (hex); returns merged ranges."""
+    ranges = []
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        lo, _, hi = part.upper().removeprefix('U+').partition('-')
+        lo, hi = int(lo, 16), int(hi.removeprefix('U+') or lo, 16)
+        if not 0 <= lo <= hi <= UCP_MAX:
+            raise ValueError(f"bad code point range '{part}'")
+        ranges.append((lo, hi))
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(hi, merged[-1][1]))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def in_ranges(ucp, ranges, starts):
+    """Is code point in sorted, merged ranges (starts are the range starts)?"""
+    i = bisect.bisect_right(starts, ucp) - 1
+    return i >= 0 and ucp <= ranges[i][1]
+
+
+def read_hex(lines, height=HEIGHT):
+    """Glyphs from Unifont hex lines 'CODE:BITMAP'; glyph width follows bitmap length."""
+    for num, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            code, bitmap = line.split(':')
+            digits = len(bitmap) // height
+            if digits * height != len(bitmap) or not digits:
+                raise ValueError(f"bitmap of {len(bitmap)} digits isn't {height} rows")
+            if digits == 2:  # half-width glyphs: one byte per row
+                rows = tuple(bytes.fromhex(bitmap))
+            else:
+                rows = tuple(int(bitmap[i:i+digits], 16) for i in range(0, len(bitmap), digits))
+        except ValueError as e:
+            raise ValueError(f"Error on line {num}: {e}") from e
+        yield digits * 4, Glyph(int(code, 16), '', rows)
+
+
+def read_bdf(lines, height=None):
+    """Glyphs from BDF font lines, placed in the font bounding box (or height rows)."""
+    font = {'fbb': None, 'ascent': None}
+    glyph = {}  # properties of current glyph (empty outside STARTCHAR/ENDCHAR)
+    bitmap = None
+    for num, line in enumerate(lines, start=1):
+        tokens = line.split()
+        if not tokens:
+            continue
+        key = tokens[0]
+        try:
+            if bitmap is not None:
+                if key == 'ENDCHAR':
+                    yield bdf_glyph(glyph, bitmap, font, height)
+                    glyph, bitmap = {}, None
+                else:
+                    bitmap.append(key)
+            elif key == 'STARTCHAR':
+                glyph = {'name': ' '.join(tokens[1:])}
+            elif key in BDF_GLYPH_KEYS:
+                bitmap = bdf_glyph_key(glyph, tokens, font)
+            elif key == 'FONTBOUNDINGBOX':
+                font['fbb'] = tuple(int(t) for t in tokens[1:5])
+            elif key == 'FONT_ASCENT':
+                font['ascent'] = int(tokens[1])
+        except (ValueError, IndexError, TypeError) as e:
+            raise ValueError(f"Error on line {num}: {e}") from e
+
+
+def bdf_glyph_key(glyph, tokens, font):
+    """Set glyph property from BDF keyword line; returns empty bitmap for BITMAP, else None."""
+    key = tokens[0]
+    if not glyph:
+        raise ValueError(f"{key} outside STARTCHAR/ENDCHAR")
+    if key == 'BITMAP':
+        if font['fbb'] is None:
+            raise ValueError("BITMAP before FONTBOUNDINGBOX")
+        return []
+    values = tuple(int(t) for t in tokens[1:5])
+    glyph[BDF_GLYPH_KEYS[key]] = values if key == 'BBX' else values[0]
+    return None
+
+
+def bdf_glyph(glyph, bitmap, font, height):
+    """Place BDF glyph bitmap in its cell; returns (width, Glyph)."""
+    fbb = font['fbb']  # width, height, x offset, y offset
+    ascent = fbb[1] + fbb[3] if font['ascent'] is None else font['ascent']
+    height = fbb[1] if height is None else height
+    width = glyph.get('dwidth', fbb[0])
+    bbw, bbh, bbx, bby = glyph.get('bbx', fbb)
+    rows = [0] * height
+    top = ascent - (bby + bbh)  # cell row of glyph's first bitmap row
+    for r, hexrow in enumerate(bitmap):
+        if 0 <= top + r < height:
+            rows[top + r] = bdf_row(hexrow, bbw, width - bbx - bbw, width)
+    return width, Glyph(glyph.get('ucp', -1), glyph['name'], tuple(rows))
+
+
+def bdf_row(hexrow, bbw, shift, width):
+    """Cell row from BDF bitmap row of bbw pixels, shifted left to its place in the cell."""
+    bits = int(hexrow, 16) >> max(4 * len(hexrow) - bbw, 0)  # drop byte padding
+    return (bits << shift if shift >= 0 else bits >> -shift) & ((1 << width) - 1)
+
+
+def reverse_bits(value, width):
+    """Reverse width bits of value."""
+    return int(f"{value:0{width}b}"[::-1], 2)
+
+
+def add_run(runs, ucp, index):
+    """Add code point to runs of [first, last, index]; extends the last run if consecutive."""
+    if runs and ucp == runs[-1][1] + 1 and index == runs[-1][2] + ucp - runs[-1][0]:
+        runs[-1][1] = ucp
+    else:
+        runs.append([ucp, ucp, index])
+
+
+def convert(glyphs, out, ranges=None, width=WIDTH, lsb=False):
+    """Write selected glyphs of width to out as ROM lines; returns (runs, counts).
+
+    Identical bitmaps are written once. counts has 'glyphs' (written), 'ucps'
+    (code points mapped), 'skipped' (selected but wrong width), and 'height'.
+    """
+    starts = [lo for lo, _ in ranges] if ranges else None
+    seen = {}  # rows -> glyph index
+    runs = []
+    counts = {'glyphs': 0, 'ucps': 0, 'skipped': 0, 'height': 0}
+    line_fmt = None  # rows format, set from first glyph height
+    for glyph_width, glyph in glyphs:
+        if glyph.ucp < 0 or (ranges and not in_ranges(glyph.ucp, ranges, starts)):
+            continue
+        if glyph_width != width:
+            counts['skipped'] += 1
+            continue
+        rows = glyph.rows
+        if len(rows) != counts['height']:
+            counts['height'] = len(rows)
+            line_fmt = ' '.join([f"%0{(width + 3) // 4}X"] * len(rows))
+        if lsb:
+            rows = tuple(reverse_bits(row, width) for row in rows)
+        index = seen.get(rows)
+        if index is None:
+            index = seen[rows] = counts['glyphs']
+            counts['glyphs'] += 1
+            name = f" - {glyph.name}" if glyph.name else ""
+            out.write(f"{line_fmt % rows}  // U+{glyph.ucp:04X}{name}\n")
+        counts['ucps'] += 1
+        add_run(runs, glyph.ucp, index)
+    return sorted(Run(*run) for run in runs), counts
+
+
+def format_table(runs, header=None):
+    """Format index table runs as $readmemh text: first, last, index per line."""
+    lines = [] if header is None else [f"// {header}", ""]
+    lines += [f"{r.first:06X} {r.last:06X} {r.index:06X}  // U+{r.first:04X}..U+{r.last:04X}"
+        for r in runs]
+    return "\n".join(lines) + "\n"
+
+
+def lookup(runs, ucp):
+    """Glyph index for code point from index table runs (None if missing)."""
+    i = bisect.bisect_right(runs, (ucp, UCP_MAX + 1)) - 1
+    if i >= 0 and runs[i].first <= ucp <= runs[i].last:
+        return runs[i].index + ucp - runs[i].first
+    return None
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Isle Font Converter")
+    parser.add_argument('file', help="font in BDF (.bdf) or Unifont hex (.hex) format")
+    parser.add_argument('-o', '--out', metavar='FILE', default='-',
+        help="font ROM in $readmemh format (default: stdout)")
+    parser.add_argument('-t', '--table', metavar='FILE',
+        help="write code point to glyph index table in $readmemh format to FILE")
+    parser.add_argument('-r', '--ranges', metavar='RANGES',
+        help="code point ranges in hex, e.g. 20-7E,2580-259F,FFFD (default: all)")
+    parser.add_argument('--width', type=int, default=WIDTH,
+        help=f"glyph width in pixels; other glyphs are skipped (default: {WIDTH})")
+    parser.add_argument('--height', type=int,
+        help=f"glyph height in pixels (default: BDF bounding box or {HEIGHT} for hex)")
+    parser.add_argument('--lsb', action='store_true',
+        help="leftmost pixel in least significant bit (font_glyph LSB=1)")
+    args = parser.parse_args(argv)
+
+    try:
+        ranges = parse_ranges(args.ranges) if args.ranges else None
+        with open(args.file, 'r', encoding="utf-8") as f, \
+                nullcontext(sys.stdout) if args.out == '-' else open(args.out, 'w',
+                encoding="utf-8") as out:
+            if args.file.lower().endswith('.bdf'):
+                glyphs = read_bdf(f, args.height)
+            else:
+                glyphs = read_hex(f, args.height or HEIGHT)
+            out.write(f"// Generated by fontconv from {args.file}\n\n")
+            runs, counts = convert(glyphs, out, ranges, args.width, args.lsb)
+        if args.table is not None:
+            with open(args.table, 'w', encoding="utf-8") as f:
+                f.write(format_table(runs, f"Generated by fontconv from {args.file}: "
+                    f"{len(runs)} runs of first, last, glyph index"))
+    except (OSError, ValueError) as e:
+        print(f"Font error: {e}", file=sys.stderr)
+        return 1
+    print(f"fontconv: {counts['glyphs']} {args.width}x{counts['height']} glyphs (FONT_COUNT) "
+        f"for {counts['ucps']} code points in {len(runs)} runs; "
+        f"{counts['skipped']} other widths skipped", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
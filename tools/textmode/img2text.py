@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Image to Text Mode Converter
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Image to Text Mode Converter: match image cells to font glyphs and colours"""
+
+# NB. Each cell takes the glyph and foreground/background colour indices that
+#     minimise squared RGB error. For a glyph, the best foreground depends only
+#     on the sum of the cell's colours under the glyph's set pixels (and the
+#     background on the rest), so every cell is scored against every glyph
+#     and colour with a few matrix products:
+#
+#       error(f) = sum |c|^2 - 2 P[f].S_on + n_on |P[f]|^2
+#
+#     where S_on is the colour sum under the glyph and n_on its pixel count.
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from fontconv import in_ranges, parse_ranges
+from textmap import compile_text, delta_bytes, diff_screens, format_mem, size_arg, write_text
+
+RES = Path(__file__).parent / "../../res"
+FONT = RES / "fonts/unifont-rom.mem"
+PALETTE = RES / "palettes/go-16.mem"
+CELL = (8, 16)  # glyph width and height (pixels)
+
+
+def read_font(path):
+    """Read font ROM: glyph pixels (n, height, width) bool and code point of each glyph.
+
+    Code points come from 'U+XXXX' comments; glyphs without one are skipped.
+    """
+    glyphs, ucps = [], []
+    with open(path, 'r', encoding="utf-8") as f:
+        for line in f:
+            data, _, comment = line.partition('//')
+            tokens, words = data.split(), comment.split()
+            if not tokens or not words or not words[0].startswith('U+'):
+                continue
+            width = 4 * len(tokens[0])
+            rows = np.array([int(t, 16) for t in tokens], dtype=np.uint32)
+            bits = (rows[:, None] >> np.arange(width - 1, -1, -1, dtype=np.uint32)) & 1
+            glyphs.append(bits.astype(bool))  # leftmost pixel in MSB
+            ucps.append(int(words[0][2:], 16))
+    if not glyphs:
+        raise ValueError(f"no glyphs with U+ comments in {path}")
+    return np.array(glyphs), ucps
+
+
+def select_glyphs(glyphs, ucps, ranges=None):
+    """Drop duplicate glyphs and those outside ranges; space (if any) goes first."""
+    starts = [lo for lo, _ in ranges] if ranges else None
+    keep, seen = [], set()
+    for i in sorted(range(len(ucps)), key=lambda i: ucps[i] != 0x20):
+        key = glyphs[i].tobytes()
+        if key in seen or (ranges and not in_ranges(ucps[i], ranges, starts)):
+            continue
+        seen.add(key)
+        keep.append(i)
+    if not keep:
+        raise ValueError("no glyphs selected")
+    return glyphs[keep], [ucps[i] for i in keep]
+
+
+def read_palette(path):
+    """Read RGB555 palette in $readmemh format as RGB888 (n, 3) float."""
+    with open(path, 'r', encoding="utf-8") as f:
+        colrs = np.array([int(t, 16) for line in f for t in line.split('//', 1)[0].split()])
+    rgb5 = np.stack(((colrs >> 10) & 0x1F, (colrs >> 5) & 0x1F, colrs & 0x1F), axis=1)
+    return ((rgb5 << 3) | (rgb5 >> 2)).astype(np.float64)
+
+
+def split_cells(rgb, cell=CELL):
+    """Split RGB image (h, w, 3) into cells (rows * cols, cell pixels, 3)."""
+    height, width = rgb.shape[:2]
+    cw, ch = cell
+    if width % cw or height % ch:
+        raise ValueError(f"image {width}x{height} isn't a whole number of {cw}x{ch} cells")
+    cells = rgb.reshape(height // ch, ch, width // cw, cw, 3).swapaxes(1, 2)
+    return cells.reshape(-1, cw * ch, 3).astype(np.float32), (width // cw, height // ch)
+
+
+def glyph_errors(cells, glyphs, palette):
+    """Squared error of each cell drawn with each glyph, by colour (colours, n, k).
+
+    Returns (errors of glyph pixels for each foreground, errors of the rest
+    for each background).
+    """
+    n, pixels, _ = cells.shape
+    masks = glyphs.reshape(len(glyphs), -1).astype(np.float32)  # (k, pixels)
+    n_on = masks.sum(axis=1)
+    pal = palette.astype(np.float32)
+    pp = (pal * pal).sum(axis=1)
+    # colour sums under each glyph and in the whole cell, dotted with each palette colour (x -2);
+    # palette colour is the leading axis, so minimising over it is elementwise
+    s_on = (cells.transpose(0, 2, 1).reshape(-1, pixels) @ masks.T).reshape(n, 3, -1)
+    dot_on = (-2 * pal @ s_on.transpose(1, 0, 2).reshape(3, -1)).reshape(len(pal), n, -1)
+    dot_all = -2 * pal @ cells.sum(axis=1).T  # (colours, n)
+    err_on = dot_on + np.multiply.outer(pp, n_on)[:, None, :]  # (colours, n, k)
+    err_off = np.multiply.outer(pp, pixels - n_on)[:, None, :] - dot_on
+    err_off += dot_all[:, :, None]
+    return err_on, err_off
+
+
+def match_cells(cells, glyphs, palette):
+    """Best glyph index, foreground, and background for each cell (arrays of n)."""
+    err_on, err_off = glyph_errors(cells, glyphs, palette)
+    best = (err_on.min(axis=0) + err_off.min(axis=0)).argmin(axis=1)
+    cell = np.arange(len(cells))
+    fg, bg = err_on[:, cell, best].argmin(axis=0), err_off[:, cell, best].argmin(axis=0)
+    # one colour: show as space so unchanged areas give identical words
+    plain = fg == bg
+    best[plain], fg[plain] = 0, 0
+    return best, fg, bg
+
+
+def convert(rgb, glyphs, ucps, palette):
+    """Convert RGB image to tram words; returns (words, (cols, rows), glyph indices)."""
+    cells, size = split_cells(rgb, glyphs.shape[:0:-1])
+    best, fg, bg = match_cells(cells, glyphs, palette)
+    ucp = np.array(ucps, dtype=np.uint32)[best]
+    words = (bg.astype(np.uint32) << 28) | (fg.astype(np.uint32) << 24) | ucp
+    return words.tolist(), size, best
+
+
+def word_cells(words, best):
+    """Glyph index, foreground, and background of each cell from tram words and glyph indices."""
+    words = np.asarray(words, dtype=np.uint32)
+    return best, words >> 24 & 0xF, words >> 28
+
+
+def render(cells, size, glyphs, palette):
+    """Render cells (glyph index, foreground, background arrays) to RGB888 (h, w, 3) uint8."""
+    best, fg, bg = cells
+    cols, rows = size
+    _, ch, cw = glyphs.shape
+    pix = np.where(glyphs[best][..., None], palette[fg][:, None, None], palette[bg][:, None, None])
+    pix = pix.reshape((rows, cols, ch, cw, 3)).swapaxes(1, 2)
+    return pix.reshape((rows * ch, cols * cw, 3)).astype(np.uint8)
+
+
+def read_image(path, size=None, cell=CELL):
+    """Read image as RGB888 array, resized to size (cols, rows) cells if given (needs Pillow)."""
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+    with Image.open(path) as img:
+        img = img.convert('RGB')
+        if size is not None:
+            img = img.resize((size[0] * cell[0], size[1] * cell[1]), Image.Resampling.BOX)
+        return np.asarray(img)
+
+
+def convert_frames(paths, size, glyphs, ucps, palette):
+    """Convert images to frames of tram words; returns (frames, size, last glyph indices, ms)."""
+    frames, start = [], time.perf_counter()
+    for path in paths:
+        words, shape, best = convert(read_image(path, size), glyphs, ucps, palette)
+        if frames and len(words) != len(frames[0]):
+            raise ValueError(f"{path}: frames must be the same size (use -s)")
+        frames.append(words)
+    return frames, shape, best, (time.perf_counter() - start) * 1000 / len(frames)
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Isle Image to Text Mode Converter")
+    parser.add_argument('file', nargs='+', help="image(s); several images are frames")
+    parser.add_argument('-s', '--size', type=size_arg, metavar='WxH',
+        help="resize image to W x H cells (default: image size / 8x16)")
+    parser.add_argument('-f', '--font', default=str(FONT), metavar='FILE',
+        help="font ROM with U+ comments (default: res/fonts/unifont-rom.mem)")
+    parser.add_argument('-p', '--palette', default=str(PALETTE), metavar='FILE',
+        help="RGB555 palette; first 16 colours are used (default: res/palettes/go-16.mem)")
+    parser.add_argument('-r', '--ranges', metavar='RANGES',
+        help="only use glyphs in these code point ranges, e.g. 20,2580-259F")
+    parser.add_argument('-m', '--mem', metavar='FILE',
+        help="write tram words in $readmemh format to FILE ('-' for stdout); one image only")
+    parser.add_argument('-b', '--bin', metavar='FILE',
+        help="write tram words in little-endian binary to FILE; one image only")
+    parser.add_argument('-d', '--deltas', metavar='FILE',
+        help="write textmap delta stream to FILE: each frame from the one before "
+        "(the first from a blank screen)")
+    parser.add_argument('--preview', metavar='FILE',
+        help="write PNG of the (last) converted frame as text mode shows it")
+    args = parser.parse_args(argv)
+    if len(args.file) > 1 and (args.mem or args.bin or not args.deltas):
+        parser.error("several images are frames for -d; -m and -b take one image")
+
+    try:
+        glyphs, ucps = read_font(args.font)
+        glyphs, ucps = select_glyphs(glyphs, ucps, parse_ranges(args.ranges)
+            if args.ranges else None)
+        palette = read_palette(args.palette)[:16]
+        frames, size, best, ms = convert_frames(args.file, args.size, glyphs, ucps, palette)
+        words = frames[-1]
+        if args.deltas is not None:
+            screens = [compile_text([], size, 0, 0)] + frames
+            with open(args.deltas, 'wb') as f:
+                f.write(b''.join(delta_bytes(diff_screens(a, b))
+                    for a, b in zip(screens, screens[1:])))
+        if args.mem is not None or (args.bin is None and args.deltas is None):
+            write_text(args.mem or '-', format_mem(words, size[0], f"Generated by img2text "
+                f"from {Path(args.file[0]).name} ({size[0]}x{size[1]})"))
+        if args.bin is not None:
+            with open(args.bin, 'wb') as f:
+                f.write(np.array(words, dtype='<u4').tobytes())
+        if args.preview is not None:
+            from PIL import Image  # pylint: disable=import-outside-toplevel
+            Image.fromarray(render(word_cells(words, best), size, glyphs,
+                palette)).save(args.preview)
+    except (OSError, ValueError) as e:
+        print(f"Conversion error: {e}", file=sys.stderr)
+        return 1
+    print(f"img2text: {len(frames)} frames of {size[0]}x{size[1]} cells, {len(ucps)} glyphs, "
+        f"{len(palette)} colours; {ms:.1f} ms per frame", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# Isle.Computer - Font Converter Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Font Converter Tests"""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from fontconv import (Run, convert, format_table, lookup, main, parse_ranges, read_bdf,
+    read_hex)
+
+UNIFONT = Path(__file__).parent / "../../res/fonts/unifont-rom.mem"
+
+BDF = """STARTFONT 2.1
+FONT -test-
+SIZE 16 75 75
+FONTBOUNDINGBOX 8 16 0 -4
+STARTPROPERTIES 1
+FONT_ASCENT 12
+ENDPROPERTIES
+CHARS 3
+STARTCHAR A
+ENCODING 65
+DWIDTH 8 0
+BBX 5 3 1 0
+BITMAP
+20
+50
+F8
+ENDCHAR
+STARTCHAR underscore
+ENCODING 95
+DWIDTH 8 0
+BBX 8 1 0 -4
+BITMAP
+FF
+ENDCHAR
+STARTCHAR wide
+ENCODING 12354
+DWIDTH 16 0
+BBX 16 1 0 0
+BITMAP
+FFFF
+ENDCHAR
+ENDFONT
+"""
+
+def rom_glyphs(text):
+    """(code point, rows) of each glyph in font ROM .mem text."""
+    glyphs = []
+    for line in text.splitlines():
+        data, _, comment = line.partition('//')
+        if data.split():
+            ucp = int(comment.split()[0].removeprefix('U+'), 16)
+            glyphs.append((ucp, [int(t, 16) for t in data.split()]))
+    return glyphs
+
+
+class TestFontconv:
+    """Test class for fontconv."""
+
+    def test_ranges(self):
+        """Test ranges are parsed, sorted, and merged."""
+        assert parse_ranges("2580-259F,20-7E,U+FFFD,7F") == [(0x20, 0x7F), (0x2580, 0x259F),
+            (0xFFFD, 0xFFFD)]
+
+    def test_hex(self):
+        """Test Unifont hex converts to the ROM format, selecting ranges."""
+        glyphs = rom_glyphs(UNIFONT.read_text(encoding="utf-8"))
+        lines = [f"{ucp:04X}:" + ''.join(f"{r:02X}" for r in rows) for ucp, rows in glyphs]
+        lines.append("3042:" + "00FF" * 16)  # wide glyph
+        out = io.StringIO()
+        runs, counts = convert(read_hex(lines), out, parse_ranges("20-7E,2580-259F,3042"))
+        assert counts == {'glyphs': 127, 'ucps': 127, 'skipped': 1, 'height': 16}
+        assert rom_glyphs(out.getvalue()) == glyphs[:127]
+        assert runs == [Run(0x20, 0x7E, 32), Run(0x2580, 0x259F, 0)]
+        # lsb reverses pixels
+        out = io.StringIO()
+        convert(read_hex(["0041:" + "80" * 16]), out, lsb=True)
+        assert out.getvalue().startswith("01 01")
+
+    def test_dedup(self):
+        """Test identical glyphs share a ROM glyph and the table maps them."""
+        lines = [f"{ucp:04X}:" + f"{ucp % 3:02X}" * 16 for ucp in range(0x4E00, 0x4E00 + 3000)]
+        out = io.StringIO()
+        runs, counts = convert(read_hex(iter(lines)), out)
+        assert counts['glyphs'] == 3 and counts['ucps'] == 3000
+        assert len(out.getvalue().splitlines()) == 3
+        assert runs[0] == Run(0x4E00, 0x4E02, 0)  # first 3 glyphs are consecutive
+        assert all(lookup(runs, ucp) == (ucp - 0x4E00) % 3 for ucp in range(0x4E00, 0x4E00 + 3000))
+        assert lookup(runs, 0x4DFF) is None and lookup(runs, 0x4E00 + 3000) is None
+        assert format_table(runs[:1]) == "004E00 004E02 000000  // U+4E00..U+4E02\n"
+
+    def test_bdf(self):
+        """Test BDF glyphs are placed on the baseline of the font bounding box."""
+        out = io.StringIO()
+        runs, counts = convert(read_bdf(io.StringIO(BDF)), out)
+        assert counts['skipped'] == 1 and runs == [Run(65, 65, 0), Run(95, 95, 1)]
+        glyphs = rom_glyphs(out.getvalue())
+        assert glyphs[0][1] == [0] * 9 + [0x10, 0x28, 0x7C] + [0] * 4  # A ends on baseline
+        assert glyphs[1][1] == [0] * 15 + [0xFF]  # underscore on bottom row
+        assert "U+0041 - A" in out.getvalue()
+        # glyph keywords outside STARTCHAR/ENDCHAR
+        with pytest.raises(ValueError, match="line 2: ENCODING outside STARTCHAR/ENDCHAR"):
+            list(read_bdf(io.StringIO("FONTBOUNDINGBOX 8 16 0 -4\nENCODING 65\n")))
+
+    def test_cli(self, tmp_path):
+        """Test command line writes ROM and table."""
+        (tmp_path / "test.bdf").write_text(BDF, encoding="utf-8")
+        rom, table = tmp_path / "rom.mem", tmp_path / "table.mem"
+        assert main([str(tmp_path / "test.bdf"), "-o", str(rom), "-t", str(table),
+            "-r", "41"]) == 0
+        assert len(rom_glyphs(rom.read_text(encoding="utf-8"))) == 1
+        assert "000041 000041 000000" in table.read_text(encoding="utf-8")
+        assert main([str(tmp_path / "missing.hex")]) == 1
@@ -0,0 +1,79 @@
+# Isle.Computer - Image to Text Mode Converter Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Image to Text Mode Converter Tests"""
+
+import struct
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from fontconv import parse_ranges
+from img2text import (FONT, PALETTE, convert, main, read_font, read_palette, render,
+    select_glyphs, split_cells, word_cells)
+from textmap import read_mem
+
+def screen(rng, size, glyphs, palette):
+    """Random cells rendered as text mode shows them: (image, glyph, fg, bg)."""
+    count = size[0] * size[1]
+    best = rng.integers(len(glyphs), size=count)
+    fg, bg = rng.integers(len(palette), size=(2, count))
+    return render((best, fg, bg), size, glyphs, palette), best, fg, bg
+
+
+class TestImg2text:
+    """Test class for img2text."""
+
+    def test_font(self):
+        """Test ROM glyphs and code points are read, deduplicated, and selected."""
+        glyphs, ucps = read_font(FONT)
+        assert glyphs.shape == (128, 16, 8) and ucps[0] == 0x2580 and ucps[-1] == 0xFFFD
+        assert glyphs[8].all() and glyphs[0, :8].all() and not glyphs[0, 8:].any()
+        sel, sel_ucps = select_glyphs(glyphs, ucps, parse_ranges("20,2580-259F"))
+        assert len(sel) == 33 and sel_ucps[0] == 0x20 and not sel[0].any()
+
+    def test_match(self):
+        """Test rendered text converts back to the same picture, quickly."""
+        glyphs, ucps = select_glyphs(*read_font(FONT))
+        palette = read_palette(PALETTE)
+        rng = np.random.default_rng(2)
+        img, *_ = screen(rng, (84, 24), glyphs, palette)
+        start = time.perf_counter()
+        words, size, best = convert(img, glyphs, ucps, palette)
+        assert time.perf_counter() - start < 0.5
+        assert size == (84, 24)
+        assert np.array_equal(render(word_cells(words, best), size, glyphs, palette), img)
+        # plain cells are spaces
+        img = np.zeros((32, 16, 3), dtype=np.uint8)
+        img[:16, 8:] = palette[5]
+        words, *_ = convert(img, glyphs, ucps, palette)
+        assert words == [0x00000020, 0x50000020, 0x00000020, 0x00000020]
+
+    def test_cells(self):
+        """Test images must be whole cells."""
+        cells, size = split_cells(np.zeros((32, 24, 3), dtype=np.uint8))
+        assert cells.shape == (6, 128, 3) and size == (3, 2)
+        with pytest.raises(ValueError, match="whole number"):
+            split_cells(np.zeros((30, 24, 3)))
+
+    def test_cli(self, tmp_path):
+        """Test command line writes tram words and frame deltas."""
+        glyphs, _ = select_glyphs(*read_font(FONT))
+        palette = read_palette(PALETTE)
+        img, *_ = screen(np.random.default_rng(3), (4, 2), glyphs, palette)
+        path = tmp_path / "frame.png"
+        Image.fromarray(img).save(path)
+        mem, deltas = tmp_path / "frame.mem", tmp_path / "frames.delta"
+        assert main([str(path), "-m", str(mem)]) == 0
+        assert len(read_mem(mem.open(encoding="utf-8"))) == 8
+        assert main([str(path), str(path), "-d", str(deltas)]) == 0
+        data = deltas.read_bytes()
+        count = struct.unpack_from('<H', data)[0]
+        assert 0 < count <= 8 and data[-2:] == b'\x00\x00'  # nothing changes in frame 2
+        preview = tmp_path / "preview.png"
+        assert main([str(path), "-s", "8x4", "-m", "-", "--preview", str(preview)]) == 0
+        with Image.open(preview) as img:
+            assert img.size == (64, 64)
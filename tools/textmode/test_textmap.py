@@ -0,0 +1,66 @@
+# Isle.Computer - Textmap Compiler Tests
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Textmap Compiler Tests"""
+
+import struct
+from pathlib import Path
+
+import pytest
+
+from textmap import (apply_delta, compile_text, delta_bytes, diff_screens, main, parse_line,
+    read_mem, read_screen, tram_word)
+
+HELLO = Path(__file__).parent / "../../res/textmaps/hello-84x24.mem"
+
+class TestTextmap:
+    """Test class for textmap."""
+
+    def test_markup(self):
+        """Test colour markup and escapes."""
+        words, fg, bg = parse_line("a{4}b{,2}c{{{}d{}{8,}e")
+        assert words == [tram_word(0x61), tram_word(0x62, 4), tram_word(0x63, 4, 2),
+            tram_word(0x7B, 4, 2), tram_word(0x64), tram_word(0x65, 8)]
+        assert (fg, bg) == (8, 0)
+        assert tram_word(0x1F600, 0xD, 0x3) == 0x3D01F600  # full 21-bit code point
+
+    def test_compile(self):
+        """Test compiled text matches hand-written hello textmap."""
+        top = "{3}█{0} {D}Isle{0} {7}Hello{0} {5}World!{0}" + " " * 64 + "{3}█"
+        lines = [top] + [""] * 22 + ["{3}█{0}" + " " * 82 + "{3}█"]
+        words = compile_text(lines, fg=0)
+        assert words == read_mem(HELLO.open(encoding="utf-8"))[:84 * 24]
+        assert read_screen(str(HELLO)) == words  # words past the screen are dropped
+        with pytest.raises(ValueError, match="line 1"):
+            compile_text(["x" * 85])
+        with pytest.raises(ValueError, match="line 25"):
+            compile_text([""] * 24 + ["x"])
+
+    def test_diff(self):
+        """Test delta writes only changed cells, using colour bytes where it can."""
+        old = compile_text(["Status: {2}OK{}", "Count: 41"])
+        new = compile_text(["Status: {4}OK{}", "Count: 42"])
+        delta = diff_screens(old, new)
+        assert delta == [(4 * 8 + 3, 0x04, True), (4 * 9 + 3, 0x04, True),
+            (4 * 92, tram_word(ord('2')), False)]
+        assert apply_delta(old, delta) == new
+        data = delta_bytes(delta)
+        assert len(data) == 2 + 3 + 3 + 6
+        assert struct.unpack_from('<HHB', data) == (3, 35, 0x04)
+        assert not diff_screens(new, new)
+
+    def test_cli(self, tmp_path, capsys):
+        """Test command line writes mem, binary, and deltas."""
+        old, new = tmp_path / "old.txt", tmp_path / "new.txt"
+        old.write_text("{A}Temp 20\n", encoding="utf-8")
+        new.write_text("{A}Temp 21\n", encoding="utf-8")
+        mem, binary = tmp_path / "old.mem", tmp_path / "old.bin"
+        assert main([str(old), "-s", "16x2", "-m", str(mem), "-b", str(binary)]) == 0
+        assert read_mem(mem.open(encoding="utf-8")) == compile_text(["{A}Temp 20"], (16, 2))
+        assert binary.read_bytes()[:4] == bytes([0x54, 0, 0, 0x0A])
+        deltas = tmp_path / "deltas.bin"
+        assert main([str(new), "-s", "16x2", "--from", str(mem), "-d", str(deltas),
+            "-l", "-"]) == 0
+        assert capsys.readouterr().out == "0018 0A000031\n"
+        assert deltas.read_bytes() == struct.pack('<HHI', 1, 0x18, 0x0A000031)
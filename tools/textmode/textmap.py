@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+# Isle.Computer - Textmap Compiler
+# Copyright Will Green and Isle Contributors
+# SPDX-License-Identifier: MIT
+
+"""Textmap Compiler: UTF-8 text with colour markup to tram words and screen deltas"""
+
+# NB. Each tram word holds a Unicode code point in bits 0-20, the foreground
+#     colour index in bits 24-27, and the background in bits 28-31. Markup sets
+#     the colours for the text that follows it:
+#
+#       {F}    foreground F (hex colour index)
+#       {F,B}  foreground F and background B; either may be left empty
+#       {}     back to the default colours
+#       {{     a literal '{'
+#
+#     A delta is the tram writes that turn one screen into another. When only
+#     a cell's colours change, the delta writes the top byte of its word.
+
+import argparse
+import re
+import struct
+import sys
+
+SIZE = (84, 24)  # default textmap size (chars)
+FG, BG = 0xF, 0x0  # default colours
+UCP_MASK = (1 << 21) - 1
+COLR_SHIFT = 24  # colour byte: BG in upper nibble, FG in lower
+
+MARKUP_RE = re.compile(r'\{\{|\{([0-9A-Fa-f]?)(?:,([0-9A-Fa-f]?))?\}')
+
+# delta stream: record count, then (tram byte address, data) records; word-aligned
+# addresses have a 32-bit word, addresses ending in 3 a colour byte
+DELTA_HEAD = struct.Struct('<H')
+DELTA_WORD = struct.Struct('<HI')
+DELTA_BYTE = struct.Struct('<HB')
+
+
+def tram_word(ucp, fg=FG, bg=BG):
+    """Pack code point and colours into tram word."""
+    return (bg << 28) | (fg << COLR_SHIFT) | (ucp & UCP_MASK)
+
+
+def parse_line(line, fg=FG, bg=BG, defaults=(FG, BG)):
+    """Cells of marked-up line as tram words; returns (words, fg, bg) to carry colour on."""
+    words, pos = [], 0
+    for m in MARKUP_RE.finditer(line):
+        words += [tram_word(ord(c), fg, bg) for c in line[pos:m.start()]]
+        pos = m.end()
+        if m.group(0) == '{{':
+            words.append(tram_word(ord('{'), fg, bg))
+        elif m.group(0) == '{}':
+            fg, bg = defaults
+        else:
+            fg = int(m.group(1), 16) if m.group(1) else fg
+            bg = int(m.group(2), 16) if m.group(2) else bg
+    words += [tram_word(ord(c), fg, bg) for c in line[pos:]]
+    return words, fg, bg
+
+
+def compile_text(lines, size=SIZE, fg=FG, bg=BG):
+    """Compile marked-up text lines to tram words; short lines and screens pad with spaces.
+
+    Colours carry on from one line to the next.
+    """
+    width, height = size
+    words, cur_fg, cur_bg = [], fg, bg
+    for num, line in enumerate(lines, start=1):
+        line = line.rstrip('\r\n').expandtabs()
+        if num > height:
+            if line.strip():
+                raise ValueError(f"Error on line {num}: textmap is only {height} lines")
+            continue
+        cells, cur_fg, cur_bg = parse_line(line, cur_fg, cur_bg, (fg, bg))
+        if len(cells) > width:
+            raise ValueError(f"Error on line {num}: {len(cells)} chars is wider than {width}")
+        words += cells + [tram_word(ord(' '), fg, bg)] * (width - len(cells))
+    return words + [tram_word(ord(' '), fg, bg)] * (width * height - len(words))
+
+
+def read_mem(lines):
+    """Read tram words in $readmemh format."""
+    return [int(t, 16) for line in lines for t in line.split('//', 1)[0].split()]
+
+
+def read_screen(path, size=SIZE, fg=FG, bg=BG):
+    """Tram words from .mem file (words past the screen are dropped) or marked-up text."""
+    with open(path, 'r', encoding="utf-8") as f:
+        if not path.endswith('.mem'):
+            return compile_text(f, size, fg, bg)
+        words = read_mem(f)
+    if len(words) < size[0] * size[1]:
+        raise ValueError(f"{path} has {len(words)} words; {size[0]}x{size[1]} needs "
+            f"{size[0] * size[1]}")
+    return words[:size[0] * size[1]]
+
+
+def diff_screens(old, new):
+    """Delta of tram (byte address, data, byte write) turning old words into new."""
+    delta = []
+    for i, (a, b) in enumerate(zip(old, new)):
+        if a == b:
+            continue
+        if not (a ^ b) & ((1 << COLR_SHIFT) - 1):  # colours only: write top byte
+            delta.append((4 * i + 3, b >> COLR_SHIFT, True))
+        else:
+            delta.append((4 * i, b, False))
+    return delta
+
+
+def apply_delta(words, delta):
+    """Apply delta to a copy of words (list)."""
+    words = list(words)
+    for addr, data, byte in delta:
+        i = addr >> 2
+        words[i] = (words[i] & 0xFFFFFF) | (data << COLR_SHIFT) if byte else data
+    return words
+
+
+def delta_bytes(delta):
+    """Encode delta for streaming: little-endian count, then (address, data) records."""
+    return DELTA_HEAD.pack(len(delta)) + b''.join(
+        (DELTA_BYTE if byte else DELTA_WORD).pack(addr, data) for addr, data, byte in delta)
+
+
+def format_delta(delta):
+    """Delta as text: byte address and data (8 hex digits for words, 2 for colour bytes)."""
+    return "".join(f"{addr:04X} {data:02X}\n" if byte else f"{addr:04X} {data:08X}\n"
+        for addr, data, byte in delta)
+
+
+def format_mem(words, width, header=None):
+    """Format tram words as $readmemh text: 10 words per line, blank line between rows."""
+    lines = [] if header is None else [f"// {header}", ""]
+    for row in range(0, len(words), width):
+        lines.append(f"// line {row // width}")
+        cells = words[row:row+width]
+        lines += [' '.join(f"{w:08X}" for w in cells[i:i+10]) for i in range(0, len(cells), 10)]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_text(path, text):
+    """Write text to file path ('-' for stdout)."""
+    if path == '-':
+        sys.stdout.write(text)
+    else:
+        with open(path, 'w', encoding="utf-8") as f:
+            f.write(text)
+
+
+def size_arg(text):
+    """Parse textmap size 'WxH'."""
+    try:
+        width, height = (int(v) for v in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WxH, not '{text}'") from None
+    return width, height
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Isle Textmap Compiler")
+    parser.add_argument('file', help="UTF-8 text with colour markup")
+    parser.add_argument('-s', '--size', type=size_arg, default=SIZE, metavar='WxH',
+        help=f"textmap size in chars (default: {SIZE[0]}x{SIZE[1]})")
+    parser.add_argument('--fg', type=lambda v: int(v, 16), default=FG,
+        help=f"default foreground colour index, hex (default: {FG:X})")
+    parser.add_argument('--bg', type=lambda v: int(v, 16), default=BG,
+        help=f"default background colour index, hex (default: {BG:X})")
+    parser.add_argument('-m', '--mem', metavar='FILE',
+        help="write tram words in $readmemh format to FILE ('-' for stdout)")
+    parser.add_argument('-b', '--bin', metavar='FILE',
+        help="write tram words in little-endian binary to FILE")
+    parser.add_argument('--from', dest='old', metavar='OLD',
+        help="diff against screen OLD (text or tram .mem) instead of writing whole screen")
+    parser.add_argument('-d', '--deltas', metavar='FILE',
+        help="with --from: write delta stream (binary) to FILE")
+    parser.add_argument('-l', '--list', metavar='FILE',
+        help="with --from: write delta as address and data text to FILE ('-' for stdout)")
+    args = parser.parse_args(argv)
+    if args.old is None and (args.deltas or args.list):
+        parser.error("-d and -l need --from")
+    if not (0 <= args.fg <= 0xF and 0 <= args.bg <= 0xF):
+        parser.error("colours must be 0-F")
+
+    try:
+        words = read_screen(args.file, args.size, args.fg, args.bg)
+        if args.old is not None:
+            delta = diff_screens(read_screen(args.old, args.size, args.fg, args.bg), words)
+            if args.deltas is not None:
+                with open(args.deltas, 'wb') as f:
+                    f.write(delta_bytes(delta))
+            if args.list is not None or args.deltas is None:
+                write_text(args.list or '-', format_delta(delta))
+        else:
+            if args.mem is not None or args.bin is None:
+                write_text(args.mem or '-', format_mem(words, args.size[0],
+                    f"Generated by textmap from {args.file} ({args.size[0]}x{args.size[1]})"))
+            if args.bin is not None:
+                with open(args.bin, 'wb') as f:
+                    f.write(struct.pack(f'<{len(words)}I', *words))
+    except (OSError, ValueError) as e:
+        print(f"Textmap error: {e}", file=sys.stderr)
+        return 1
+    if args.old is not None:
+        count = sum(byte for _, _, byte in delta)
+        print(f"textmap: {len(delta) - count} word and {count} colour byte writes, "
+            f"{len(delta_bytes(delta))} bytes to send", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())